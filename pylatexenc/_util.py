@@ -49,22 +49,30 @@ class LineNumbersCalculator(object):
         self.first_line_column_offset = first_line_column_offset
         self.column_offset = column_offset
 
-        def find_all_new_lines(x):
-            # first line starts at the beginning of the string
-            yield 0
-            k = 0
-            while k < len(x):
-                k = x.find('\n', k)
-                if k == -1:
-                    return
-                k += 1
-                # s[k] is the character after the newline, i.e., the 0-th column
-                # of the new line
-                yield k
-
-        self._pos_new_lines = list(find_all_new_lines(s))
-
-        
+        # first line starts at the beginning of the string
+        self._pos_new_lines = [ 0 ]
+        self._len_s = 0
+
+        self.append_text(s)
+
+    def append_text(self, s):
+        r"""
+        Register the string `s` as additional text that immediately follows all
+        the text seen so far.  This is useful if the text is read in chunks,
+        e.g. from a stream, and we don't want to keep the entire text around.
+        """
+        offset = self._len_s
+        k = 0
+        while k < len(s):
+            k = s.find('\n', k)
+            if k == -1:
+                break
+            k += 1
+            # s[k] is the character after the newline, i.e., the 0-th column
+            # of the new line
+            self._pos_new_lines.append(offset + k)
+        self._len_s = offset + len(s)
+
     def pos_to_lineno_colno(self, pos, as_dict=False):
         r"""
         Return the line and column number corresponding to the given `pos`.
@@ -130,6 +138,65 @@ from collections import ChainMap
 
 
 
+# ------------------------------------------------------------------------------
+
+
+#__pragma__('skip')
+
+import sys
+
+def lazy_module_attributes(module_globals, lazy_attributes):
+    r"""
+    Make the names in `lazy_attributes` available as attributes of the module
+    with the given `module_globals`, but only import the submodule that defines
+    each one when it is first accessed.
+
+    The `lazy_attributes` is a dictionary `{attribute_name: submodule_name}`,
+    where `submodule_name` is relative to the module (e.g. ``'._nodearena'``).
+
+    This uses a module-level `__getattr__()` function (:pep:`562`).  On Python
+    versions that don't support it, all the attributes are imported right away.
+
+    The module's `__all__` lists all its public names, including the lazy
+    ones, so that ``from module import *`` still provides them.  (Unless the
+    module defines `__all__` itself, it is computed each time that it is
+    accessed, so that it reflects the module's current public names.)
+    """
+    module_name = module_globals['__name__']
+
+    def __getattr__(name):
+        if name == '__all__':
+            all_names = [ n for n in module_globals.keys() if not n.startswith('_') ]
+            all_names += [ n for n in lazy_attributes.keys() if n not in all_names ]
+            return all_names
+        if name not in lazy_attributes:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(module_name, name)
+            )
+        submodule_name = lazy_attributes[name]
+        level = len(submodule_name) - len(submodule_name.lstrip('.'))
+        submodule = __import__(submodule_name[level:], module_globals, None,
+                               [name], level)
+        value = getattr(submodule, name)
+        # cache the value so that __getattr__() isn't called again
+        module_globals[name] = value
+        return value
+
+    if sys.version_info < (3, 7):
+        for name in lazy_attributes:
+            module_globals[name] = __getattr__(name)
+        return
+
+    def __dir__():
+        return sorted(set(module_globals.keys()) | set(lazy_attributes.keys()))
+
+    module_globals['__getattr__'] = __getattr__
+    module_globals['__dir__'] = __dir__
+
+#__pragma__('noskip')
+
+
+
 # ------------------------------------------------------------------------------
 
 
@@ -49,20 +49,19 @@ unicode fonts.)
 import re
 
 ### BEGINPATCH_LATEX2TEXT_SIMPLIFY_REPL_FN_ARG_NAMES
-import inspect
-
 def _simplify_repl_fn_arg_names(fn):
     # The names of the arguments that the given `simplify_repl` callable
-    # accepts, so that we only hand it those that it asked for.
+    # accepts, so that we only hand it those that it asked for.  (The inspect
+    # module is slow to import, so we only import it when it is needed.)
+    import inspect
     return inspect.getfullargspec(fn)[0]
 ### ENDPATCH_LATEX2TEXT_SIMPLIFY_REPL_FN_ARG_NAMES
 
 ### BEGINPATCH_LATEX2TEXT_FILL_TEXT
-import textwrap
-
 def _fill_text_paragraph(text, width, initial_indent=''):
     # Reflow a single paragraph of text onto lines of at most `width`
     # characters, with `initial_indent` placed in front of the first line.
+    import textwrap
     return textwrap.fill(text, width, initial_indent=initial_indent)
 ### ENDPATCH_LATEX2TEXT_FILL_TEXT
 
@@ -881,7 +880,16 @@ def _make_fmt_math_style_plain_chars():
             d[c] = chr(oc)
     return d
 
-_fmt_math_style_plain_chars = _make_fmt_math_style_plain_chars()
+
+# Lookup tables that are derived from other tables in this module.  They are
+# built the first time they are needed, not when the module is imported.
+# {name: table}
+_lazy_tables = {}
+
+def _get_lazy_table(name, make_fn):
+    if name not in _lazy_tables:
+        _lazy_tables[name] = make_fn()
+    return _lazy_tables[name]
 
 
 
@@ -1058,6 +1066,10 @@ def fmt_subsuperscript_text(text, which, normalize_math_style_chars=False):
        This function was introduced in `pylatexenc 3.0`.
     """
     charmap = _fmt_subsuperscript_charmaps[which]
+    plain_chars = None
+    if normalize_math_style_chars:
+        plain_chars = _get_lazy_table('fmt_math_style_plain_chars',
+                                      _make_fmt_math_style_plain_chars)
     result = []
     for c in _split_chars(text):
         if normalize_math_style_chars:
@@ -1066,7 +1078,7 @@ def fmt_subsuperscript_text(text, which, normalize_math_style_chars=False):
             # italicizes those, has to be taken back to the plain ascii letter
             # first: the tables above are keyed by the ascii character, and
             # unicode has no italic superscripts to offer anyway.
-            c = _fmt_math_style_plain_chars.get(c, c)
+            c = plain_chars.get(c, c)
         cc = charmap.get(c, None)
         if cc is None:
             # this character has no superscript/subscript version; the text
@@ -1680,7 +1692,6 @@ def _make_math_char_classes():
             d[c] = cls
     return d
 
-_math_char_classes = _make_math_char_classes()
 
 
 def _is_ascii_digit(c):
@@ -1733,6 +1744,8 @@ def _segment_plain_str(s, upright_letters_are_op=True):
       subscript attaches to, and that atom has to be the single character the
       script really applies to: '4πc x^q', not '4π cx^q'.
     """
+    math_char_classes = _get_lazy_table('math_char_classes',
+                                        _make_math_char_classes)
     atoms = []
     chars = _split_chars(s)
     i = 0
@@ -1768,7 +1781,7 @@ def _segment_plain_str(s, upright_letters_are_op=True):
             i = j
             continue
 
-        cls = _math_char_classes.get(c, _ORD)
+        cls = math_char_classes.get(c, _ORD)
         atoms.append( (c, cls,) )
         i = i + 1
 
@@ -2051,9 +2064,13 @@ def _join_math_pieces(pieces, display=False, upright_letters_are_op=True):
 # fallback to an empty context if the PYLATEXENC_GET_DEFAULT_SPECS_FN block
 # below was removed, i.e., if this build was made without the default specs
 get_default_latex_context_db = macrospec.LatexContextDb
+get_shared_default_latex_context_db = macrospec.LatexContextDb
 
 ### BEGIN_PYLATEXENC_GET_DEFAULT_SPECS_FN
-from ._get_defaultspecs import get_default_latex_context_db
+from ._get_defaultspecs import (
+    get_default_latex_context_db,
+    get_shared_default_latex_context_db,
+)
 ### END_PYLATEXENC_GET_DEFAULT_SPECS_FN
 
 
@@ -2347,7 +2364,10 @@ class TextConversionState(object):
 
 
 ### BEGINPATCH_LATEX2TEXT_READ_LATEX_FILE
-from ._inputlatexfile import read_latex_file
+def read_latex_file(tex_input_directory, strict_input, fn):
+    # only needed for \input and \include, so import it on first use
+    from ._inputlatexfile import read_latex_file as _read_latex_file
+    return _read_latex_file(tex_input_directory, strict_input, fn)
 ### ENDPATCH_LATEX2TEXT_READ_LATEX_FILE
 
 
@@ -2374,7 +2394,9 @@ class LatexNodes2Text(object):
       :py:class:`EnvironmentTextSpec`, and :py:class:`SpecialsTextSpec` objects.
 
       The default latex context database can be obtained using
-      :py:func:`get_default_latex_context_db()`.
+      :py:func:`get_default_latex_context_db()`.  If `latex_context_db` is not
+      specified, the database returned by
+      :py:func:`get_shared_default_latex_context_db()` is used.
 
     Additional keyword arguments are flags which may influence the behavior:
 
@@ -2706,8 +2728,8 @@ class LatexNodes2Text(object):
                                                    specials=[])
 
             else:
-                # default -- use default
-                latex_context = get_default_latex_context_db()
+                # default -- use the shared default latex context
+                latex_context = get_shared_default_latex_context_db()
 
         self.latex_context = latex_context
 
@@ -493,13 +493,16 @@ def _format_frac(n, l2tobj):
 
 
 # construct the specs structure, more than the just the following definition
+#
+# The definitions of each category are constructed by a function, which is only
+# called when the category is loaded into a LatexContextDb (see `specs` below).
 
 
 # ==============================================================================
 
 
 
-_latex_specs_placeholders = {
+_make_latex_specs_placeholders = lambda: {
     'environments': [
 #  --- as of pylatexenc 2.8, these are now approximated ---
 #        EnvironmentTextSpec('array', simplify_repl=fmt_placeholder_node),
@@ -528,7 +531,7 @@ _latex_specs_placeholders = {
     )],
 }
 
-_latex_specs_approximations = {
+_make_latex_specs_approximations = lambda: {
     'environments': [
         EnvironmentTextSpec('center', simplify_repl='\n%s\n'),
         EnvironmentTextSpec('flushleft', simplify_repl='\n%s\n'),
@@ -692,7 +695,7 @@ _latex_specs_approximations = {
     )],
 }
 
-_latex_specs_subsuperscripts = {
+_make_latex_specs_subsuperscripts = lambda: {
 
     'environments': [
     ],
@@ -708,7 +711,7 @@ _latex_specs_subsuperscripts = {
     ],
 }
 
-_latex_specs_base = {
+_make_latex_specs_base_macros = lambda: {
 
     'environments': [
     ],
@@ -944,7 +947,7 @@ _latex_specs_base = {
 
 # ==============================================================================
 
-advanced_symbols_macros = [
+_make_advanced_symbols_macros = lambda: [
     # Rules from latexencode defaults 'defaults'
     MacroTextSpec('textasciicircum', u'\N{CIRCUMFLEX ACCENT}'), # ‘^’
     MacroTextSpec('textasciitilde', u'\N{TILDE}'), # ‘~’
@@ -1847,11 +1850,22 @@ advanced_symbols_macros = [
 # ==============================================================================
 
 
+def _make_latex_specs_base():
+    latex_specs_base = _make_latex_specs_base_macros()
+    _add_greekletters(latex_specs_base, _greek_letters)
+    latex_specs_base['macros'] += _make_greek_letter_variants()
+    _add_accents(latex_specs_base, unicode_accents_list)
+    return latex_specs_base
+
+
+# Each item of `specs` is a pair `(category, make_fn)`, where calling `make_fn()`
+# returns a dictionary with keys 'macros', 'environments' and 'specials'.
+
 specs = [
     #
     # CATEGORY: latex-base
     #
-    ('latex-base', _latex_specs_base),
+    ('latex-base', _make_latex_specs_base),
 
     #
     # CATEGORY: latex-base-subsuperscripts
@@ -1860,22 +1874,22 @@ specs = [
     # matching the category of the same name in the latex walker's default
     # definitions (see pylatexenc.latexwalker._defaultspecs).
     #
-    ('latex-base-subsuperscripts', _latex_specs_subsuperscripts),
+    ('latex-base-subsuperscripts', _make_latex_specs_subsuperscripts),
 
     #
     # CATEGORY: latex-approximations
     #
-    ('latex-approximations', _latex_specs_approximations),
+    ('latex-approximations', _make_latex_specs_approximations),
 
     #
     # CATEGORY: latex-placeholders
     #
-    ('latex-placeholders', _latex_specs_placeholders),
+    ('latex-placeholders', _make_latex_specs_placeholders),
 
     #
     # CATEGORY: nonascii-specials
     #
-    ('nonascii-specials', {
+    ('nonascii-specials', lambda: {
         'macros': [],
         'environments': [],
         'specials': [
@@ -1892,8 +1906,8 @@ specs = [
     #
     # CATEGORY: advanced-symbols
     #
-    ('advanced-symbols', {
-        'macros': advanced_symbols_macros,
+    ('advanced-symbols', lambda: {
+        'macros': _make_advanced_symbols_macros(),
         'environments': [],
         'specials': [],
     }),
@@ -1903,7 +1917,7 @@ specs = [
     #
     # expect these to be removed in a future version.  These definitions should
     # be manually included in the applications where they are relevant.
-    ('latex-ethuebung', {
+    ('latex-ethuebung', lambda: {
         'macros': [
             MacroTextSpec('exercise', simplify_repl=_format_uebung),
             MacroTextSpec('uebung', simplify_repl=_format_uebung),
@@ -1921,7 +1935,7 @@ specs = [
     #
     # expect these to be removed in a future version.  These definitions should
     # be manually included in the applications where they are relevant.
-    ('nonstandard-qit', {
+    ('nonstandard-qit', lambda: {
         'environments': [],
         'specials': [],
         'macros': [
@@ -1978,25 +1992,24 @@ _greek_letters = (
     ('omega', u'\N{GREEK SMALL LETTER OMEGA}', u'\N{GREEK CAPITAL LETTER OMEGA}',),
 )
 
-def _add_greekletters(letterlist):
+def _add_greekletters(latex_specs_base, letterlist):
     for letterinfo in letterlist:
         l, small, capital = letterinfo
-        _latex_specs_base['macros'].append(
+        latex_specs_base['macros'].append(
             MacroTextSpec(l, small)
         )
-        _latex_specs_base['macros'].append(
+        latex_specs_base['macros'].append(
             MacroTextSpec(l[0].upper()+l[1:], capital)
         )
         # up-greek version (from packages such as upgreek or newtxmath)
-        _latex_specs_base['macros'].append(
+        latex_specs_base['macros'].append(
             MacroTextSpec("up"+l, small)
         )
-        _latex_specs_base['macros'].append(
+        latex_specs_base['macros'].append(
             MacroTextSpec("Up"+l, capital)
         )
 
-_add_greekletters(_greek_letters)
-_latex_specs_base['macros'] += [
+_make_greek_letter_variants = lambda: [
     MacroTextSpec('varepsilon', u'\N{GREEK SMALL LETTER EPSILON}'),
     MacroTextSpec('vartheta', u'\N{GREEK THETA SYMBOL}'),
     MacroTextSpec('varpi', u'\N{GREEK PI SYMBOL}'),
@@ -2078,11 +2091,10 @@ def _accent_formatter(combining):
 
     return formatter
 
-for u in unicode_accents_list:
-    (mname, mcombining) = u
-    _latex_specs_base['macros'].append(
-        MacroTextSpec(mname, _accent_formatter(mcombining))
-    )
-
-# specs structure now complete
+def _add_accents(latex_specs_base, accentlist):
+    for u in accentlist:
+        (mname, mcombining) = u
+        latex_specs_base['macros'].append(
+            MacroTextSpec(mname, _accent_formatter(mcombining))
+        )
 
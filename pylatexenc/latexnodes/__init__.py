@@ -64,6 +64,19 @@ from ._tokenreaderbase import (
 from ._tokenreader import (
     LatexTokenReader,
 )
+#__pragma__('skip')
+# These are only needed for specific uses (parsing streams and files,
+# pre-tokenization, node arenas and node indexes); import them on first use.
+from .. import _util
+_util.lazy_module_attributes(globals(), {
+    'LatexStreamTokenReader': '._tokenreaderstream',
+    'LatexTokenArray': '._tokenreaderpretok',
+    'LatexPreTokenizedTokenReader': '._tokenreaderpretok',
+    'LatexNodeArena': '._nodearena',
+    'LatexNodeArenaView': '._nodearena',
+    'LatexNodesIndex': '._nodesindex',
+})
+#__pragma__('noskip')
 
 from ._callablespecbase import (
     CallableSpecBase
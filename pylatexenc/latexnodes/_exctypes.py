@@ -85,6 +85,24 @@ class LatexWalkerLocatedError(LatexWalkerError):
        The column number where the error occurred in the line `lineno`, starting
        at 0.
 
+       If `lineno` and `colno` weren't provided to the constructor, they are
+       determined from `pos` when they are first accessed, using the callable
+       given as the `pos_to_lineno_colno` keyword argument to the constructor
+       or set with :py:meth:`set_pos_to_lineno_colno()`.
+
+    .. py:attribute:: open_contexts
+
+       A list of tuples `(what, pos, lineno, colno)` describing the LaTeX
+       blocks that were open when the error occurred (e.g. "environment
+       '{itemize}'").  Open contexts added with
+       :py:meth:`add_open_context_lazy()` are only formatted when this
+       attribute is accessed.
+
+    The full error message, including the location and the open contexts, is
+    only formatted when the exception is converted to a string (or when the
+    exception's `args` are accessed; ``e.args[0]`` is the full error message,
+    as in earlier versions of `pylatexenc`).
+
     .. py:attribute:: input_source
 
        The name of the source (e.g. file name) from which the LaTeX code was
@@ -112,48 +130,155 @@ class LatexWalkerLocatedError(LatexWalkerError):
         self.msg = msg
         self.s = s
         self.pos = pos
-        self.lineno = lineno
-        self.colno = colno
+        self._lineno = lineno
+        self._colno = colno
         self.error_type_info = error_type_info
-        self.open_contexts = kwargs.pop('open_contexts', [])
+        self._open_contexts = kwargs.pop('open_contexts', [])
+        self._pos_to_lineno_colno = kwargs.pop('pos_to_lineno_colno', None)
 
         if len(kwargs):
             raise ValueError("Unexpected keyword argument(s) to LatexWalkerLocatedError(): "
                              + repr(kwargs))
 
-        super(LatexWalkerLocatedError, self).__init__(
-            LatexWalkerLocatedErrorFormatter(self).to_display_string()
-        )
+        # The full error message (with the position and the open contexts) is
+        # only formatted when it is needed, see __str__() and `args`.  In
+        # tolerant parsing mode, most errors are never displayed.
+        super(LatexWalkerLocatedError, self).__init__(msg)
 
     def __str__(self):
         return LatexWalkerLocatedErrorFormatter(self).to_display_string()
 
+    #__pragma__('skip')
+    def _get_args(self):
+        if '_args' in self.__dict__:
+            return self._args
+        return (self.__str__(),)
+
+    def _set_args(self, args):
+        self._args = tuple(args)
+
+    args = property(_get_args, _set_args)
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__,
+                               ", ".join([ repr(a) for a in self.args ]))
+    #__pragma__('noskip')
+
+    def _get_lineno(self):
+        if self._lineno is None and self._colno is None:
+            self._resolve_lineno_colno()
+        return self._lineno
+
+    def _set_lineno(self, lineno):
+        self._lineno = lineno
+
+    lineno = property(_get_lineno, _set_lineno)
+
+    def _get_colno(self):
+        if self._lineno is None and self._colno is None:
+            self._resolve_lineno_colno()
+        return self._colno
+
+    def _set_colno(self, colno):
+        self._colno = colno
+
+    colno = property(_get_colno, _set_colno)
+
+    def _resolve_lineno_colno(self):
+        if self._pos_to_lineno_colno is None or self.pos is None \
+           or isinstance(self.pos, str):
+            return
+        self._lineno, self._colno = self._pos_to_lineno_colno(self.pos)
+
+    def _get_open_contexts(self):
+        if self._open_contexts is None:
+            return None
+        # resolve any open contexts that were added with
+        # add_open_context_lazy() or set_pos_or_add_open_context_from_node()
+        for j in range(len(self._open_contexts)):
+            context = self._open_contexts[j]
+            if isinstance(context, _LazyOpenContext):
+                self._open_contexts[j] = context.resolve()
+        return self._open_contexts
+
+    def _set_open_contexts(self, open_contexts):
+        self._open_contexts = open_contexts
+
+    open_contexts = property(_get_open_contexts, _set_open_contexts)
+
+    def set_pos_to_lineno_colno(self, pos_to_lineno_colno):
+        r"""
+        Set the callable that is used to determine the line and column numbers
+        `lineno` and `colno` from the position `pos`, if they weren't given
+        explicitly.  The callable is called with a position and must return a
+        tuple `(lineno, colno)`; it would typically be the latex walker's
+        :py:meth:`~pylatexenc.latexwalker.LatexWalker.pos_to_lineno_colno()`
+        method.
+
+        The line and column numbers are only determined when the `lineno` or
+        `colno` attributes are accessed (e.g., when the error message is
+        displayed).  The callable is not used if the line and column numbers
+        were given explicitly or were already determined.
+        """
+        self._pos_to_lineno_colno = pos_to_lineno_colno
+
+    def transfer_location_to(self, other):
+        r"""
+        Set the location information of the exception `other` (another
+        :py:class:`LatexWalkerLocatedError` instance) to that of this exception,
+        i.e., the position, the line and column numbers, and the open contexts.
+        Any information that is determined lazily (see
+        :py:meth:`set_pos_to_lineno_colno()` and
+        :py:meth:`add_open_context_lazy()`) is passed on as is and is not
+        determined by this method.
+        """
+        other.pos = self.pos
+        other._lineno = self._lineno
+        other._colno = self._colno
+        other._pos_to_lineno_colno = self._pos_to_lineno_colno
+        other._open_contexts = self._open_contexts
+
+    def add_open_context_lazy(self, what, pos, pos_to_lineno_colno=None):
+        r"""
+        Add an open context to `open_contexts`, whose line and column numbers
+        are only determined when the open contexts are accessed.  The
+        `pos_to_lineno_colno` callable (see :py:meth:`set_pos_to_lineno_colno()`)
+        defaults to the one that was set for this exception.
+
+        The argument `what` is a short description of the open context.  It
+        can also be a callable, which is called without arguments to obtain
+        the description when it is needed.
+        """
+        if pos_to_lineno_colno is None:
+            pos_to_lineno_colno = self._pos_to_lineno_colno
+        if self._open_contexts is None:
+            self._open_contexts = []
+        self._open_contexts.append(
+            _LazyOpenContext(what, pos, pos_to_lineno_colno)
+        )
+
     def set_pos_or_add_open_context_from_node(self, node, what=None):
         if node is None:
             return
 
         pos = node.pos
 
+        pos_to_lineno_colno = None
         if hasattr(node, 'latex_walker') and node.latex_walker \
            and hasattr(node.latex_walker, 'pos_to_lineno_colno'):
-            lineno, colno = node.latex_walker.pos_to_lineno_colno(pos)
-        else:
-            lineno, colno = None, None
+            pos_to_lineno_colno = node.latex_walker.pos_to_lineno_colno
 
         if what is None:
-            what = node.display_str()
+            what = node.display_str
 
         if self.pos is None:
             self.pos = pos
-            self.lineno = lineno
-            self.colno = colno
+            self._lineno = None
+            self._colno = None
+            self._pos_to_lineno_colno = pos_to_lineno_colno
             return
 
-        if self.open_contexts is None:
-            self.open_contexts = []
-        self.open_contexts.append(
-            (what, pos, lineno, colno)
-        )
+        self.add_open_context_lazy(what, pos, pos_to_lineno_colno)
 
     #
     # ### Problem: other_exception might have properties (e.g., from a
@@ -177,6 +302,25 @@ class LatexWalkerLocatedError(LatexWalkerError):
     #     return Cls(**d)
 
 
+class _LazyOpenContext(object):
+    # An entry in a LatexWalkerLocatedError's `open_contexts` list that is
+    # turned into a tuple `(what, pos, lineno, colno)` when it is accessed.
+    def __init__(self, what, pos, pos_to_lineno_colno):
+        super(_LazyOpenContext, self).__init__()
+        self.what = what
+        self.pos = pos
+        self.pos_to_lineno_colno = pos_to_lineno_colno
+
+    def resolve(self):
+        what = self.what
+        if callable(what):
+            what = what()
+        lineno, colno = None, None
+        if self.pos_to_lineno_colno is not None and self.pos is not None:
+            lineno, colno = self.pos_to_lineno_colno(self.pos)
+        return (what, self.pos, lineno, colno)
+
+
 class LatexWalkerParseError(LatexWalkerLocatedError):
     r"""
     Represents an error while LaTeX code, specifically while parsing the
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+r"""
+Helpers to parse LaTeX code without recursing on the Python call stack.
+
+Nested constructs (e.g. a group within a group within a group) are normally
+parsed by recursive calls: the nodes collector calls the latex walker's
+`parse_content()`, which calls the group parser's `parse()`, which calls
+`parse_content()` again for the group contents, which creates a new nodes
+collector, and so on.  Deeply nested LaTeX code can then exceed Python's
+recursion limit.
+
+The parsing methods involved in this recursion have a twin generator method
+(e.g. `LatexWalker._parse_content_iter()` next to
+`LatexWalker.parse_content()`), with the same code except that instead of
+calling the next parsing method directly, they yield a generator for the next
+call and receive its result back.  The :py:func:`run_iterative()` function
+runs such generators with an explicit stack.  Exceptions raised by a
+generator are thrown into the generator that is below it on the stack, so
+that they are handled exactly as they would have been with recursive calls.
+
+The generator methods are only used if the corresponding method wasn't
+reimplemented by a subclass; otherwise we call the reimplemented method
+directly (which might then recurse as usual).
+"""
+
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+
+def run_iterative(gen):
+    r"""
+    Run the generator `gen` and return its return value.
+
+    The generator may yield further generators, which are run (in the same
+    way) before `gen` is resumed with their return value, or with the
+    exception that they raised.
+    """
+    stack = [gen]
+    value = None
+    exc = None
+    while True:
+        g = stack[-1]
+        try:
+            if exc is not None:
+                e, exc = exc, None
+                child = g.throw(e)
+            else:
+                child = g.send(value)
+        except StopIteration as e:
+            stack.pop()
+            if not stack:
+                return e.value
+            value = e.value
+            continue
+        except Exception as e:
+            stack.pop()
+            if not stack:
+                raise
+            exc = e
+            continue
+        stack.append(child)
+        value = None
+
+
+def call_iter(fn, *args, **kwargs):
+    r"""
+    A generator that simply calls `fn(*args, **kwargs)` and returns its result.
+    """
+    return fn(*args, **kwargs)
+    yield # make this function a generator
+
+
+_reimplements_cache = {}
+
+def reimplements(obj, method_name, iter_method_name):
+    r"""
+    Return `True` if the class of `obj` reimplements the method `method_name`,
+    i.e., if a class in its MRO defines `method_name` before we encounter the
+    class that defines the twin generator method `iter_method_name`.
+    """
+    cls = type(obj)
+    key = (cls, method_name, iter_method_name)
+    try:
+        return _reimplements_cache[key]
+    except KeyError:
+        pass
+    result = True
+    for c in cls.__mro__:
+        if iter_method_name in c.__dict__:
+            result = False
+            break
+        if method_name in c.__dict__:
+            break
+    _reimplements_cache[key] = result
+    return result
+
+
+def parse_content_iter(latex_walker, parser, token_reader, parsing_state,
+                       open_context=None):
+    r"""
+    Return a generator for the call ``latex_walker.parse_content(parser,
+    token_reader=token_reader, parsing_state=parsing_state,
+    open_context=open_context)``.
+    """
+    if not reimplements(latex_walker, 'parse_content', '_parse_content_iter'):
+        return latex_walker._parse_content_iter(parser, token_reader, parsing_state,
+                                                open_context)
+    if open_context is None:
+        return call_iter(latex_walker.parse_content, parser,
+                         token_reader=token_reader, parsing_state=parsing_state)
+    return call_iter(latex_walker.parse_content, parser,
+                     token_reader=token_reader, parsing_state=parsing_state,
+                     open_context=open_context)
+
+
+def parser_parse_iter(parser, latex_walker, token_reader, parsing_state):
+    r"""
+    Return a generator for the call ``parser.parse(latex_walker=latex_walker,
+    token_reader=token_reader, parsing_state=parsing_state)``.
+    """
+    if not reimplements(parser, 'parse', '_parse_iter'):
+        return parser._parse_iter(latex_walker, token_reader, parsing_state)
+    return call_iter(parser.parse, latex_walker=latex_walker,
+                     token_reader=token_reader, parsing_state=parsing_state)
+
+
+def process_tokens_iter(collector):
+    r"""
+    Return a generator for the call ``collector.process_tokens()``.
+    """
+    if not reimplements(collector, 'process_tokens', '_process_tokens_iter') \
+       and not reimplements(collector, 'process_one_token', '_process_tokens_iter'):
+        return collector._process_tokens_iter()
+    return call_iter(collector.process_tokens)
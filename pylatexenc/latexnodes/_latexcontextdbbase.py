@@ -134,3 +134,28 @@ class LatexContextDbBase(object):
         then this method should return `None`.
         """
         return None
+
+    def get_specials_initial_chars(self):
+        r"""
+        Return the set of characters at which specials might start, i.e., the
+        collection of all first characters of specials that
+        :py:meth:`test_for_specials()` might recognize.  The return value can be
+        any object that supports the syntax ``if (c in initial_chars): ...``,
+        such as a string or a `frozenset`.
+
+        The token reader uses this information to skip over runs of ordinary
+        characters without having to call :py:meth:`test_for_specials()` at
+        every single character.
+
+        If the latex context database cannot tell which characters might start
+        specials, this method should return `None`, in which case
+        :py:meth:`test_for_specials()` is called at every character.  This is
+        what the default implementation does.
+
+        The parsing state stores the return value of this method when it is
+        created, so the collection of characters must not change afterwards.
+        If the latex context database has an attribute `frozen` (like
+        :py:class:`pylatexenc.macrospec.LatexContextDb`), this method is only
+        called if that attribute is `True`.
+        """
+        return None
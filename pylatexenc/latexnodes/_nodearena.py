@@ -0,0 +1,903 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+
+import logging
+logger = logging.getLogger(__name__)
+
+from ._parsedargs import ParsedArguments
+from .nodes import (
+    LatexCharsNode,
+    LatexGroupNode,
+    LatexCommentNode,
+    LatexMacroNode,
+    LatexEnvironmentNode,
+    LatexSpecialsNode,
+    LatexMathNode,
+    LatexNodeList,
+)
+
+
+# node types stored in the arena; the index in this tuple is the node's `kind`
+_node_kinds = (
+    LatexCharsNode,
+    LatexGroupNode,
+    LatexCommentNode,
+    LatexMacroNode,
+    LatexEnvironmentNode,
+    LatexSpecialsNode,
+    LatexMathNode,
+)
+
+_node_kind_codes = dict([ (nc, j) for j, nc in enumerate(_node_kinds) ])
+
+# node of some other type; the node object itself is kept in the arena
+_KIND_OTHER = len(_node_kinds)
+
+(_KIND_CHARS, _KIND_GROUP, _KIND_COMMENT, _KIND_MACRO, _KIND_ENVIRONMENT,
+ _KIND_SPECIALS, _KIND_MATH) = range(len(_node_kinds))
+
+
+def _node_name(kind, node):
+    # The value that is stored in the arena's `name_id` column for this node
+    # (interned in the arena's table of names)
+    if kind == _KIND_MACRO:
+        return node.macroname
+    if kind == _KIND_ENVIRONMENT:
+        return node.environmentname
+    if kind == _KIND_SPECIALS:
+        return node.specials_chars
+    if kind == _KIND_GROUP:
+        return _as_tuple(node.delimiters)
+    if kind == _KIND_MATH:
+        return (node.displaytype, _as_tuple(node.delimiters))
+    return None
+
+def _as_tuple(x):
+    if isinstance(x, list):
+        return tuple(x)
+    return x
+
+def _node_children(kind, node):
+    # The list of children [(arg_index, child node), ...] of this node: the
+    # nodes of its arguments followed by the nodes of its nodelist
+    children = []
+    if kind == _KIND_OTHER:
+        return children
+    nodeargd = getattr(node, 'nodeargd', None)
+    if nodeargd is not None and nodeargd.argnlist:
+        for k, a in enumerate(nodeargd.argnlist):
+            if a is None:
+                continue
+            if isinstance(a, (list, LatexNodeList)):
+                children.extend([ (k, c) for c in a if c is not None ])
+            else:
+                children.append( (k, a) )
+    nodelist = getattr(node, 'nodelist', None)
+    if nodelist is not None:
+        children.extend([ (-1, c) for c in nodelist if c is not None ])
+    return children
+
+def _kinds_for_node_type(node_type):
+    # The node kinds that match `node_type` as for `isNodeType()`
+    if node_type is None:
+        return list(range(len(_node_kinds)))
+    return [ kind for kind, nc in enumerate(_node_kinds)
+             if issubclass(nc, node_type) ]
+
+def _find_name_keys(name_keys, kinds, names):
+    # The keys `(kind, name)` of the mapping `name_keys` that match one of the
+    # given names for nodes of one of the given kinds.  A math node's name is
+    # `(displaytype, delimiters)`, but it is also matched by its display type
+    # alone.
+    keys = []
+    for kind in kinds:
+        for name in names:
+            key = (kind, name)
+            if key in name_keys:
+                keys.append(key)
+            elif kind == _KIND_MATH and name in ('inline', 'display'):
+                keys.extend([ k for k in name_keys
+                              if k[0] == _KIND_MATH and k[1][0] == name ])
+    return keys
+
+
+
+class LatexNodeArena(object):
+    r"""
+    A compact, columnar representation of a LaTeX node tree.
+
+    Instead of one :py:class:`~pylatexenc.latexnodes.nodes.LatexNode` object
+    per node, the arena stores one :py:mod:`array` of integers per node field
+    ("structure of arrays"), and each node is identified by its index in these
+    arrays.  The nodes are stored in document order (a parent node comes
+    before its children, which come before the parent's next sibling).  The
+    arrays are:
+
+    - `kind` -- the node type, as an index in :py:attr:`node_kinds`;
+
+    - `pos`, `pos_end` -- the node's position in the parsed string (`-1` if
+      the node's position is `None`);
+
+    - `parent`, `first_child`, `next_sibling` -- tree structure (`-1` if there
+      is no such node).  The children of a node are the nodes of its
+      arguments (see `arg_index`) followed by the nodes of its `nodelist`;
+
+    - `end_index` -- the index immediately after the node's last descendant,
+      so that the nodes in the range `index+1` to `end_index` are exactly the
+      descendants of the node at `index`;
+
+    - `arg_index` -- for a node that is an argument of its parent, the index
+      of the argument in the parent's `nodeargd.argnlist`, and `-1` for a node
+      in its parent's `nodelist`;
+
+    - `nargs` -- the length of the node's `nodeargd.argnlist` (`-1` if the node
+      has no `nodeargd`);
+
+    - `name_id` -- for macro, environment and specials nodes, the index in
+      :py:attr:`names` of the macro name, environment name or specials chars.
+      For group nodes, the name is the pair of delimiters, and for math nodes,
+      it is the pair `(displaytype, delimiters)`.  The same name for nodes of
+      different types gives different name id's.
+
+    - `spec_id`, `argspec_id`, `parsing_state_id` -- index in the arena's
+      table of shared objects of the node's `spec`, of the
+      `arguments_spec_list` of its `nodeargd`, and of its `parsing_state`.
+
+    Queries such as "all ``\cite`` macros" are answered by a scan of the
+    relevant array (see :py:meth:`find()`) rather than by walking a tree of
+    Python objects.  Use :py:meth:`node()` to obtain a lightweight
+    :py:class:`LatexNodeArenaView` object that exposes the familiar node API
+    (`macroname`, `nodelist`, `nodeargd`, `latex_verbatim()`, ...) for a
+    given node index.
+
+    An arena is usually created by
+    :py:meth:`pylatexenc.latexwalker.LatexWalker.parse_content_to_arena()`,
+    which records the nodes as they are created by the latex walker's
+    :py:meth:`~pylatexenc.latexwalker.LatexWalker.make_node()` method.  You
+    can also store an existing node tree in an arena with
+    :py:meth:`from_nodes()`.  In both cases, nodes are first added with
+    :py:meth:`add_node()`, after their children, and the arena is then
+    finalized with :py:meth:`finalize()`, which keeps only the nodes that are
+    part of the final tree and puts them in document order.
+
+    Node data that cannot be stored in the arrays is kept in a dictionary of
+    extra fields, e.g. the `chars` of a chars node that differ from the parsed
+    string between `pos` and `pos_end`, or a comment node's text.  Nodes of a
+    type other than the standard node types are kept as they are; their
+    children are not stored in the arena.  The
+    :py:class:`~pylatexenc.latexnodes.ParsedArguments` objects of nodes are
+    not kept; views reconstruct a plain
+    :py:class:`~pylatexenc.latexnodes.ParsedArguments` instance from the
+    stored arguments.
+
+    If `keep_nodes` is `True`, then the arena keeps the node objects of the
+    final tree (in document order), and :py:meth:`node()` returns the node
+    objects themselves instead of views.  This is useful to look up the nodes
+    of an existing node tree by position (see :py:meth:`node_at_pos()` and
+    :py:meth:`nodes_overlapping()`) without keeping a separate structure.
+    """
+
+    node_kinds = _node_kinds
+
+    _columns = (
+        'kind', 'pos', 'pos_end', 'parent', 'first_child', 'next_sibling',
+        'end_index', 'arg_index', 'nargs', 'name_id', 'spec_id', 'argspec_id',
+        'parsing_state_id',
+    )
+
+    def __init__(self, latex_walker=None, keep_nodes=False):
+        super(LatexNodeArena, self).__init__()
+
+        self.latex_walker = latex_walker
+        self.keep_nodes = keep_nodes
+
+        self.kind = array.array('b')
+        for col in self._columns[1:]:
+            setattr(self, col, array.array('l'))
+
+        self.names = []
+        self._name_ids = {}
+        self._objects = []
+        self._object_ids = {}
+
+        # {node index: {field: value}}
+        self._extra = {}
+
+        # while nodes are being added: {id(node): node index}, along with the
+        # node objects themselves so that their id's can't be reused
+        self._node_index = {}
+        self._added_nodes = []
+        # list of children [(arg_index, child index), ...] of each node
+        self._node_children = []
+
+        # node objects in document order, if keep_nodes=True
+        self._nodes = None
+
+        # whether the `pos` array is sorted (checked when first needed)
+        self._pos_sorted = None
+
+        self.finalized = False
+
+    def __len__(self):
+        return len(self.kind)
+
+    @classmethod
+    def from_nodes(cls, nodes, latex_walker=None, keep_nodes=False):
+        r"""
+        Create an arena that stores the node tree `nodes` (a node, or a list of
+        nodes such as a :py:class:`~pylatexenc.latexnodes.nodes.LatexNodeList`).
+
+        If `latex_walker` is `None`, the latex walker of the first node is used
+        (it is used to obtain the parsed string).  See the class documentation
+        for `keep_nodes`.
+        """
+        if latex_walker is None:
+            first_nodes = nodes if isinstance(nodes, (list, LatexNodeList)) else [nodes]
+            for n in first_nodes:
+                if n is not None and n.latex_walker is not None:
+                    latex_walker = n.latex_walker
+                    break
+        arena = cls(latex_walker=latex_walker, keep_nodes=keep_nodes)
+        arena.finalize(nodes)
+        return arena
+
+    # ---
+
+    def add_node(self, node):
+        r"""
+        Add the node object `node` to the arena, and return its (temporary)
+        index.  Any children of `node` that haven't been added yet are added
+        first.  Nodes can't be added after the arena has been finalized.
+        """
+        if self.finalized:
+            raise ValueError("Can't add nodes to a finalized LatexNodeArena")
+
+        node_index = self._node_index
+        i = node_index.get(id(node), None)
+        if i is not None:
+            return i
+
+        kind = _node_kind_codes.get(node.nodeType(), _KIND_OTHER)
+        children = _node_children(kind, node)
+        if all( id(c) in node_index for k, c in children ):
+            # usual case, e.g. when nodes are recorded as they are created
+            return self._add_single_node(node, kind, children)
+
+        # Add any children that are missing first, without recursing (nodes
+        # might be deeply nested)
+        stack = [ (node, kind, children) ]
+        while stack:
+            n, nkind, nchildren = stack[-1]
+            missing = [ c for k, c in nchildren if id(c) not in node_index ]
+            if not missing:
+                stack.pop()
+                if id(n) not in node_index:
+                    self._add_single_node(n, nkind, nchildren)
+                continue
+            for c in reversed(missing):
+                ckind = _node_kind_codes.get(c.nodeType(), _KIND_OTHER)
+                stack.append( (c, ckind, _node_children(ckind, c)) )
+
+        return node_index[id(node)]
+
+    def _intern_object(self, obj):
+        if obj is None:
+            return -1
+        j = self._object_ids.get(id(obj), None)
+        if j is None:
+            j = len(self._objects)
+            self._objects.append(obj)
+            self._object_ids[id(obj)] = j
+        return j
+
+    def _intern_name(self, kind, name):
+        if name is None:
+            return -1
+        key = (kind, name)
+        j = self._name_ids.get(key, None)
+        if j is None:
+            j = len(self.names)
+            self.names.append(name)
+            self._name_ids[key] = j
+        return j
+
+    def _add_single_node(self, node, kind, children):
+
+        i = len(self.kind)
+        self._node_index[id(node)] = i
+        self._added_nodes.append(node)
+
+        self.kind.append(kind)
+        self.pos.append(node.pos if node.pos is not None else -1)
+        self.pos_end.append(node.pos_end if node.pos_end is not None else -1)
+        self.parsing_state_id.append(self._intern_object(node.parsing_state))
+
+        node_index = self._node_index
+        self._node_children.append([ (k, node_index[id(c)]) for k, c in children ])
+
+        if kind == _KIND_OTHER:
+            self.nargs.append(-1)
+            self.name_id.append(-1)
+            self.spec_id.append(-1)
+            self.argspec_id.append(-1)
+            self._extra[i] = {'node': node}
+            return i
+
+        self.name_id.append(self._intern_name(kind, _node_name(kind, node)))
+        self.spec_id.append(self._intern_object(getattr(node, 'spec', None)))
+
+        nodeargd = getattr(node, 'nodeargd', None)
+        if nodeargd is not None:
+            self.nargs.append(len(nodeargd.argnlist))
+            self.argspec_id.append(self._intern_object(nodeargd.arguments_spec_list))
+        else:
+            self.nargs.append(-1)
+            self.argspec_id.append(-1)
+
+        extra = {}
+        if kind == _KIND_CHARS:
+            chars = node.chars
+            if not self._matches_source(chars, node.pos, node.pos_end):
+                extra['chars'] = chars
+        elif kind == _KIND_COMMENT:
+            extra['comment'] = node.comment
+            extra['comment_post_space'] = node.comment_post_space
+        elif kind == _KIND_MACRO:
+            if node.macro_post_space:
+                extra['macro_post_space'] = node.macro_post_space
+
+        if nodeargd is not None:
+            list_args = [ k for k, a in enumerate(nodeargd.argnlist)
+                          if isinstance(a, (list, LatexNodeList)) ]
+            if list_args:
+                extra['list_args'] = frozenset(list_args)
+        if getattr(node, 'nodelist', None) is None \
+           and kind in (_KIND_GROUP, _KIND_ENVIRONMENT, _KIND_MATH):
+            extra['nodelist_is_none'] = True
+
+        if extra:
+            self._extra[i] = extra
+
+        return i
+
+    def _matches_source(self, chars, pos, pos_end):
+        if self.latex_walker is None:
+            return False
+        s = self.latex_walker.s
+        return (
+            isinstance(s, str) and isinstance(chars, str)
+            and pos is not None and pos_end is not None
+            and len(chars) == pos_end - pos
+            and s.startswith(chars, pos)
+        )
+
+    def finalize(self, nodes):
+        r"""
+        Finalize the arena, given the final parsed node or node list `nodes`.
+
+        Nodes that are not part of the tree rooted at `nodes` (e.g., nodes that
+        were created while parsing but that were discarded) are dropped, and the
+        remaining nodes are put in document order.  The references to the node
+        objects that were kept while nodes were being added are released.
+        """
+        if self.finalized:
+            raise ValueError("LatexNodeArena is already finalized")
+
+        if nodes is None:
+            nodes = []
+        elif not isinstance(nodes, (list, LatexNodeList)):
+            nodes = [ nodes ]
+        roots = [ self.add_node(n) for n in nodes if n is not None ]
+
+        # Pre-order traversal.  A node that appears more than once in the tree
+        # is only stored the first time it is encountered.
+        node_children = self._node_children
+        visited = bytearray(len(self.kind))
+        order = []
+        parent = array.array('l')
+        arg_index = array.array('l')
+        end_index = array.array('l')
+        stack = [ (r, -1, -1) for r in reversed(roots) ]
+        while stack:
+            i, p, k = stack.pop()
+            if i < 0:
+                # marker for the end of the descendants of node -i-1
+                end_index[-i-1] = len(order)
+                continue
+            if visited[i]:
+                continue
+            visited[i] = 1
+            new_i = len(order)
+            order.append(i)
+            parent.append(p)
+            arg_index.append(k)
+            end_index.append(-1)
+            stack.append( (-new_i-1, None, None) )
+            for kk, c in reversed(node_children[i]):
+                stack.append( (c, new_i, kk) )
+
+        remap = array.array('l', [-1]) * len(self.kind)
+        for new_i, old_i in enumerate(order):
+            remap[old_i] = new_i
+
+        for col in ('kind', 'pos', 'pos_end', 'nargs', 'name_id', 'spec_id',
+                    'argspec_id', 'parsing_state_id'):
+            old = getattr(self, col)
+            setattr(self, col, array.array(old.typecode, [ old[o] for o in order ]))
+
+        self.parent = parent
+        self.arg_index = arg_index
+        self.end_index = end_index
+
+        n = len(order)
+        first_child = array.array('l', [-1]) * n
+        next_sibling = array.array('l', [-1]) * n
+        last_child = {}
+        for j in range(n):
+            p = parent[j]
+            if p == -1:
+                continue
+            if first_child[p] == -1:
+                first_child[p] = j
+            else:
+                next_sibling[last_child[p]] = j
+            last_child[p] = j
+        self.first_child = first_child
+        self.next_sibling = next_sibling
+
+        self._extra = dict([
+            (remap[i], extra)
+            for i, extra in self._extra.items()
+            if remap[i] != -1
+        ])
+        self.roots = [ j for j in range(n) if parent[j] == -1 ]
+
+        if self.keep_nodes:
+            added_nodes = self._added_nodes
+            self._nodes = [ added_nodes[o] for o in order ]
+
+        self._node_index = None
+        self._added_nodes = None
+        self._node_children = None
+        self.finalized = True
+
+    # ---
+
+    def find(self, node_type=None, name=None):
+        r"""
+        Return the list of the indices, in document order, of all nodes of the
+        given `node_type` (a node class, such as
+        :py:class:`~pylatexenc.latexnodes.nodes.LatexMacroNode`, including
+        nodes of subclasses of that type as for `isNodeType()`) and with the
+        given `name` (e.g., the macro name, see the `name_id` array).
+
+        If `node_type` is `None`, nodes of all types are considered, and if
+        `name` is `None`, nodes of the given type with any name are returned.
+        Nodes of a type other than the standard node types are only returned
+        if both `node_type` and `name` are `None`.
+
+        The `name` may also be a list or a set of names, in which case nodes with
+        any of these names are returned.  A math node is also found by its
+        display type alone (`'inline'` or `'display'`).
+
+        Each query scans the arena's arrays.  To run many queries on a tree of
+        node objects, see also :py:class:`~pylatexenc.latexnodes.LatexNodesIndex`,
+        which finds nodes with the same `node_type` and `name` semantics.
+        """
+        if name is not None:
+            if isinstance(name, (list, set, frozenset)):
+                names = name
+            else:
+                names = [ name ]
+            name_ids = [
+                self._name_ids[key]
+                for key in _find_name_keys(self._name_ids,
+                                           _kinds_for_node_type(node_type), names)
+            ]
+            if not name_ids:
+                return []
+            if len(name_ids) == 1:
+                return self._scan(self.name_id, name_ids[0])
+            return self._scan_any(self.name_id, name_ids)
+
+        if node_type is None:
+            return list(range(len(self.kind)))
+
+        kinds = _kinds_for_node_type(node_type)
+        if len(kinds) == 1:
+            return self._scan(self.kind, kinds[0])
+        return self._scan_any(self.kind, kinds)
+
+    def _scan(self, col, value):
+        return list(compress(range(len(col)), map(value.__eq__, col)))
+
+    def _scan_any(self, col, values):
+        values = frozenset(values)
+        return list(compress(range(len(col)), map(values.__contains__, col)))
+
+    def spans(self, indices):
+        r"""
+        Return a list of tuples `(pos, pos_end)` for the nodes with the given
+        indices.
+        """
+        pos, pos_end = self.pos, self.pos_end
+        return [ (pos[i], pos_end[i]) for i in indices ]
+
+    def name(self, i):
+        r"""
+        Return the name of the node at index `i` (see the `name_id` array), or
+        `None`.
+        """
+        nid = self.name_id[i]
+        if nid == -1:
+            return None
+        return self.names[nid]
+
+    def children(self, i):
+        r"""
+        Return the list of indices of the children of the node at index `i`.
+        """
+        children = []
+        c = self.first_child[i]
+        next_sibling = self.next_sibling
+        while c != -1:
+            children.append(c)
+            c = next_sibling[c]
+        return children
+
+    def argument(self, i, k):
+        r"""
+        Return the index of the node that is the argument number `k` of the node
+        at index `i` (i.e., `nodeargd.argnlist[k]`; `k` may be negative), or
+        `-1` if this argument is absent.  If the argument is a list of nodes,
+        the index of the first node of the list is returned.
+        """
+        nargs = self.nargs[i]
+        if k < 0:
+            k += nargs
+        if k < 0 or k >= nargs:
+            return -1
+        arg_index = self.arg_index
+        for c in self.children(i):
+            if arg_index[c] == k:
+                return c
+        return -1
+
+    def latex_verbatim(self, i):
+        r"""
+        Return the LaTeX code that the node at index `i` represents.
+        """
+        return self.latex_walker.s[self.pos[i] : self.pos_end[i]]
+
+    def node(self, i):
+        r"""
+        Return a :py:class:`LatexNodeArenaView` for the node at index `i`.  For a
+        node of a type other than the standard node types, or if the arena was
+        created with `keep_nodes=True`, the node object itself is returned.
+        """
+        if self._nodes is not None:
+            return self._nodes[i]
+        if self.kind[i] == _KIND_OTHER:
+            return self._extra[i]['node']
+        return LatexNodeArenaView(self, i)
+
+    def nodes(self, indices=None):
+        r"""
+        Return a list of node views (see :py:meth:`node()`) for the given
+        indices, or for the root nodes if `indices` is `None`.
+        """
+        if indices is None:
+            indices = self.roots
+        return [ self.node(i) for i in indices ]
+
+    def ancestors(self, i):
+        r"""
+        Return the list of indices of the ancestors of the node at index `i`,
+        starting with a root node and ending with `i` itself.
+        """
+        chain = []
+        parent = self.parent
+        while i != -1:
+            chain.append(i)
+            i = parent[i]
+        chain.reverse()
+        return chain
+
+    def node_at_pos(self, pos):
+        r"""
+        Return the chain of nodes that contain the position `pos` (i.e.,
+        `node.pos <= pos < node.pos_end`), as a list of node indices that starts
+        with a root node and ends with the innermost node that contains `pos`.
+        An empty list is returned if no node contains `pos`.
+
+        The nodes are found by bisection in the `pos` array (nodes in document
+        order are sorted by position), followed by a walk up the node's
+        ancestors.
+        """
+        if not self._check_pos_sorted():
+            containing = [ i for i in range(len(self.kind))
+                           if self.pos[i] != -1 and self.pos[i] <= pos < self.pos_end[i] ]
+            if not containing:
+                return []
+            return self.ancestors(max(containing, key=self._depth))
+
+        # The innermost node that contains `pos` is an ancestor of (or is) the
+        # last node that starts at or before `pos`
+        i = bisect_right(self.pos, pos) - 1
+        pos_end = self.pos_end
+        parent = self.parent
+        while i != -1 and not (pos < pos_end[i]):
+            i = parent[i]
+        if i == -1:
+            return []
+        return self.ancestors(i)
+
+    def nodes_overlapping(self, start, end):
+        r"""
+        Return the indices, in document order, of all the nodes that overlap
+        with the range of positions from `start` to `end` (i.e., `node.pos <
+        end` and `node.pos_end > start`).  This includes the ancestors of any
+        such node.  If `start == end`, the nodes that contain `start` but that
+        don't start at `start` are returned.  If `end < start`, an empty list
+        is returned.
+        """
+        if end < start:
+            return []
+        pos = self.pos
+        pos_end = self.pos_end
+
+        if not self._check_pos_sorted():
+            return [ i for i in range(len(self.kind))
+                     if pos[i] != -1 and pos[i] < end and pos_end[i] > start ]
+
+        # nodes that start before `start` overlap with the range if they
+        # contain `start`
+        result = [ i for i in self.node_at_pos(start) if pos[i] < start ]
+        # all nodes that start within the range overlap with it, except for
+        # empty nodes at `start`
+        lo = bisect_left(pos, start)
+        hi = bisect_left(pos, end)
+        result += [ i for i in range(lo, hi) if pos_end[i] > start ]
+        return result
+
+    def _check_pos_sorted(self):
+        # Nodes in document order are sorted by position, unless some nodes
+        # have no position or some (custom) parser produced unusual positions.
+        # In that case, we fall back to a linear search.
+        if self._pos_sorted is None:
+            pos = self.pos
+            self._pos_sorted = (
+                (len(pos) == 0 or pos[0] != -1)
+                and all( pos[i] <= pos[i+1] for i in range(len(pos)-1) )
+            )
+        return self._pos_sorted
+
+    def _depth(self, i):
+        return len(self.ancestors(i))
+
+    def _get_extra(self, i, field, default):
+        extra = self._extra.get(i, None)
+        if extra is None:
+            return default
+        return extra.get(field, default)
+
+    def _get_object(self, j):
+        if j == -1:
+            return None
+        return self._objects[j]
+
+
+
+class LatexNodeArenaView(object):
+    r"""
+    A lightweight view on the node at index `index` of the
+    :py:class:`LatexNodeArena` `arena`, that exposes the usual API of the
+    corresponding :py:class:`~pylatexenc.latexnodes.nodes.LatexNode` type.
+
+    The node's attributes are read from the arena's arrays when they are
+    accessed.  Child nodes (e.g., in `nodelist` or in `nodeargd.argnlist`) are
+    returned as new view objects.  Two views are equal if they refer to the
+    same node of the same arena.
+
+    Accessing an attribute that doesn't exist for this node type raises an
+    `AttributeError`.
+    """
+
+    __slots__ = ('arena', 'index',)
+
+    def __init__(self, arena, index):
+        super(LatexNodeArenaView, self).__init__()
+        self.arena = arena
+        self.index = index
+
+    def nodeType(self):
+        return _node_kinds[self.arena.kind[self.index]]
+
+    def isNodeType(self, t):
+        return issubclass(self.nodeType(), t)
+
+    @property
+    def pos(self):
+        pos = self.arena.pos[self.index]
+        return pos if pos != -1 else None
+
+    @property
+    def pos_end(self):
+        pos_end = self.arena.pos_end[self.index]
+        return pos_end if pos_end != -1 else None
+
+    @property
+    def len(self):
+        if self.pos is None or self.pos_end is None:
+            return None
+        return self.pos_end - self.pos
+
+    @property
+    def latex_walker(self):
+        return self.arena.latex_walker
+
+    @property
+    def parsing_state(self):
+        return self.arena._get_object(self.arena.parsing_state_id[self.index])
+
+    @property
+    def parent(self):
+        r"""
+        A view of the parent node, or `None` for a root node.
+        """
+        p = self.arena.parent[self.index]
+        if p == -1:
+            return None
+        return self.arena.node(p)
+
+    def latex_verbatim(self):
+        return self.arena.latex_verbatim(self.index)
+
+    def _name_for(self, kind):
+        if self.arena.kind[self.index] != kind:
+            raise AttributeError(
+                "{} has no such attribute".format(self.nodeType().__name__)
+            )
+        return self.arena.name(self.index)
+
+    def _check_kinds(self, kinds, attrname):
+        if self.arena.kind[self.index] not in kinds:
+            raise AttributeError(
+                "{} has no attribute ‘{}’".format(self.nodeType().__name__, attrname)
+            )
+
+    @property
+    def macroname(self):
+        return self._name_for(_KIND_MACRO)
+
+    @property
+    def environmentname(self):
+        return self._name_for(_KIND_ENVIRONMENT)
+
+    @property
+    def specials_chars(self):
+        return self._name_for(_KIND_SPECIALS)
+
+    @property
+    def delimiters(self):
+        kind = self.arena.kind[self.index]
+        if kind == _KIND_MATH:
+            return self.arena.name(self.index)[1]
+        return self._name_for(_KIND_GROUP)
+
+    @property
+    def displaytype(self):
+        return self._name_for(_KIND_MATH)[0]
+
+    @property
+    def chars(self):
+        self._check_kinds((_KIND_CHARS,), 'chars')
+        chars = self.arena._get_extra(self.index, 'chars', None)
+        if chars is None:
+            chars = self.arena.latex_verbatim(self.index)
+        return chars
+
+    @property
+    def comment(self):
+        self._check_kinds((_KIND_COMMENT,), 'comment')
+        return self.arena._get_extra(self.index, 'comment', None)
+
+    @property
+    def comment_post_space(self):
+        self._check_kinds((_KIND_COMMENT,), 'comment_post_space')
+        return self.arena._get_extra(self.index, 'comment_post_space', '')
+
+    @property
+    def macro_post_space(self):
+        self._check_kinds((_KIND_MACRO,), 'macro_post_space')
+        return self.arena._get_extra(self.index, 'macro_post_space', '')
+
+    @property
+    def spec(self):
+        self._check_kinds((_KIND_MACRO, _KIND_ENVIRONMENT, _KIND_SPECIALS), 'spec')
+        return self.arena._get_object(self.arena.spec_id[self.index])
+
+    @property
+    def nodelist(self):
+        self._check_kinds((_KIND_GROUP, _KIND_ENVIRONMENT, _KIND_MATH), 'nodelist')
+        arena = self.arena
+        if arena._get_extra(self.index, 'nodelist_is_none', False):
+            return None
+        arg_index = arena.arg_index
+        return [ arena.node(c) for c in arena.children(self.index)
+                 if arg_index[c] == -1 ]
+
+    @property
+    def nodeargd(self):
+        self._check_kinds((_KIND_MACRO, _KIND_ENVIRONMENT, _KIND_SPECIALS), 'nodeargd')
+        arena = self.arena
+        i = self.index
+        nargs = arena.nargs[i]
+        if nargs == -1:
+            return None
+        list_args = arena._get_extra(i, 'list_args', frozenset())
+        argnlist = [ ([] if k in list_args else None) for k in range(nargs) ]
+        arg_index = arena.arg_index
+        for c in arena.children(i):
+            k = arg_index[c]
+            if k == -1:
+                continue
+            if k in list_args:
+                argnlist[k].append(arena.node(c))
+            else:
+                argnlist[k] = arena.node(c)
+        return ParsedArguments(
+            argnlist=argnlist,
+            arguments_spec_list=arena._get_object(arena.argspec_id[i]),
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, LatexNodeArenaView)
+            and other.arena is self.arena
+            and other.index == self.index
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash( (id(self.arena), self.index) )
+
+    def __repr__(self):
+        return "{}({}[{}] @ {}:{})".format(
+            self.__class__.__name__, self.nodeType().__name__, self.index,
+            self.pos, self.pos_end,
+        )
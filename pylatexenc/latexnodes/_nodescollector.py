@@ -40,6 +40,10 @@ from ._parsingstatedelta import (
     get_updated_parsing_state_from_delta,
 )
 
+#__pragma__('skip')
+from . import _iterativeparse
+#__pragma__('noskip')
+
 
 class LatexNodesCollector(object):
     r"""
@@ -59,6 +63,15 @@ class LatexNodesCollector(object):
     :py:meth:`process_tokens()`, as well as the :py:meth:`get_final_nodelist()`
     (and some other friends, see docs below).
 
+    If `read_char_runs` is `True`, then runs of ordinary characters are read
+    from the token reader as single 'char' tokens (see
+    :py:meth:`LatexTokenReaderBase.peek_token_char_run()`) rather than one
+    token per character.  This is much faster for text-heavy content.  The
+    `stop_token_condition` then sees such runs as a single token, so it should
+    not rely on inspecting individual 'char' tokens.  If `read_char_runs` is
+    `None` (the default), then runs of characters are read only if no
+    `stop_token_condition` is set.
+
 
     .. versionadded:: 3.0
     
@@ -101,6 +114,7 @@ class LatexNodesCollector(object):
                  stop_nodelist_condition=None,
                  make_child_parsing_state=None,
                  include_stop_token_pre_space_chars=True,
+                 read_char_runs=None,
                  ):
 
         super(LatexNodesCollector, self).__init__()
@@ -113,6 +127,11 @@ class LatexNodesCollector(object):
 
         self.include_stop_token_pre_space_chars = include_stop_token_pre_space_chars
 
+        if read_char_runs is None:
+            # a stop condition might want to inspect individual chars
+            read_char_runs = (stop_token_condition is None)
+        self.read_char_runs = read_char_runs
+
         self._stop_token_condition_met = False
         # the token that caused the condition to be met:
         self._stop_token_condition_met_token = None
@@ -129,13 +148,20 @@ class LatexNodesCollector(object):
         # a node list that we are building
         self._nodelist = []
 
-        # characters that we are accumulating
+        # characters that we are accumulating.  We keep a list of strings that
+        # we join only once when creating the chars node, to avoid repeated
+        # string concatenation for long runs of text
         self._pending_chars_pos = None
-        self._pending_chars = ''
+        self._pending_chars_list = []
+        self._pending_chars_len = 0
 
         # whether finalize() was called or not
         self._finalized = False
 
+        # set while running _process_tokens_iter(), see _parse_child_content()
+        self._iterative_children = False
+        self._deferred_child_content = None
+
         # override custom function to make the child parsing state
         self._make_child_parsing_state_fn = make_child_parsing_state
 
@@ -295,7 +321,9 @@ class LatexNodesCollector(object):
         have seen that will have to be collected into a chars node once we
         encounter anything other than a regular char.
         """
-        self._pending_chars += chars
+        if chars:
+            self._pending_chars_list.append(chars)
+            self._pending_chars_len += len(chars)
         if self._pending_chars_pos is None:
             self._pending_chars_pos = pos
 
@@ -307,12 +335,17 @@ class LatexNodesCollector(object):
         calls to `push_pending_chars()`.  Adds the chars node to the node list,
         and clears the pending chars string.
         """
-        if not self._pending_chars:
+        if not self._pending_chars_len:
             # no pending chars to flush
             return None
 
-        charspos, chars = self._pending_chars_pos, self._pending_chars
-        self._pending_chars = ''
+        charspos = self._pending_chars_pos
+        if len(self._pending_chars_list) == 1:
+            chars = self._pending_chars_list[0]
+        else:
+            chars = "".join(self._pending_chars_list)
+        self._pending_chars_list = []
+        self._pending_chars_len = 0
         self._pending_chars_pos = None
 
         strnode = self.latex_walker.make_node(
@@ -414,41 +447,112 @@ class LatexNodesCollector(object):
         """
 
         try:
+            self._process_tokens_loop(None)
+        finally:
+            self._finalize_after_processing_tokens()
+
+    #__pragma__('skip')
+    def _process_tokens_iter(self):
+        # Same as process_tokens(), as a generator for
+        # _iterativeparse.run_iterative().  Child content that would be parsed
+        # recursively by parse_latex_group() and parse_math() is yielded to
+        # the caller instead.
+
+        try:
+            self._iterative_children = True
+            child_content = self._process_tokens_loop(None)
+            while child_content is not None:
+                parser, parsing_state, then_fn = child_content
+                result, parsing_state_delta = \
+                    yield _iterativeparse.parse_content_iter(
+                        self.latex_walker,
+                        parser,
+                        token_reader=self.token_reader,
+                        parsing_state=parsing_state,
+                    )
+                child_content = self._process_tokens_loop(
+                    (then_fn, result, parsing_state_delta)
+                )
+        finally:
+            self._iterative_children = False
+            self._deferred_child_content = None
+            self._finalize_after_processing_tokens()
+    #__pragma__('noskip')
+
+    def _process_tokens_loop(self, child_result):
+        # Process tokens until we reach the end of the stream or a stopping
+        # condition is met, and return None.  If `child_result` is not None, it
+        # is a tuple `(then_fn, result, parsing_state_delta)` of child content
+        # that was parsed by the caller, which we first hand over to
+        # `then_fn`.  Within _process_tokens_iter(), we return early with a
+        # tuple `(parser, parsing_state, then_fn)` when process_one_token()
+        # asks for child content to be parsed by the caller (see
+        # _parse_child_content()).
+
+        try:
+            if child_result is not None:
+                then_fn, result, parsing_state_delta = child_result
+                then_fn(result, parsing_state_delta)
+
             while True:
                 self.process_one_token()
+                child_content = self._deferred_child_content
+                if child_content is not None:
+                    self._deferred_child_content = None
+                    return child_content
 
         except LatexNodesCollector.ReachedStoppingCondition as e:
             # all good! We finished collecting our node list.
             self._stop_condition_stop_data = e.stop_data
             logger.debug("nodes collector process_tokens() reached stop condition")
-            return
+            return None
 
         except LatexNodesCollector.ReachedEndOfStream as e:
             # all good!  We reached the end of the input.  Note that any final
             # space has already been included into a chars node in the nodelist.
             self._reached_end_of_stream = True
             logger.debug("nodes collector process_tokens() reached end of stream")
-            return
+            return None
 
         except LatexWalkerError as e:
             # we got an error! We'll let whoever called us process this
             logger.debug("process_tokens() - relaying error -- %r", e)
             raise
 
-        finally:
-            try:
-                self.finalize()
-            except LatexNodesCollector.ReachedStoppingCondition as e:
-                # The pending characters that finalize() flushed into a chars
-                # node completed the node list and met the stopping condition.
-                # That's a normal way for the collection to end, not an error to
-                # report to whoever called us.  (This happens e.g. with a
-                # `stop_nodelist_condition` that is met by a chars node that
-                # runs until the end of the stream.)
-                self._stop_condition_stop_data = e.stop_data
-                logger.debug("nodes collector reached stop condition while finalizing")
-
+    def _finalize_after_processing_tokens(self):
+        try:
+            self.finalize()
+        except LatexNodesCollector.ReachedStoppingCondition as e:
+            # The pending characters that finalize() flushed into a chars
+            # node completed the node list and met the stopping condition.
+            # That's a normal way for the collection to end, not an error to
+            # report to whoever called us.  (This happens e.g. with a
+            # `stop_nodelist_condition` that is met by a chars node that
+            # runs until the end of the stream.)
+            self._stop_condition_stop_data = e.stop_data
+            logger.debug("nodes collector reached stop condition while finalizing")
+
+    def _parse_child_content(self, parser, parsing_state, then_fn, method_name):
+        # Parse child content with `parser` and call then_fn(result,
+        # parsing_state_delta).  Within _process_tokens_iter(), the parsing is
+        # left to the caller, unless the calling method `method_name` was
+        # reimplemented (it might expect the child content to be parsed by the
+        # time this method returns).
+
+        #__pragma__('skip')
+        if self._iterative_children \
+           and not _iterativeparse.reimplements(self, method_name,
+                                                '_process_tokens_iter'):
+            self._deferred_child_content = (parser, parsing_state, then_fn)
+            return
+        #__pragma__('noskip')
 
+        result, parsing_state_delta = self.latex_walker.parse_content(
+            parser,
+            token_reader=self.token_reader,
+            parsing_state=parsing_state,
+        )
+        then_fn(result, parsing_state_delta)
 
 
     def process_one_token(self):
@@ -496,13 +600,12 @@ class LatexNodesCollector(object):
         latex_walker = self.latex_walker
         token_reader = self.token_reader
 
-        try:
+        tok = token_reader.next_token_or_eos(parsing_state=self.parsing_state,
+                                             char_run=self.read_char_runs)
+        logger.debug("nodes collector read token %r", tok)
 
-            tok = token_reader.next_token(parsing_state=self.parsing_state)
-            logger.debug("nodes collector read token %r", tok)
-
-        except LatexWalkerEndOfStream as e:
-            final_space = getattr(e, 'final_space') if hasattr(e, 'final_space') else None
+        if tok.tok == 'end_of_stream':
+            final_space = tok.pre_space
             if final_space:
                 # process the final space as an extra char token
                 final_space_pos = token_reader.cur_pos()+len(final_space)
@@ -554,8 +657,10 @@ class LatexNodesCollector(object):
 
         # if it's not a char, push the last pending chars into the node list
         # before we do anything else (include the present token's pre_space)
-        if self._pending_chars:
-            self._pending_chars += tok.pre_space
+        if self._pending_chars_len:
+            if tok.pre_space:
+                self._pending_chars_list.append(tok.pre_space)
+                self._pending_chars_len += len(tok.pre_space)
             tok.pre_space = ''
             stop_exc = self.flush_pending_chars()
             if stop_exc is not None:
@@ -770,17 +875,19 @@ class LatexNodesCollector(object):
             delimiters=tok.arg,
         )
 
-        groupnode, parsing_state_delta = \
-            self.latex_walker.parse_content(
-                group_parser,
-                token_reader=self.token_reader,
-                parsing_state=self.make_child_parsing_state(
-                    self.parsing_state,
-                    LatexGroupNode,
-                    token=tok
-                ),
+        self._parse_child_content(
+            group_parser,
+            self.make_child_parsing_state(
+                self.parsing_state,
+                LatexGroupNode,
+                token=tok
+            ),
+            self._push_latex_group_node,
+            'parse_latex_group',
         )
 
+    def _push_latex_group_node(self, groupnode, parsing_state_delta):
+
         if parsing_state_delta is not None:
             logger.warning("parsing_state_delta is ignored after parsing a LaTeX group: %r",
                            parsing_state_delta)
@@ -1009,12 +1116,15 @@ class LatexNodesCollector(object):
         )
 
         # a math inline or display environment
-        mathnode, parsing_state_delta = \
-            self.latex_walker.parse_content(
-                math_parser,
-                token_reader=self.token_reader,
-                parsing_state=child_math_parsing_state,
-            )
+        self._parse_child_content(
+            math_parser,
+            child_math_parsing_state,
+            lambda mathnode, parsing_state_delta:
+                self._push_math_node(tok, mathnode, parsing_state_delta),
+            'parse_math',
+        )
+
+    def _push_math_node(self, tok, mathnode, parsing_state_delta):
 
         self.update_state_from_parsing_state_delta(parsing_state_delta)
 
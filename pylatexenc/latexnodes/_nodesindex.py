@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+import heapq
+
+import logging
+logger = logging.getLogger(__name__)
+
+from .nodes import (
+    LatexCharsNode,
+    LatexCommentNode,
+    LatexNodeList,
+)
+from ._nodearena import (
+    _node_kind_codes,
+    _KIND_OTHER,
+    _node_name,
+    _node_children,
+    _kinds_for_node_type,
+    _find_name_keys,
+)
+
+
+class LatexNodesIndex(object):
+    r"""
+    An index of all the nodes of a node tree, built in a single pass, that can
+    answer repeated queries of the type "all ``\cite`` macros", "all `figure`
+    environments" or "all math nodes" without walking the tree again.
+
+    The index is usually obtained with
+    :py:meth:`pylatexenc.latexnodes.nodes.LatexNodeList.build_index()`.
+
+    Queries have the same semantics as :py:meth:`LatexNodeArena.find()
+    <pylatexenc.latexnodes.LatexNodeArena.find>`, but the index keeps the
+    node objects along with the lists of matching nodes of each node type and
+    each name, so queries don't scan all nodes.  Use an index to query a tree
+    of node objects many times.  Use a
+    :py:class:`~pylatexenc.latexnodes.LatexNodeArena` for a compact
+    representation of a large node tree that doesn't keep the node objects,
+    or to look up nodes by position.
+
+    Arguments:
+
+    - `nodes` is the node tree to index: a node, or a list of nodes such as a
+      :py:class:`~pylatexenc.latexnodes.nodes.LatexNodeList`.  All descendants
+      of these nodes are indexed, including the nodes in macro, environment and
+      specials arguments.
+
+    - `latex_walker` is used to create the node lists returned by
+      :py:meth:`filter()`.  If it is `None`, the latex walker of `nodes` (or
+      of its first node) is used.
+
+    The returned node lists have the `parsing_state` of `nodes`, if `nodes` is
+    a :py:class:`~pylatexenc.latexnodes.nodes.LatexNodeList`.
+
+    Nodes are indexed by their type (as returned by `nodeType()`) and by their
+    name, which is the macro name of a macro node, the environment name of an
+    environment node, the specials characters of a specials node, and the
+    display type (`'inline'` or `'display'`) of a math node.  (Group nodes and
+    math nodes are also indexed by their delimiters, as in the arena.)  Nodes
+    of a type other than the standard node types are indexed, but not their
+    descendants, and they are only returned by queries with no `node_type` and
+    no `name`.
+
+    All query results are in document order (a parent node comes before its
+    arguments, which come before the nodes in its `nodelist`, which come before
+    the parent's next sibling).
+
+    The index does not track changes to the node tree.  If you modify the
+    nodes, build a new index.
+
+    .. py:attribute:: nodes
+
+       The list of all indexed nodes, in document order.  A node that appears
+       more than once in the tree is only indexed once.
+    """
+    def __init__(self, nodes, latex_walker=None):
+        super(LatexNodesIndex, self).__init__()
+
+        if latex_walker is None:
+            latex_walker = getattr(nodes, 'latex_walker', None)
+        if latex_walker is None and isinstance(nodes, (list, LatexNodeList)):
+            for n in nodes:
+                if n is not None and n.latex_walker is not None:
+                    latex_walker = n.latex_walker
+                    break
+        self.latex_walker = latex_walker
+        self.parsing_state = getattr(nodes, 'parsing_state', None)
+
+        self.nodes = []
+        # {node kind: [node index, ...]}, see LatexNodeArena.node_kinds
+        self._by_kind = {}
+        # {(node kind, name): [node index, ...]}
+        self._by_name = {}
+
+        self._build(nodes)
+
+    def _build(self, nodes):
+        all_nodes = self.nodes
+        by_kind = self._by_kind
+        by_name = self._by_name
+        seen = set()
+
+        if isinstance(nodes, (list, LatexNodeList)):
+            stack = [ n for n in reversed(nodes) if n is not None ]
+        elif nodes is not None:
+            stack = [ nodes ]
+        else:
+            stack = []
+
+        # Walk the tree in document order without recursing (node trees might
+        # be deeply nested)
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+
+            j = len(all_nodes)
+            all_nodes.append(node)
+
+            kind = _node_kind_codes.get(node.nodeType(), _KIND_OTHER)
+            by_kind.setdefault(kind, []).append(j)
+            if kind == _KIND_OTHER:
+                continue
+            name = _node_name(kind, node)
+            if name is not None:
+                by_name.setdefault((kind, name), []).append(j)
+
+            children = _node_children(kind, node)
+            stack.extend([ c for k, c in reversed(children) ])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def find(self, node_type=None, name=None):
+        r"""
+        Return the list, in document order, of all indexed nodes of the given
+        `node_type` (a node class, such as
+        :py:class:`~pylatexenc.latexnodes.nodes.LatexMacroNode`, including nodes
+        of subclasses of that type as for `isNodeType()`) and with the given
+        `name` (see class documentation).
+
+        If `node_type` is `None`, nodes of all types are considered, and if
+        `name` is `None`, nodes with any name (or without a name) are returned.
+
+        The `name` may also be a list, tuple or set of names, in which case
+        nodes with any of these names are returned.  (Unlike for
+        :py:meth:`LatexNodeArena.find()
+        <pylatexenc.latexnodes.LatexNodeArena.find>`, a tuple is a list of
+        names; to find group nodes by their delimiters, give a list
+        `[delimiters]`.)
+        """
+        return [ self.nodes[j] for j in self._find_indices(node_type, name) ]
+
+    def _find_indices(self, node_type, name):
+        if name is None and node_type is None:
+            return range(len(self.nodes))
+
+        kinds = _kinds_for_node_type(node_type)
+
+        if name is None:
+            index_lists = [ self._by_kind[kind] for kind in kinds
+                            if kind in self._by_kind ]
+        else:
+            if isinstance(name, (list, tuple, set, frozenset)):
+                names = name
+            else:
+                names = [ name ]
+            index_lists = [ self._by_name[key]
+                            for key in _find_name_keys(self._by_name, kinds, names) ]
+
+        if len(index_lists) == 0:
+            return []
+        if len(index_lists) == 1:
+            return index_lists[0]
+        # each list is sorted already
+        return list(heapq.merge(*index_lists))
+
+    def filter(self, node_type=None, name=None, node_predicate_fn=None,
+               skip_comments=False, skip_whitespace_char_nodes=False):
+        r"""
+        Return a new :py:class:`~pylatexenc.latexnodes.nodes.LatexNodeList` with
+        all the indexed nodes, in document order, that satisfy the given
+        criteria.
+
+        The nodes are first looked up in the index by `node_type` and `name`, as
+        for :py:meth:`find()`.  The remaining arguments further restrict the
+        matching nodes as for
+        :py:meth:`~pylatexenc.latexnodes.nodes.LatexNodeList.filter()`.
+
+        Unlike `LatexNodeList.filter()`, all the descendants of the indexed
+        nodes are considered, not only the top-level nodes.  The returned node
+        list is a flat list of matching nodes; its `pos` and `pos_end` are
+        determined by its first and last nodes.  If no node matches, the node
+        list is empty and its `pos` and `pos_end` are `None`.
+        """
+        nodes = self.nodes
+        indices = self._find_indices(node_type, name)
+
+        skip_comments = skip_comments and (
+            node_type is None or issubclass(LatexCommentNode, node_type)
+        )
+        skip_whitespace_char_nodes = skip_whitespace_char_nodes and (
+            node_type is None or issubclass(LatexCharsNode, node_type)
+        )
+
+        if node_predicate_fn is None and not skip_comments \
+           and not skip_whitespace_char_nodes:
+            filtered_nodes = [ nodes[j] for j in indices ]
+        else:
+            filtered_nodes = []
+            for j in indices:
+                n = nodes[j]
+                if skip_comments and n.isNodeType(LatexCommentNode):
+                    continue
+                if skip_whitespace_char_nodes and n.isNodeType(LatexCharsNode) \
+                   and len(n.chars.strip()) == 0:
+                    continue
+                if node_predicate_fn is not None and not node_predicate_fn(n):
+                    continue
+                filtered_nodes.append(n)
+
+        if self.latex_walker is not None:
+            return self.latex_walker.make_nodelist(
+                filtered_nodes,
+                parsing_state=self.parsing_state,
+            )
+        return LatexNodeList(filtered_nodes, parsing_state=self.parsing_state)
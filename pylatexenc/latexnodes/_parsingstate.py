@@ -28,6 +28,12 @@
 # time and without notice.
 
 
+import re
+
+#__pragma__('skip')
+import weakref
+#__pragma__('noskip')
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -54,6 +60,34 @@ fn_unique_object_id = id
 ### ENDPATCH_UNIQUE_OBJECT_ID
 
 
+# fields that determine which characters can start a token other than a
+# regular 'char' token (see ParsingState._finalize_state_token_dispatch_info())
+_token_dispatch_info_fields = (
+    'latex_context',
+    'latex_group_delimiters',
+    'latex_inline_math_delimiters',
+    'latex_display_math_delimiters',
+    'enable_macros',
+    'enable_environments',
+    'enable_comments',
+    'enable_groups',
+    'enable_specials',
+    'enable_math',
+    'macro_escape_char',
+    'comment_start',
+    'forbidden_characters',
+)
+
+# fields that can influence how the token reader splits the input into tokens
+# (see ParsingState._finalize_state_token_lexing_key())
+_token_lexing_key_fields = _token_dispatch_info_fields + (
+    'in_math_mode',
+    'math_mode_delimiter',
+    'enable_double_newline_paragraphs',
+    'macro_alpha_chars',
+)
+
+
 
 
 class ParsingState(object):
@@ -311,6 +345,11 @@ class ParsingState(object):
         self._parent_parsing_state_info = \
             kwargs.pop('_parent_parsing_state_info', (None, {}))
 
+        # {key derived from sub_context() kwargs: derived parsing state}, see
+        # _get_sub_context_cache()
+        self._sub_context_cache = {}
+        self._sub_context_cache_weak = None
+
         self.set_fields(**kwargs)
 
         self.finalize_state()
@@ -481,7 +520,118 @@ class ParsingState(object):
         # logger.debug("set parsing state internal math mode info, "
         #              "self._math_expecting_close_delim_info=%r",
         #              self._math_expecting_close_delim_info)
-        
+
+    def _finalize_state_macro_alpha_chars_info(self, parent, kwargs):
+
+        if parent is not None and 'macro_alpha_chars' not in kwargs:
+            # relevant info not changed, reuse parent info
+            self._rx_macro_alpha_chars = parent._rx_macro_alpha_chars
+            return
+
+        # Compiled regular expression that matches a run of macro alpha chars,
+        # used by the token reader to read a macro name in one go.  This is only
+        # possible if `macro_alpha_chars` is a string; otherwise we keep `None`
+        # and the token reader tests the characters one by one.
+        self._rx_macro_alpha_chars = None
+        #__pragma__('skip')
+        if isinstance(self.macro_alpha_chars, str) and len(self.macro_alpha_chars) > 0:
+            self._rx_macro_alpha_chars = re.compile(
+                '[' + "".join([ re.escape(c) for c in self.macro_alpha_chars ]) + ']+'
+            )
+        #__pragma__('noskip')
+
+    def _finalize_state_token_dispatch_info(self, parent, kwargs):
+
+        if parent is not None \
+           and len([ k for k in kwargs.keys() if k in _token_dispatch_info_fields ]) == 0:
+            # relevant info not changed, reuse parent info
+            self._token_dispatch_by_char = parent._token_dispatch_by_char
+            self._token_dispatch_default = parent._token_dispatch_default
+            self._char_run_stop_chars = parent._char_run_stop_chars
+            self._char_run_specials_initial_chars = \
+                parent._char_run_specials_initial_chars
+            return
+
+        # Characters for which we need to test for specials; `None` means that
+        # the latex context can't tell which characters might start specials,
+        # and we test at every character.  We only ask a latex context that
+        # can't change anymore (e.g., a frozen LatexContextDb), because this
+        # information is stored here when the parsing state is created.
+        if self.latex_context is None or not self.enable_specials:
+            specials_initial_chars = frozenset()
+        elif hasattr(self.latex_context, 'get_specials_initial_chars') \
+             and getattr(self.latex_context, 'frozen', True):
+            specials_initial_chars = self.latex_context.get_specials_initial_chars()
+        else:
+            specials_initial_chars = None
+
+        # The token reader looks up the first character of each token in this
+        # table, which gives the list of token types that the character might
+        # start, in the order in which they should be tried.  Characters that
+        # are not in the table can only start a regular 'char' token (or
+        # specials if `specials_initial_chars` is `None`, see
+        # `_token_dispatch_default`).  Disabled features are simply not entered
+        # in the table.
+        dispatch = {}
+        def add_handler(c, handler):
+            if c not in dispatch:
+                dispatch[c] = []
+            if handler not in dispatch[c]:
+                dispatch[c].append(handler)
+
+        if self.enable_math:
+            for c in self._math_delims_info_startchars:
+                add_handler(c, 'math')
+        if self.enable_macros or self.enable_environments:
+            add_handler(self.macro_escape_char, 'macro')
+        if self.enable_comments and self.comment_start:
+            add_handler(self.comment_start[:1], 'comment')
+        if self.enable_groups:
+            for od, cd in self.latex_group_delimiters:
+                add_handler(od, 'brace_open')
+            for od, cd in self.latex_group_delimiters:
+                add_handler(cd, 'brace_close')
+
+        # Characters that end a run of ordinary characters when scanning for a
+        # single 'char' token that covers the entire run (see
+        # LatexTokenReader.peek_token_char_run()).
+        stop_chars = set(self.forbidden_characters)
+        for c in dispatch.keys():
+            stop_chars.add(c)
+
+        if specials_initial_chars is not None:
+            for c in specials_initial_chars:
+                add_handler(c, 'specials')
+            self._token_dispatch_default = ()
+        else:
+            for c in dispatch.keys():
+                add_handler(c, 'specials')
+            self._token_dispatch_default = ('specials',)
+
+        self._token_dispatch_by_char = dict([
+            (c, tuple(handlers))
+            for c, handlers in dispatch.items()
+        ])
+        self._char_run_stop_chars = frozenset(stop_chars)
+        self._char_run_specials_initial_chars = specials_initial_chars
+
+    def _finalize_state_token_lexing_key(self, parent, kwargs):
+
+        if parent is not None \
+           and len([ k for k in kwargs.keys() if k in _token_lexing_key_fields ]) == 0:
+            # relevant info not changed, reuse parent info
+            self._token_lexing_key = parent._token_lexing_key
+            return
+
+        # A tuple that compares equal for any two parsing states in which the
+        # token reader reads the same tokens (see LatexPreTokenizedTokenReader).
+        # The latex context is compared by identity.
+        self._token_lexing_key = tuple([
+            (fn_unique_object_id(getattr(self, f)) if f == 'latex_context'
+             else getattr(self, f))
+            for f in _token_lexing_key_fields
+        ])
+
 
     def finalize_state(self):
         r"""
@@ -500,10 +650,17 @@ class ParsingState(object):
 
         parent, kwargs = self._parent_parsing_state_info
 
+        # states derived from the previous field values are no longer valid
+        self._sub_context_cache = {}
+        self._sub_context_cache_weak = None
+
         self._finalize_state_latex_group_delimiters_info(parent, kwargs)
         self._finalize_state_latex_math_delim_info(parent, kwargs)
         self._finalize_state_inmathmode_info(parent, kwargs)
-        
+        self._finalize_state_macro_alpha_chars_info(parent, kwargs)
+        self._finalize_state_token_dispatch_info(parent, kwargs)
+        self._finalize_state_token_lexing_key(parent, kwargs)
+
         #logger.debug("finalize_state() done. parent=%r; kwargs=%r.", parent, kwargs)
 
 
@@ -522,10 +679,29 @@ class ParsingState(object):
 
         If no arguments are provided, this returns a copy of the present parsing
         context object.
+
+        Derived parsing states are cached on the parent object: calling
+        `sub_context()` again with the same arguments on the same parsing state
+        returns the same (shared) object.  For instance, all the inline math groups ``$...$`` of a document
+        that are parsed with the same parsing state are given a single parsing
+        state object.  Because it may be shared, the parsing state returned by
+        this method is read-only: setting any of its fields (see
+        :py:meth:`get_fields()`) raises an `AttributeError`.  Call
+        `sub_context()` on it to derive a state with different field values
+        instead.
         """
 
         #logger.debug("sub_context(%r)", kwargs)
 
+        #__pragma__('skip')
+        cache_key = _sub_context_cache_key(kwargs)
+        if cache_key is not None:
+            sub_context_cache = self._get_sub_context_cache(kwargs)
+            p = sub_context_cache.get(cache_key, None)
+            if p is not None:
+                return p
+        #__pragma__('noskip')
+
         attrs = self.get_fields()
         kwargs2 = {
             k: v
@@ -540,8 +716,27 @@ class ParsingState(object):
 
         logger.debug("%s.sub_context(%r): %r --> %r", self.__class__.__name__, kwargs, self, p)
 
+        #__pragma__('skip')
+        p._read_only = True
+        if cache_key is not None \
+           and len(sub_context_cache) < _sub_context_cache_max_size:
+            sub_context_cache[cache_key] = p
+        #__pragma__('noskip')
+
         return p
 
+    #__pragma__('skip')
+    def _get_sub_context_cache(self, kwargs):
+        # States derived with a given latex_context are only remembered while
+        # they are in use elsewhere (e.g., by nodes), so that the cache doesn't
+        # keep latex context objects alive.
+        if 'latex_context' not in kwargs:
+            return self._sub_context_cache
+        if self._sub_context_cache_weak is None:
+            self._sub_context_cache_weak = weakref.WeakValueDictionary()
+        return self._sub_context_cache_weak
+    #__pragma__('noskip')
+
 
     def get_fields(self):
         r"""
@@ -550,6 +745,29 @@ class ParsingState(object):
         """
         return dict([(f, getattr(self, f)) for f in self._fields])
 
+    #__pragma__('skip')
+    def __setattr__(self, name, value):
+        # the fields of parsing states returned by sub_context() can't be set,
+        # because these objects may be shared
+        if name in self._fields and self.__dict__.get('_read_only', False):
+            raise AttributeError(
+                "Cannot set field ‘{}’ of {!r}, which was returned by "
+                "sub_context() and might be shared; use sub_context() to derive "
+                "a parsing state with a different value instead".format(name, self)
+            )
+        super(ParsingState, self).__setattr__(name, value)
+
+    def __getstate__(self):
+        # don't pickle the caches of derived states
+        state = dict(self.__dict__)
+        state['_sub_context_cache'] = {}
+        state['_sub_context_cache_weak'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+    #__pragma__('noskip')
+
 
 
     def __repr__(self):
@@ -599,3 +817,35 @@ class ParsingState(object):
 
 def _safe_eq(a, b):
     return ((a is None and b is None) or a == b)
+
+
+#__pragma__('skip')
+
+# Maximum number of derived states that a parsing state object remembers (see
+# ParsingState.sub_context()).  This bound keeps the memory in check for
+# parsing states from which many different states are derived, e.g. with a new
+# latex_context each time.
+_sub_context_cache_max_size = 64
+
+def _sub_context_cache_key_value(v):
+    # The type is part of the key so that, e.g., `1` and `True` or a list and a
+    # tuple with the same items aren't mixed up.
+    if isinstance(v, (list, tuple)):
+        return (type(v), tuple([ _sub_context_cache_key_value(x) for x in v ]))
+    return (type(v), v)
+
+def _sub_context_cache_key(kwargs):
+    # Return a hashable key for the given sub_context() arguments, or None if
+    # one of the values cannot be hashed (in which case the derived state isn't
+    # cached).
+    try:
+        key = tuple(sorted([
+            (k, _sub_context_cache_key_value(v))
+            for k, v in kwargs.items()
+        ]))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+#__pragma__('noskip')
@@ -29,6 +29,8 @@
 
 #from ._parsedargs import ParsedArguments
 
+from ._exctypes import LatexWalkerTokenParseError
+
 
 
 class LatexToken(object):
@@ -128,6 +130,22 @@ class LatexToken(object):
         requires a lookup in the context database, and so the spec object is
         readily available.
 
+      - 'end_of_stream': not an actual token, but a marker that is returned by
+        token reader methods such as
+        :py:meth:`LatexTokenReaderBase.peek_token_or_eos()` when the end of the
+        input is reached.  The `pre_space` field contains any whitespace at the
+        end of the input.  The `arg` field is `None`.
+
+    Tokens use `__slots__` to keep them small.  A token reader may also create
+    a token from offsets into the source string rather than from the strings
+    `arg`, `pre_space` and `post_space` themselves, by passing the source
+    string as the keyword argument `src` and setting any of these fields to
+    `None`, along with the keyword arguments `arg_pos` and `arg_pos_end`,
+    `pre_space_pos`, or `post_space_pos`, respectively.  Those fields are then
+    sliced out of the source string only when they are first accessed.  In all
+    cases, the attributes `arg`, `pre_space` and `post_space` behave like
+    regular attributes.
+
     .. versionchanged:: 3.0
 
        Starting in `pylatexenc 3`, the `len` argument was replaced by `pos_end`.
@@ -142,28 +160,107 @@ class LatexToken(object):
        located in the :py:mod:`~pylatexenc.latexwalker` module, see
        :py:class:`~pylatexenc.latexwalker.LatexToken`.
     """
+    #__pragma__('skip')
+    __slots__ = (
+        'tok', 'pos', 'pos_end',
+        '_arg', '_pre_space', '_post_space',
+        '_src', '_arg_pos', '_arg_pos_end', '_pre_space_pos', '_post_space_pos',
+        '_parse_error_info',
+    )
+    #__pragma__('noskip')
+
+    _fields_base = ('tok', 'arg', 'pos', 'pos_end', 'pre_space',)
+    _fields_with_post_space = _fields_base + ('post_space',)
+
     def __init__(self, tok, arg, pos, pos_end=None, pre_space='', post_space='', **kwargs):
 
         len_ = kwargs.pop('len', None)
 
         self.tok = tok
-        self.arg = arg
         self.pos = pos
         self.pos_end = pos_end
-        self.pre_space = pre_space
-        self.post_space = post_space
-        
+        self._arg = arg
+        self._pre_space = pre_space
+        self._post_space = post_space
+        self._parse_error_info = None
+
+        self._src = kwargs.pop('src', None)
+        if self._src is not None:
+            self._arg_pos = kwargs.pop('arg_pos', None)
+            self._arg_pos_end = kwargs.pop('arg_pos_end', None)
+            self._pre_space_pos = kwargs.pop('pre_space_pos', None)
+            self._post_space_pos = kwargs.pop('post_space_pos', None)
+
         if pos_end is None and len_ is not None and pos is not None:
             self.pos_end = pos + len_
             
         if kwargs:
             raise ValueError("Unexpected arguments to LatexToken(): " + repr(kwargs))
 
-        self._fields = ['tok', 'arg', 'pos', 'pos_end', 'pre_space']
-        if self.tok in ('macro', 'comment'):
-            self._fields.append('post_space')
         super(LatexToken, self).__init__()
 
+    # lazily sliced fields: `arg` is src[arg_pos:arg_pos_end], `pre_space` is
+    # src[pre_space_pos:pos], and `post_space` is src[post_space_pos:pos_end]
+    # (or empty if `post_space_pos` is None)
+
+    def _get_arg(self):
+        if self._arg is None and self._src is not None:
+            self._arg = self._src[self._arg_pos:self._arg_pos_end]
+        return self._arg
+
+    def _set_arg(self, arg):
+        self._arg = arg
+
+    arg = property(_get_arg, _set_arg)
+
+    def _get_pre_space(self):
+        if self._pre_space is None and self._src is not None:
+            self._pre_space = self._src[self._pre_space_pos:self.pos]
+        return self._pre_space
+
+    def _set_pre_space(self, pre_space):
+        self._pre_space = pre_space
+
+    pre_space = property(_get_pre_space, _set_pre_space)
+
+    def _get_post_space(self):
+        if self._post_space is None and self._src is not None:
+            if self._post_space_pos is None:
+                self._post_space = ''
+            else:
+                self._post_space = self._src[self._post_space_pos:self.pos_end]
+        return self._post_space
+
+    def _set_post_space(self, post_space):
+        self._post_space = post_space
+
+    post_space = property(_get_post_space, _set_post_space)
+
+    @property
+    def parse_error(self):
+        r"""
+        If this token is a recovery token that a token reader returned in
+        tolerant parsing mode in place of a token that it couldn't read, this
+        is the :py:exc:`LatexWalkerTokenParseError` that describes the problem.
+        Otherwise, this is `None`.
+
+        The token reader only records the information about the error; the
+        exception object is created (and its message formatted) when this
+        attribute is accessed.
+        """
+        if self._parse_error_info is None:
+            return None
+        return LatexWalkerTokenParseError(
+            recovery_token_placeholder=self,
+            **self._parse_error_info
+        )
+
+    @property
+    def _fields(self):
+        if self.tok in ('macro', 'comment'):
+            return self._fields_with_post_space
+        return self._fields_base
+
     @property
     def len(self):
         if self.pos is None or self.pos_end is None:
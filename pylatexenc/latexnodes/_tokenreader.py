@@ -37,6 +37,50 @@ from ._token import LatexToken
 from ._tokenreaderbase import LatexTokenReaderBase
 
 
+# public methods through which tokens are read (see
+# LatexTokenReader._reimplements_token_methods())
+_token_methods = (
+    'peek_token',
+    'next_token',
+    'peek_token_char_run',
+    'next_token_char_run',
+)
+_reimplements_token_methods_by_class = {}
+
+# methods that read the token at the current position (see
+# LatexTokenReader._reimplements_impl_methods())
+_impl_token_methods = (
+    'impl_peek_token',
+    'impl_char_token',
+    'impl_maybe_read_math_mode_delimiter',
+    'impl_read_macro',
+    'impl_read_environment',
+    'impl_read_comment',
+)
+_reimplements_impl_methods_by_class = {}
+
+
+#__pragma__('skip')
+def _class_reimplements_methods(cls, methnames, cache):
+    # Whether `cls` reimplements any of the given methods of LatexTokenReader
+    # or LatexTokenReaderBase; the result is remembered in the `cache` dict.
+    result = cache.get(cls, None)
+    if result is None:
+        result = False
+        for methname in methnames:
+            for c in cls.__mro__:
+                if methname in c.__dict__:
+                    if c is not LatexTokenReader and c is not LatexTokenReaderBase:
+                        result = True
+                    break
+        cache[cls] = result
+    return result
+#__pragma__('noskip')
+
+# matches a (possibly empty) run of whitespace; `\s` matches exactly the
+# characters for which str.isspace() is true
+_rx_space_chars = re.compile(r'\s*')
+
 
 class LatexTokenReader(LatexTokenReaderBase):
     r"""
@@ -55,6 +99,17 @@ class LatexTokenReader(LatexTokenReaderBase):
     layers of exception catching and recovery, etc., so be wary of
     reimplementing them manually.
 
+    The `impl_***()` methods that read tokens return the token that was read.
+    At the end of the stream, :py:meth:`impl_peek_token()` raises
+    :py:exc:`LatexWalkerEndOfStream`; if the token cannot be read, these
+    methods raise :py:exc:`LatexWalkerTokenParseError` (in tolerant parsing
+    mode, the exception's recovery token is then returned by
+    :py:meth:`peek_token()`).  Internally, if a subclass doesn't reimplement
+    any of these methods, tokens are read without raising any exception at
+    the end of the stream nor in tolerant parsing mode; the end of the
+    stream is signaled by a token of type 'end_of_stream' and the recovery
+    token is returned directly (see :py:meth:`peek_token_or_eos()`).
+
     Attributes:
 
     .. py::attribute:  s
@@ -69,6 +124,17 @@ class LatexTokenReader(LatexTokenReaderBase):
        and errors are raised immediately so that they can be traced down and
        debugged more easily.
 
+    .. py::attribute:  peek_token_memo_hits
+
+       The number of calls to :py:meth:`peek_token()` that returned a token
+       that was already read by a previous call at the same position and with
+       the same parsing state (see :py:meth:`peek_token()`).
+
+    .. py::attribute:  peek_token_memo_misses
+
+       The number of calls to :py:meth:`peek_token()` that had to actually read
+       the token from the input string.
+
 
     .. versionadded:: 3.0
 
@@ -86,6 +152,12 @@ class LatexTokenReader(LatexTokenReaderBase):
 
         self._pos = 0
 
+        # (pos, parsing_state, token) of the last token returned by
+        # peek_token(), or None
+        self._peek_token_memo = None
+        self.peek_token_memo_hits = 0
+        self.peek_token_memo_misses = 0
+
     def move_to_token(self, tok, rewind_pre_space=True):
         r"""
         Reimplemented from :py:meth:`LatexTokenReaderBase.move_to_token()`.
@@ -150,6 +222,7 @@ class LatexTokenReader(LatexTokenReaderBase):
 
     def _advance_to_pos(self, pos):
         self._pos = pos
+        self._peek_token_memo = None
 
 
     def skip_space_chars(self, parsing_state):
@@ -188,12 +261,55 @@ class LatexTokenReader(LatexTokenReaderBase):
         Parse errors while reading the token are handled differently whether or
         not we are in tolerant parsing mode.  (See :py:attr:`tolerant_parsing`
         attribute and constructor argument.)  If not in tolerant mode, the error
-        is raised.  When in tolerant parsing mode, the error is translated into
-        a "recovery token" provided by the error object.  The "recovery token"
-        is returned as if no error had occurred, in order to continue parsing.
+        is raised.  When in tolerant parsing mode, a "recovery token" is
+        returned as if no error had occurred, in order to continue parsing.
+        (The recovery token's `parse_error` attribute describes the error.)
+
+        The last token that was read is remembered, along with the position and
+        the parsing state it was read with.  If this method is called again
+        with the same parsing state object before the position pointer has
+        moved, then the same token object is returned without reading the input
+        again.  This is frequently the case, e.g., when a parser peeks at a
+        token and then reads it with :py:meth:`next_token()`.  (The
+        attributes :py:attr:`peek_token_memo_hits` and
+        :py:attr:`peek_token_memo_misses` count how often this happens.)
+        Errors that are raised when not in tolerant parsing mode are not
+        remembered.
 
         Reimplemented from :py:meth:`LatexTokenReaderBase.peek_token()`.
         """
+        tok = self._peek_token_memoized(parsing_state)
+        if tok.tok == 'end_of_stream':
+            raise LatexWalkerEndOfStream(final_space=tok.pre_space)
+        return tok
+
+    def peek_token_or_eos(self, parsing_state):
+        r"""
+        Reimplemented from :py:meth:`LatexTokenReaderBase.peek_token_or_eos()`.
+        This method doesn't raise :py:exc:`LatexWalkerEndOfStream` internally
+        (unless a subclass reimplements :py:meth:`peek_token()`, in which case
+        we call that method).
+        """
+        if self._reimplements_token_methods():
+            return super(LatexTokenReader, self).peek_token_or_eos(parsing_state)
+        return self._peek_token_memoized(parsing_state)
+
+    def _peek_token_memoized(self, parsing_state):
+        memo = self._peek_token_memo
+        if memo is not None and memo[0] == self._pos and memo[1] is parsing_state:
+            self.peek_token_memo_hits += 1
+            return memo[2]
+
+        self.peek_token_memo_misses += 1
+        tok = self._peek_token_uncached(parsing_state)
+        self._peek_token_memo = (self._pos, parsing_state, tok)
+        return tok
+
+    def _peek_token_uncached(self, parsing_state):
+
+        if not self._reimplements_impl_methods():
+            # doesn't raise at the end of the stream nor in tolerant mode
+            return self._impl_peek_token_or_eos(parsing_state)
 
         saved_pos = self._pos
 
@@ -201,6 +317,12 @@ class LatexTokenReader(LatexTokenReaderBase):
 
             return self.impl_peek_token(parsing_state)
 
+        except LatexWalkerEndOfStream as exc:
+            return self.make_token(tok='end_of_stream', arg=None,
+                                   pos=self._pos + len(exc.final_space),
+                                   pos_end=self._pos + len(exc.final_space),
+                                   pre_space=exc.final_space)
+
         except LatexWalkerTokenParseError as exc:
             if self.tolerant_parsing:
                 # return recovery token if we're in tolerant parsing mode.  Make
@@ -216,16 +338,124 @@ class LatexTokenReader(LatexTokenReaderBase):
                 # raise it up the chain
                 raise
 
+    def next_token_or_eos(self, parsing_state, char_run=False):
+        r"""
+        Reimplemented from :py:meth:`LatexTokenReaderBase.next_token_or_eos()`.
+        This method doesn't raise :py:exc:`LatexWalkerEndOfStream` internally
+        (unless a subclass reimplements one of the methods
+        :py:meth:`peek_token()`, :py:meth:`next_token()`,
+        :py:meth:`peek_token_char_run()` or :py:meth:`next_token_char_run()`,
+        in which case we call those methods).
+        """
+        if self._reimplements_token_methods():
+            return super(LatexTokenReader, self).next_token_or_eos(parsing_state,
+                                                                   char_run=char_run)
+        if char_run:
+            tok = self._peek_token_char_run_or_eos(parsing_state)
+        else:
+            tok = self._peek_token_memoized(parsing_state)
+        if tok.tok != 'end_of_stream':
+            self.move_past_token(tok)
+        return tok
+
+    def _reimplements_token_methods(self):
+        # Whether this object's class reimplements any of the public methods that
+        # read tokens; if so, the *_or_eos() methods must go through them.
+        cls = self.__class__
+        #__pragma__('skip')
+        return _class_reimplements_methods(cls, _token_methods,
+                                           _reimplements_token_methods_by_class)
+        #__pragma__('noskip')
+        return (cls is not LatexTokenReader)
+
+    def _reimplements_impl_methods(self):
+        # Whether this object's class reimplements any of the `impl_***()`
+        # methods that read tokens; if so, we call impl_peek_token() and these
+        # methods raise exceptions as documented.
+        cls = self.__class__
+        #__pragma__('skip')
+        return _class_reimplements_methods(cls, _impl_token_methods,
+                                           _reimplements_impl_methods_by_class)
+        #__pragma__('noskip')
+        return (cls is not LatexTokenReader)
+
+    def peek_token_char_run(self, parsing_state):
+        r"""
+        Read a single token without updating the current position pointer, like
+        :py:meth:`peek_token()`.  If the token is a regular 'char' token, then
+        it is extended to cover the entire run of ordinary characters that
+        follows it, as determined by :py:meth:`impl_scan_char_run()`.
+
+        Reimplemented from :py:meth:`LatexTokenReaderBase.peek_token_char_run()`.
+        """
+        tok = self._peek_token_char_run_or_eos(parsing_state)
+        if tok.tok == 'end_of_stream':
+            raise LatexWalkerEndOfStream(final_space=tok.pre_space)
+        return tok
+
+    def _peek_token_char_run_or_eos(self, parsing_state):
+
+        tok = self._peek_token_memoized(parsing_state)
+
+        # only extend tokens that represent a single character (not, e.g., a
+        # paragraph break or a recovery token)
+        if tok.tok != 'char' or len(tok.arg) != 1 or tok.pos_end != tok.pos + 1:
+            return tok
+
+        run_pos_end = self.impl_scan_char_run(self.s, tok.pos_end, parsing_state)
+        if run_pos_end > tok.pos_end:
+            # don't modify `tok`, it is remembered by peek_token()
+            return self.make_token(
+                tok='char',
+                arg=self.s[tok.pos:run_pos_end],
+                pos=tok.pos,
+                pos_end=run_pos_end,
+                pre_space=tok.pre_space,
+            )
+
+        return tok
+
     # ---
 
 
+    def _impl_token_parse_error(self, recovery_token_placeholder, **kwargs):
+        # Called by the `impl_***()` methods when the token at the current
+        # position cannot be read; the arguments are those of
+        # LatexWalkerTokenParseError.  Raise that exception, unless we are in
+        # tolerant parsing mode and reading tokens via
+        # _impl_peek_token_or_eos().  In that case, the information about the
+        # error is recorded on the recovery token (see its `parse_error`
+        # attribute) and the recovery token is returned, to be returned in turn
+        # by the `impl_***()` method.
+        if not self.tolerant_parsing or self._reimplements_impl_methods():
+            raise LatexWalkerTokenParseError(
+                recovery_token_placeholder=recovery_token_placeholder,
+                **kwargs
+            )
+        recovery_token_placeholder._parse_error_info = kwargs
+        return recovery_token_placeholder
+
     def impl_peek_token(self, parsing_state):
         r"""
         Read a single token and return it.
 
         If the end of stream is reached, raise :py:exc:`LatexWalkerEndOfStream`
-        (regardless of whether or not we are in tolerant parsing mode).
+        (regardless of whether or not we are in tolerant parsing mode).  If the
+        token cannot be read, raise :py:exc:`LatexWalkerTokenParseError`.
         """
+        tok = self._impl_peek_token_or_eos(parsing_state)
+        if tok.tok == 'end_of_stream':
+            raise LatexWalkerEndOfStream(final_space=tok.pre_space)
+        if tok._parse_error_info is not None:
+            raise LatexWalkerTokenParseError(recovery_token_placeholder=tok,
+                                             **tok._parse_error_info)
+        return tok
+
+    def _impl_peek_token_or_eos(self, parsing_state):
+        # Same as impl_peek_token(), but return a token of type 'end_of_stream'
+        # whose `pre_space` is the whitespace at the end of the input instead
+        # of raising LatexWalkerEndOfStream.  Parse errors are reported via
+        # _impl_token_parse_error().
 
         logger.debug("impl_peek_token(): parsing_state = %r, pos=%r", parsing_state, self._pos)
 
@@ -274,10 +504,11 @@ class LatexTokenReader(LatexTokenReaderBase):
                                    pre_space=pre_space)
 
         # if all we could read is whitespsace (w/o 2+ newlines), and we're at
-        # the end of the stream, we raise LatexWalkerEndOfStream.
+        # the end of the stream, we return an end-of-stream token.
         pos = space_pos_end
         if pos >= len_s:
-            raise LatexWalkerEndOfStream(final_space=pre_space)
+            return self.make_token(tok='end_of_stream', arg=None,
+                                   pos=pos, pos_end=pos, pre_space=pre_space)
 
         # inspect the next character --
 
@@ -285,73 +516,73 @@ class LatexTokenReader(LatexTokenReaderBase):
 
         #logger.debug("Char at %d: %r", pos, c)
 
-        # check if we have a math mode delimiter
-        if c in parsing_state._math_delims_info_startchars and parsing_state.enable_math:
-            t = self.impl_maybe_read_math_mode_delimiter(s, pos, parsing_state, pre_space)
-            if t is not None:
-                return t
-            # continue, we have some other token ->
-
-        if c == parsing_state.macro_escape_char:
-
-            # check if we have an environment
-            if parsing_state.enable_environments:
-                if s.startswith('begin', pos+1):
-                    beginend = 'begin'
-                elif s.startswith('end', pos+1):
-                    beginend = 'end'
-                else:
-                    beginend = None
-
-                #logger.debug("beginend=%r; s.startswith('begin',pos+1)=%r; s[pos+1:pos+7]=%r",
-                #             beginend, s.startswith('begin', pos+1), s[pos+1:pos+7])
-
-                if beginend:
-                    pastbeginendpos = pos+1+len(beginend)
-                    if pastbeginendpos >= len(s) \
-                       or s[pastbeginendpos] not in parsing_state.macro_alpha_chars:
-                        # \begin{environment} and not e.g. \beginmetastate, or
-                        # \end{environment} and not e.g. \endcsname
-                        return self.impl_read_environment(s=s, pos=pos,
-                                                          parsing_state=parsing_state,
-                                                          beginend=beginend,
-                                                          pre_space=pre_space)
-                # otherwise we have a macro ->
-
-            # we must have a macro
-            if parsing_state.enable_macros:
-                return self.impl_read_macro(s=s, pos=pos,
-                                            parsing_state=parsing_state,
-                                            pre_space=pre_space)
-
-        # check if we have a latex comment
-        if parsing_state.enable_comments \
-           and c == parsing_state.comment_start[0] \
-           and s.startswith(parsing_state.comment_start, pos):
-            #
-            return self.impl_read_comment(s=s, pos=pos,
-                                          parsing_state=parsing_state,
-                                          pre_space=pre_space)
-
-
-        if parsing_state.enable_groups:
-            if c in parsing_state._latex_group_delimchars_by_open:
-                return self.make_token(tok='brace_open', arg=c, pos=pos, pos_end=pos+1,
-                                       pre_space=pre_space)
-            if c in parsing_state._latex_group_delimchars_close:
-                return self.make_token(tok='brace_close', arg=c, pos=pos, pos_end=pos+1,
+        # look up which kinds of tokens might start with this character, in the
+        # order in which they should be tried (see
+        # ParsingState._finalize_state_token_dispatch_info())
+        dispatch_by_char = parsing_state._token_dispatch_by_char
+        if c in dispatch_by_char:
+            handlers = dispatch_by_char[c]
+        else:
+            handlers = parsing_state._token_dispatch_default
+
+        for handler in handlers:
+
+            if handler == 'math':
+                # check if we have a math mode delimiter
+                t = self.impl_maybe_read_math_mode_delimiter(s, pos, parsing_state,
+                                                             pre_space)
+                if t is not None:
+                    return t
+                # continue, we have some other token ->
+
+            elif handler == 'macro':
+
+                # check if we have an environment
+                if parsing_state.enable_environments:
+                    if s.startswith('begin', pos+1):
+                        beginend = 'begin'
+                    elif s.startswith('end', pos+1):
+                        beginend = 'end'
+                    else:
+                        beginend = None
+
+                    if beginend:
+                        pastbeginendpos = pos+1+len(beginend)
+                        if pastbeginendpos >= len(s) \
+                           or s[pastbeginendpos] not in parsing_state.macro_alpha_chars:
+                            # \begin{environment} and not e.g. \beginmetastate, or
+                            # \end{environment} and not e.g. \endcsname
+                            return self.impl_read_environment(s=s, pos=pos,
+                                                              parsing_state=parsing_state,
+                                                              beginend=beginend,
+                                                              pre_space=pre_space)
+                    # otherwise we have a macro ->
+
+                # we must have a macro
+                if parsing_state.enable_macros:
+                    return self.impl_read_macro(s=s, pos=pos,
+                                                parsing_state=parsing_state,
+                                                pre_space=pre_space)
+
+            elif handler == 'comment':
+                # check if we have a latex comment
+                if s.startswith(parsing_state.comment_start, pos):
+                    return self.impl_read_comment(s=s, pos=pos,
+                                                  parsing_state=parsing_state,
+                                                  pre_space=pre_space)
+
+            elif handler == 'brace_open' or handler == 'brace_close':
+                return self.make_token(tok=handler, arg=c, pos=pos, pos_end=pos+1,
                                        pre_space=pre_space)
 
-        if parsing_state.latex_context is not None and parsing_state.enable_specials:
-            sspec = parsing_state.latex_context.test_for_specials(
-                s, pos, parsing_state=parsing_state
-            )
-            #logger.debug("tested for specials at ‘%s’ -> %r", s[pos:pos+3]+'...', sspec)
-            #logger.debug("get_specials_spec('&') -> %r", parsing_state.latex_context.get_specials_spec('&'))
-            if sspec is not None:
-                return self.make_token(tok='specials', arg=sspec,
-                                       pos=pos, pos_end=pos+len(sspec.specials_chars),
-                                       pre_space=pre_space)
+            elif handler == 'specials':
+                sspec = parsing_state.latex_context.test_for_specials(
+                    s, pos, parsing_state=parsing_state
+                )
+                if sspec is not None:
+                    return self.make_token(tok='specials', arg=sspec,
+                                           pos=pos, pos_end=pos+len(sspec.specials_chars),
+                                           pre_space=pre_space)
 
         # otherwise, the token is a normal 'char' type.
 
@@ -373,6 +604,13 @@ class LatexTokenReader(LatexTokenReaderBase):
         stop looking for more spaces.
         """
 
+        #__pragma__('skip')
+        # match the whole run of whitespace in one go
+        p2 = _rx_space_chars.match(s, pos).end()
+        return (s[pos:p2], pos, p2)
+        #__pragma__('noskip')
+
+        # Transcrypt doesn't support rx.match(s, pos); scan char by char
         p2 = pos
         # enable_double_newline_paragraphs = \
         #     parsing_state.enable_double_newline_paragraphs
@@ -401,6 +639,61 @@ class LatexTokenReader(LatexTokenReaderBase):
         return (space, pos, p2)
 
 
+    def impl_scan_char_run(self, s, pos, parsing_state):
+        r"""
+        Find the extent of the run of ordinary characters that starts at position
+        `pos` in the string `s`.  Does not update the internal position
+        pointer.
+
+        The run stops before any character that might start a token other than a
+        'char' token in the given `parsing_state` (e.g., a macro escape
+        character, a group delimiter, a comment, a math mode delimiter, or
+        specials), before any forbidden character, and before any whitespace
+        that contains a paragraph break.  Whitespace that separates ordinary
+        characters is included in the run, but whitespace at the end of the run
+        is not.
+
+        Returns the position immediately after the last character of the run.
+        If no ordinary character can be read at `pos`, then `pos` is returned.
+        """
+
+        len_s = len(s)
+
+        stop_chars = parsing_state._char_run_stop_chars
+        specials_initial_chars = parsing_state._char_run_specials_initial_chars
+        latex_context = parsing_state.latex_context
+        test_specials = (latex_context is not None and parsing_state.enable_specials)
+        check_paragraphs = parsing_state.enable_double_newline_paragraphs
+
+        p = pos
+        run_pos_end = pos
+        while p < len_s:
+            c = s[p]
+            if c.isspace():
+                # whitespace is only part of the run if more ordinary characters
+                # follow it
+                q = p + 1
+                while q < len_s and s[q].isspace():
+                    q += 1
+                if q >= len_s:
+                    break
+                if check_paragraphs and s[p:q].count('\n') >= 2:
+                    break
+                p = q
+                continue
+            if c in stop_chars:
+                break
+            if test_specials \
+               and (specials_initial_chars is None or c in specials_initial_chars) \
+               and latex_context.test_for_specials(s, p, parsing_state=parsing_state) \
+                   is not None:
+                break
+            p += 1
+            run_pos_end = p
+
+        return run_pos_end
+
+
     def impl_char_token(self, c, pos, pos_end, parsing_state, pre_space):
         r"""
         Read a character token.
@@ -409,7 +702,7 @@ class LatexTokenReader(LatexTokenReaderBase):
         character, see :py:attr:`ParsingState.forbidden_characters`.
         """
         if c in parsing_state.forbidden_characters:
-            raise LatexWalkerTokenParseError(
+            return self._impl_token_parse_error(
                 s=self.s,
                 pos=pos,
                 msg="Character is forbidden here: ‘{}’ ({:#x})".format(c, ord(c)),
@@ -498,7 +791,7 @@ class LatexTokenReader(LatexTokenReaderBase):
         # read information for an escape sequence
 
         if pos+1 >= len(s):
-            raise LatexWalkerTokenParseError(
+            return self._impl_token_parse_error(
                 s=s,
                 pos=pos+1,
                 msg=(
@@ -528,7 +821,12 @@ class LatexTokenReader(LatexTokenReaderBase):
         # following chars part of macro only if all are alphabetical
         isalphamacro = (c in parsing_state.macro_alpha_chars)
         posi = pos + 2
-        if isalphamacro:
+        rx_macro_alpha_chars = parsing_state._rx_macro_alpha_chars
+        if isalphamacro and rx_macro_alpha_chars is not None:
+            # read the full macro name in one go
+            posi = rx_macro_alpha_chars.match(s, pos+1).end()
+            macro = s[pos+1:posi]
+        elif isalphamacro:
             while posi < len(s) and (s[posi] in parsing_state.macro_alpha_chars):
                 macro += s[posi]
                 posi += 1
@@ -578,15 +876,23 @@ class LatexTokenReader(LatexTokenReaderBase):
         attribute to your token reader object instance, e.g.,
         ``my_token_reader.rx_environment_name =
         re.compile(r'\s*\{(?P<environmentname>[a-zA-Z*]+)\}')``.  The regular
-        expression is matched against the string that starts immediately after
-        the ``\begin`` or ``\end``, and it must define a group named
-        ``environmentname``.
+        expression is matched at the position immediately after the ``\begin``
+        or ``\end`` (with ``rx.match(s, pos)``, so it should not be anchored
+        with ``^``), and it must define a group named ``environmentname``.
 
         Return a tuple `(environmentname, environment_match_end_pos)`.  If the
         environment name could not be read because of a parse error, then return
         `(None, None)`.
         """
 
+        #__pragma__('skip')
+        # match in place, without copying the rest of the string
+        envmatch = self.rx_environment_name.match(self.s, pos_envname)
+        if envmatch is None:
+            return None, None
+        return envmatch.group('environmentname'), envmatch.end()
+        #__pragma__('noskip')
+
         # I might want to pass this code into transcrypt (->Javascript), where
         # rx.match(s, pos) is not supported ...
         envmatch = self.rx_environment_name.match(self.s[pos_envname:]) #self.s, pos_envname)
@@ -628,7 +934,7 @@ class LatexTokenReader(LatexTokenReaderBase):
 
         if environment_name is None:
             tokarg = parsing_state.macro_escape_char + beginend
-            raise LatexWalkerTokenParseError(
+            return self._impl_token_parse_error(
                 s=s,
                 msg=r"Bad ‘\{}’ call: expected {{environmentname}}".format(beginend),
                 pos=pos,
@@ -637,7 +943,7 @@ class LatexTokenReader(LatexTokenReaderBase):
                     'beginend': beginend,
                     'macro_beginend': tokarg,
                 },
-                recovery_token_placeholder=LatexToken(
+                recovery_token_placeholder=self.make_token(
                     tok='char',
                     arg=tokarg,
                     pos=pos,
@@ -137,6 +137,54 @@ class LatexTokenReaderBase(object):
         except LatexWalkerEndOfStream:
             return None
 
+    def make_end_of_stream_token(self, final_space=''):
+        r"""
+        Return a token of type 'end_of_stream', which is returned by
+        :py:meth:`peek_token_or_eos()` and friends instead of raising
+        :py:exc:`LatexWalkerEndOfStream`.  The token's `pre_space` is set to
+        `final_space`, i.e., to any whitespace that remains at the end of the
+        input, and its `pos` and `pos_end` point immediately after that
+        whitespace.
+        """
+        pos = self.cur_pos()
+        if pos is not None:
+            pos += len(final_space)
+        return self.make_token(tok='end_of_stream', arg=None, pos=pos, pos_end=pos,
+                               pre_space=final_space)
+
+    def peek_token_or_eos(self, parsing_state):
+        r"""
+        Same as :py:meth:`peek_token()`, except that when the end of the stream
+        is reached, an end-of-stream token is returned (see
+        :py:meth:`make_end_of_stream_token()`) instead of raising
+        :py:exc:`LatexWalkerEndOfStream`.
+
+        Parsers that read many tokens should use this method, as token readers
+        can implement it without raising and catching an exception.  The
+        default implementation catches the exception raised by
+        :py:meth:`peek_token()`.
+        """
+        try:
+            return self.peek_token(parsing_state=parsing_state)
+        except LatexWalkerEndOfStream as e:
+            return self.make_end_of_stream_token(e.final_space)
+
+    def next_token_or_eos(self, parsing_state, char_run=False):
+        r"""
+        Same as :py:meth:`next_token()` (or :py:meth:`next_token_char_run()` if
+        `char_run=True`), except that when the end of the stream is reached, an
+        end-of-stream token is returned (see
+        :py:meth:`make_end_of_stream_token()`) instead of raising
+        :py:exc:`LatexWalkerEndOfStream`.  The internal position pointer is not
+        moved past an end-of-stream token.
+        """
+        try:
+            if char_run:
+                return self.next_token_char_run(parsing_state=parsing_state)
+            return self.next_token(parsing_state=parsing_state)
+        except LatexWalkerEndOfStream as e:
+            return self.make_end_of_stream_token(e.final_space)
+
     def next_token(self, parsing_state):
         r"""
         Same as :py:meth:`peek_token()`, but then also updates the internal position
@@ -146,6 +194,34 @@ class LatexTokenReaderBase(object):
         self.move_past_token(tok)
         return tok
 
+    def peek_token_char_run(self, parsing_state):
+        r"""
+        Same as :py:meth:`peek_token()`, except that if the token is a 'char'
+        token, the token reader may return a single 'char' token that spans an
+        entire run of consecutive ordinary characters.  The token's `arg`
+        contains all those characters along with any whitespace that separates
+        them.  The run never includes a paragraph break, nor any whitespace
+        that follows its last character.
+
+        Reading a run of characters in one token is much faster than reading one
+        token per character.  Callers should only use this method if they
+        don't need to inspect individual characters.
+
+        The default implementation simply calls :py:meth:`peek_token()`, i.e.,
+        token readers are not required to report runs of characters.
+        """
+        return self.peek_token(parsing_state=parsing_state)
+
+    def next_token_char_run(self, parsing_state):
+        r"""
+        Same as :py:meth:`peek_token_char_run()`, but then also updates the
+        internal position pointer of this token reader to advance past the
+        token that was read.
+        """
+        tok = self.peek_token_char_run(parsing_state=parsing_state)
+        self.move_past_token(tok)
+        return tok
+
     def cur_pos(self):
         r"""
         Return the current internal position pointer's state.
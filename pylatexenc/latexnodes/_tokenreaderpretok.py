@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+import array
+from bisect import bisect_left
+
+import logging
+logger = logging.getLogger(__name__)
+
+from ._exctypes import LatexWalkerTokenParseError, LatexWalkerEndOfStream
+
+from ._tokenreader import LatexTokenReader
+
+
+
+_token_kinds = (
+    'char',
+    'macro',
+    'begin_environment',
+    'end_environment',
+    'comment',
+    'brace_open',
+    'brace_close',
+    'mathmode_inline',
+    'mathmode_display',
+    'specials',
+)
+
+_token_kind_codes = dict([ (k, j) for j, k in enumerate(_token_kinds) ])
+
+
+class LatexTokenArray(object):
+    r"""
+    All the tokens of a LaTeX string, read once in advance with a given parsing
+    state and stored in a compact form.
+
+    The tokens are stored as a "structure of arrays": instead of one
+    :py:class:`LatexToken` instance per token, we keep one :py:mod:`array` of
+    integers per token field (the token type code, `pos`, `pos_end`, the
+    start and end of `arg` in the string, the length of `post_space`, and the
+    position at which reading the token started, i.e., the start of its
+    `pre_space`).  Token fields whose value cannot be expressed as a slice of
+    the string (e.g. the :py:class:`~pylatexenc.macrospec.SpecialsSpec` in the
+    `arg` of a 'specials' token) are kept in a separate dictionary.
+
+    Arguments:
+
+    - `s` is the LaTeX string to read.
+
+    - `parsing_state` is the parsing state with which to read the tokens.  The
+      tokens can be used for any parsing state whose fields that are relevant
+      for reading tokens have the same values and that has the very same
+      `latex_context` object (see :py:meth:`matches_parsing_state()`).  The
+      token array keeps a reference to that `latex_context`.
+
+    - `tolerant_parsing` is passed on to the :py:class:`LatexTokenReader` that
+      reads the tokens; it should be the same as for the token reader that
+      uses these tokens.
+
+    Positions at which the token reader raises an error are simply not stored;
+    when the parser reads a token at that position, the token is read again
+    (and the error is raised) by :py:class:`LatexPreTokenizedTokenReader`.
+    """
+    def __init__(self, s, parsing_state, tolerant_parsing=False):
+        super(LatexTokenArray, self).__init__()
+
+        self.s = s
+        self.lexing_key = parsing_state._token_lexing_key
+        # The lexing key only records the latex context's id(); keep the latex
+        # context itself so that its id can't be reused by another object.
+        self.latex_context = parsing_state.latex_context
+
+        self.start_pos = array.array('l')
+        self.kind = array.array('b')
+        self.pos = array.array('l')
+        self.pos_end = array.array('l')
+        self.arg_start = array.array('l')
+        self.arg_end = array.array('l')
+        self.post_space_len = array.array('l')
+
+        # {token index: value} for the token fields that are not slices of `s`
+        self._extra_args = {}
+        self._extra_pre_space = {}
+        self._extra_post_space = {}
+        self._extra_parse_error_info = {}
+
+        self._read_tokens(parsing_state, tolerant_parsing)
+
+    def __len__(self):
+        return len(self.start_pos)
+
+    def matches_parsing_state(self, parsing_state):
+        r"""
+        Return `True` if the token reader reads the same tokens with
+        `parsing_state` as with the parsing state that was used to read the
+        stored tokens.
+        """
+        return (parsing_state.latex_context is self.latex_context
+                and parsing_state._token_lexing_key == self.lexing_key)
+
+    def _read_tokens(self, parsing_state, tolerant_parsing):
+
+        s = self.s
+        len_s = len(s)
+        token_reader = LatexTokenReader(s, tolerant_parsing=tolerant_parsing)
+
+        pos = 0
+        while pos < len_s:
+            token_reader.move_to_pos_chars(pos)
+            try:
+                tok = token_reader.peek_token(parsing_state)
+            except LatexWalkerEndOfStream:
+                break
+            except LatexWalkerTokenParseError as exc:
+                # leave this position out, the error will be raised when the
+                # token is actually read
+                if exc.recovery_token_at_pos is not None \
+                   and exc.recovery_token_at_pos > pos:
+                    pos = exc.recovery_token_at_pos
+                else:
+                    pos += 1
+                continue
+
+            self._append_token(pos, tok)
+
+            if tok.pos_end <= pos:
+                # shouldn't happen, but make sure we don't loop forever
+                break
+            pos = tok.pos_end
+
+    def _append_token(self, start_pos, tok):
+
+        s = self.s
+        j = len(self.start_pos)
+
+        kind = _token_kind_codes.get(tok.tok, None)
+        if kind is None:
+            # unknown token type, don't store it
+            return
+
+        self.start_pos.append(start_pos)
+        self.kind.append(kind)
+        self.pos.append(tok.pos)
+        self.pos_end.append(tok.pos_end)
+
+        arg = tok.arg
+        arg_start = -1
+        if isinstance(arg, str):
+            arg_start = s.find(arg, tok.pos, tok.pos_end)
+        if arg_start >= 0:
+            self.arg_start.append(arg_start)
+            self.arg_end.append(arg_start + len(arg))
+        else:
+            self.arg_start.append(-1)
+            self.arg_end.append(-1)
+            self._extra_args[j] = arg
+
+        if s[start_pos:tok.pos] != tok.pre_space:
+            self._extra_pre_space[j] = tok.pre_space
+
+        post_space = tok.post_space
+        self.post_space_len.append(len(post_space))
+        if post_space and s[tok.pos_end-len(post_space):tok.pos_end] != post_space:
+            self._extra_post_space[j] = post_space
+
+        if tok._parse_error_info is not None:
+            self._extra_parse_error_info[j] = tok._parse_error_info
+
+    def token_index_at(self, start_pos):
+        r"""
+        Return the index of the token that is read when the token reader is at
+        position `start_pos`, or `None` if we haven't stored such a token.
+        """
+        j = bisect_left(self.start_pos, start_pos)
+        if j < len(self.start_pos) and self.start_pos[j] == start_pos:
+            return j
+        return None
+
+    def make_token(self, j, make_token_fn):
+        r"""
+        Create the token with index `j`, using the callable `make_token_fn` to
+        create the token object (e.g., a token reader's `make_token()` method).
+
+        The token's `arg`, `pre_space` and `post_space` are only sliced out of
+        the string when they are accessed (see :py:class:`LatexToken`).
+        """
+        pos = self.pos[j]
+        pos_end = self.pos_end[j]
+
+        kwargs = {}
+
+        arg_start = self.arg_start[j]
+        if arg_start >= 0:
+            arg = None
+            kwargs['arg_pos'] = arg_start
+            kwargs['arg_pos_end'] = self.arg_end[j]
+        else:
+            arg = self._extra_args[j]
+
+        if j in self._extra_pre_space:
+            pre_space = self._extra_pre_space[j]
+        else:
+            pre_space = None
+            kwargs['pre_space_pos'] = self.start_pos[j]
+
+        post_space_len = self.post_space_len[j]
+        if j in self._extra_post_space:
+            post_space = self._extra_post_space[j]
+        elif post_space_len:
+            post_space = None
+            kwargs['post_space_pos'] = pos_end - post_space_len
+        else:
+            post_space = ''
+
+        tok = make_token_fn(
+            tok=_token_kinds[self.kind[j]],
+            arg=arg,
+            pos=pos,
+            pos_end=pos_end,
+            pre_space=pre_space,
+            post_space=post_space,
+            src=self.s,
+            **kwargs
+        )
+        if j in self._extra_parse_error_info:
+            tok._parse_error_info = self._extra_parse_error_info[j]
+        return tok
+
+
+
+class LatexPreTokenizedTokenReader(LatexTokenReader):
+    r"""
+    LatexPreTokenizedTokenReader(token_array, *, tolerant_parsing=False)
+
+    A token reader that serves the tokens that were read in advance and stored
+    in the :py:class:`LatexTokenArray` instance `token_array`.
+
+    A stored token is used whenever a token is requested at a position at
+    which a stored token starts, with a parsing state that reads tokens in the
+    same way as the parsing state that was used to read the stored tokens.
+    Otherwise (e.g., in math mode, after verbatim content, or where the
+    parsing state was changed in a way that affects how tokens are read), the
+    token is read from the string as in :py:class:`LatexTokenReader`.
+
+    The same `token_array` can be used by any number of token readers, so that
+    parsing the same string again doesn't require reading its tokens again.
+
+    .. py::attribute:  pretokenized_hits
+
+       The number of tokens that were taken from `token_array`.
+    """
+    def __init__(self, token_array, **kwargs):
+        super(LatexPreTokenizedTokenReader, self).__init__(token_array.s, **kwargs)
+        self.token_array = token_array
+        self.pretokenized_hits = 0
+
+    def _peek_token_uncached(self, parsing_state):
+
+        token_array = self.token_array
+        if parsing_state.latex_context is token_array.latex_context \
+           and parsing_state._token_lexing_key == token_array.lexing_key:
+            j = token_array.token_index_at(self._pos)
+            if j is not None:
+                self.pretokenized_hits += 1
+                return token_array.make_token(j, self.make_token)
+
+        return super(LatexPreTokenizedTokenReader, self) \
+            ._peek_token_uncached(parsing_state)
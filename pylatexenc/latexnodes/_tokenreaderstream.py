@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+import logging
+logger = logging.getLogger(__name__)
+
+from ._exctypes import LatexWalkerTokenParseError
+
+from ._tokenreader import LatexTokenReader
+
+
+
+class LatexStreamTokenReader(LatexTokenReader):
+    r"""
+    LatexStreamTokenReader(stream, *, chunk_size=65536, lookback=None, line_numbers_calculator=None, tolerant_parsing=False)
+
+    A token reader that reads its input from a text stream (any object with a
+    `read(size)` method that returns strings, such as a file opened in text
+    mode), rather than from a string that holds the entire document.
+
+    The input is read in chunks of `chunk_size` characters.  The reader only
+    keeps a window of the input in memory: the text that is ahead of the
+    current position and that has been read already, and at most `lookback`
+    characters before the current position (by default, `lookback` is equal to
+    `chunk_size`).  Text that falls out of the window is discarded.  All
+    positions (in tokens, in :py:meth:`cur_pos()`, etc.) are absolute
+    positions in the full input.
+
+    You can move back to any position within the lookback window, via
+    :py:meth:`move_to_token()` or :py:meth:`move_to_pos_chars()`, which is
+    what parsers do when they look ahead by a few tokens.  Attempting to move
+    back further than that raises a `ValueError`.
+
+    Reading a single token never gets cut off by the end of the window: if a
+    token (e.g., a long comment or a long run of whitespace) reaches the end of
+    the text read so far, more text is read and the token is read again.
+
+    If `line_numbers_calculator` is not `None`, then it should be a
+    :py:class:`pylatexenc._util.LineNumbersCalculator` instance that was
+    constructed with an empty string.  Each chunk read from the stream is
+    registered with that object, so that line and column numbers can be
+    computed for absolute positions without keeping the text in memory.
+
+    The attribute `s` only holds the current window of the input, and the
+    internal position pointer `_pos` is relative to the start of that window
+    (which is at the absolute position `_s_offset`).
+
+    Note that nodes produced from tokens read by this token reader cannot
+    recover their verbatim LaTeX code from the full document string (e.g. via
+    :py:meth:`~pylatexenc.latexnodes.nodes.LatexNode.latex_verbatim()`), since
+    the full string is never held in memory.
+    """
+
+    # how close to the end of the text read so far a token may end before we
+    # read further and re-read the token, just to be sure it wasn't cut off
+    # (e.g. ``\begi`` when the input really says ``\begin{...}``, or ``$``
+    # where the input really says ``$$``).
+    lookahead_margin = 64
+
+    def __init__(self, stream, **kwargs):
+        chunk_size = kwargs.pop('chunk_size', None)
+        lookback = kwargs.pop('lookback', None)
+        line_numbers_calculator = kwargs.pop('line_numbers_calculator', None)
+
+        super(LatexStreamTokenReader, self).__init__('', **kwargs)
+
+        if chunk_size is None:
+            chunk_size = 65536
+        if lookback is None:
+            lookback = chunk_size
+
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.lookback = lookback
+        self.line_numbers_calculator = line_numbers_calculator
+
+        # absolute position of self.s[0]
+        self._s_offset = 0
+        self._stream_ended = False
+
+    # --- reading the stream ---
+
+    def _read_chunk(self):
+        r"""
+        Read a chunk from the stream and append it to our window, discarding text
+        that is more than `lookback` characters before the current position.
+        Returns `False` if the stream has ended.
+        """
+        if self._stream_ended:
+            return False
+
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            self._stream_ended = True
+            return False
+
+        if self.line_numbers_calculator is not None:
+            self.line_numbers_calculator.append_text(data)
+
+        cut = min(self._pos - self.lookback, len(self.s))
+        if cut > 0:
+            self.s = self.s[cut:] + data
+            self._s_offset += cut
+            self._pos -= cut
+            self._peek_token_memo = None
+        else:
+            self.s = self.s + data
+
+        return True
+
+    def _ensure_lookahead(self, num_chars):
+        r"""
+        Make sure our window extends at least `num_chars` characters past the
+        current position, unless the stream ends before that.
+        """
+        while len(self.s) - self._pos < num_chars:
+            if not self._read_chunk():
+                return
+
+    def _needs_more_input(self, rel_pos_end):
+        return (not self._stream_ended
+                and rel_pos_end + self.lookahead_margin > len(self.s))
+
+    def _to_abs_token(self, tok):
+        tok.pos += self._s_offset
+        tok.pos_end += self._s_offset
+        error_info = tok._parse_error_info
+        if error_info is not None:
+            error_info = dict(error_info)
+            for k in ('pos', 'recovery_token_at_pos'):
+                if error_info.get(k) is not None:
+                    error_info[k] += self._s_offset
+            tok._parse_error_info = error_info
+        return tok
+
+    # --- position handling (positions are absolute in the public interface) ---
+
+    def _advance_to_pos(self, pos):
+        rel_pos = pos - self._s_offset
+        if rel_pos < 0:
+            raise ValueError(
+                "LatexStreamTokenReader: Cannot move back to position {} which is "
+                "beyond the lookback window (the earliest position that is still "
+                "available is {}).  Consider increasing `lookback`."
+                .format(pos, self._s_offset)
+            )
+        self._pos = rel_pos
+        self._peek_token_memo = None
+
+    def cur_pos(self):
+        r"""
+        Reimplemented from :py:meth:`LatexTokenReaderBase.cur_pos()`.
+        """
+        return self._s_offset + self._pos
+
+    def final_pos(self):
+        r"""
+        Return the position immediately past the end of the input, or `None` if
+        we haven't reached the end of the stream yet.
+        """
+        if not self._stream_ended:
+            return None
+        return self._s_offset + len(self.s)
+
+    # --- reading tokens and chars ---
+
+    def peek_chars(self, num_chars, parsing_state):
+        r"""
+        Reimplemented from :py:meth:`LatexTokenReaderBase.peek_chars()`.
+        """
+        self._ensure_lookahead(num_chars)
+        return super(LatexStreamTokenReader, self).peek_chars(num_chars, parsing_state)
+
+    def skip_space_chars(self, parsing_state):
+        r"""
+        Reimplemented from :py:meth:`LatexTokenReaderBase.skip_space_chars()`.
+        """
+        space, space_pos, space_pos_end = self.peek_space_chars(parsing_state)
+        self._advance_to_pos(space_pos_end)
+        return (space, space_pos, space_pos_end)
+
+    def peek_space_chars(self, parsing_state):
+        r"""
+        Reimplemented from :py:meth:`LatexTokenReaderBase.peek_space_chars()`.
+        """
+        lookahead = self.chunk_size
+        while True:
+            self._ensure_lookahead(lookahead)
+            space, space_pos, space_pos_end = \
+                self.impl_peek_space_chars(self.s, self._pos, parsing_state)
+            if not self._needs_more_input(space_pos_end):
+                break
+            lookahead = len(self.s) - self._pos + self.chunk_size
+        return (space, self._s_offset + space_pos, self._s_offset + space_pos_end)
+
+    def _peek_token_uncached(self, parsing_state):
+        lookahead = self.chunk_size
+        while True:
+            self._ensure_lookahead(lookahead)
+            try:
+                tok = super(LatexStreamTokenReader, self) \
+                    ._peek_token_uncached(parsing_state)
+            except LatexWalkerTokenParseError as exc:
+                if not self._needs_more_input(exc.pos):
+                    self._adjust_exception_positions(exc)
+                    raise
+            else:
+                if tok.tok == 'end_of_stream':
+                    if self._stream_ended:
+                        return self._to_abs_token(tok)
+                    # we only saw whitespace until the end of our window
+                elif not self._needs_more_input(tok.pos_end):
+                    return self._to_abs_token(tok)
+            # read more input and try again
+            lookahead = len(self.s) - self._pos + self.chunk_size
+
+    def _peek_token_char_run_or_eos(self, parsing_state):
+
+        # The run of characters is limited to the text that has been read so
+        # far.  (A run of characters that is split into several tokens yields
+        # the same nodes.)
+
+        tok = self._peek_token_memoized(parsing_state)
+
+        if tok.tok != 'char' or len(tok.arg) != 1 or tok.pos_end != tok.pos + 1:
+            return tok
+
+        rel_pos = tok.pos - self._s_offset
+        run_pos_end = self.impl_scan_char_run(self.s, rel_pos + 1, parsing_state)
+        if self._needs_more_input(run_pos_end):
+            # the characters close to the end of the window might be the
+            # beginning of a longer specials or other token that we can't see
+            # yet; leave them for the next token
+            run_pos_end = min(run_pos_end, len(self.s) - self.lookahead_margin)
+            while run_pos_end > rel_pos + 1 and self.s[run_pos_end-1].isspace():
+                run_pos_end -= 1
+        if run_pos_end > rel_pos + 1:
+            # don't modify `tok`, it is remembered by peek_token()
+            return self.make_token(
+                tok='char',
+                arg=self.s[rel_pos:run_pos_end],
+                pos=tok.pos,
+                pos_end=self._s_offset + run_pos_end,
+                pre_space=tok.pre_space,
+            )
+
+        return tok
+
+    def _adjust_exception_positions(self, exc):
+        if exc.pos is not None:
+            exc.pos += self._s_offset
+        if exc.recovery_token_at_pos is not None:
+            exc.recovery_token_at_pos += self._s_offset
+        if exc.recovery_token_placeholder is not None:
+            self._to_abs_token(exc.recovery_token_placeholder)
@@ -137,17 +137,33 @@ class LatexNode(object):
        .. versionadded:: 3.0
 
           The attribute latex_walker was added in `pylatexenc 3`.
+
+    Each node class lists the names of its fields in the class attribute
+    `_fields` (including the base fields `pos`, `pos_end`, `parsing_state` and
+    `latex_walker`), and the class attribute `_redundant_fields` additionally
+    lists computed or obsolete fields such as `len`.  The node classes defined
+    in this module use `__slots__` to keep node objects small.  Nodes still
+    support weak references, and you can still set additional attributes on
+    them (these are stored in an instance dictionary that is only created when
+    it is needed).  A subclass should extend these class attributes with its
+    own fields; for backwards compatibility, a subclass may instead specify
+    its additional fields with the `_fields` and `_redundant_fields`
+    constructor arguments.
     """
-    def __init__(self, _fields, _redundant_fields=None,
+    #__pragma__('skip')
+    __slots__ = ('parsing_state', 'latex_walker', 'pos', 'pos_end',
+                 '__dict__', '__weakref__',)
+    #__pragma__('noskip')
+
+    _fields = ('pos', 'pos_end', 'parsing_state', 'latex_walker',)
+    _redundant_fields = _fields + ('len',)
+
+    def __init__(self, _fields=None, _redundant_fields=None,
                  parsing_state=None, pos=None, pos_end=None, latex_walker=None,
                  **kwargs):
 
         len_ = kwargs.pop('len', None)
 
-        # Important: subclasses must specify a list of fields they set in the
-        # `_fields` argument.  They should only specify base (non-redundant)
-        # fields; if they have "redundant" fields, specify the additional fields
-        # in _redundant_fields=...
         super(LatexNode, self).__init__(**kwargs)
 
         self.parsing_state = parsing_state
@@ -158,13 +174,16 @@ class LatexNode(object):
         if pos_end is None and len_ is not None:
             self.pos_end = self.pos + len_
 
-        self._fields = tuple(['pos', 'pos_end', 'parsing_state', 'latex_walker']
-                             + list(_fields))
-        if _redundant_fields is not None:
-            self._redundant_fields = tuple(list(self._fields) + ['len']
-                                           + list(_redundant_fields))
-        else:
-            self._redundant_fields = tuple(list(self._fields) + ['len'])
+        if _fields is not None:
+            # legacy: subclass specifies its (non-redundant) fields in the
+            # constructor call instead of in the class attribute `_fields`.
+            # Any "redundant" fields are specified in _redundant_fields=...
+            self._fields = tuple(list(LatexNode._fields) + list(_fields))
+            if _redundant_fields is not None:
+                self._redundant_fields = tuple(list(self._fields) + ['len']
+                                               + list(_redundant_fields))
+            else:
+                self._redundant_fields = tuple(list(self._fields) + ['len'])
 
     def nodeType(self):
         """
@@ -316,11 +335,15 @@ class LatexCharsNode(LatexNode):
 
        The string of characters represented by this node.
     """
+    #__pragma__('skip')
+    __slots__ = ('chars',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + ('chars',)
+    _redundant_fields = _fields + ('len',)
+
     def __init__(self, chars, **kwargs):
-        super(LatexCharsNode, self).__init__(
-            _fields = ('chars',),
-            **kwargs
-        )
+        super(LatexCharsNode, self).__init__(**kwargs)
         self.chars = chars
 
     def nodeType(self):
@@ -334,6 +357,59 @@ class LatexCharsNode(LatexNode):
 
 
 
+class LatexLazyCharsNode(LatexCharsNode):
+    r"""
+    A :py:class:`LatexCharsNode` whose `chars` are not stored in the node, but
+    are taken from the parsed string `latex_walker.s` between the positions
+    `pos` and `pos_end` whenever the attribute `chars` is accessed.  This
+    avoids keeping a second copy of the document's text in the node tree.
+
+    This node type is created by :py:meth:`LatexWalker.make_node()` instead of
+    a :py:class:`LatexCharsNode` when the latex walker's `lazy_chars_nodes`
+    option is set, and only for chars that coincide with the parsed string
+    between `pos` and `pos_end`.  The node type reported by
+    :py:meth:`nodeType()` remains :py:class:`LatexCharsNode`.
+
+    Arguments:
+
+    - `chars` may be set to an explicit string, which is then stored and used
+      instead of the contents of the parsed string.  By default (`None`), the
+      chars are taken from the parsed string.
+
+    - If `cache_chars` is `True`, the chars are stored in the node the first
+      time they are accessed.
+
+    Setting the attribute `chars` stores the given string in the node.
+    """
+    #__pragma__('skip')
+    __slots__ = ('_chars', '_cache_chars',)
+    #__pragma__('noskip')
+
+    def __init__(self, chars=None, **kwargs):
+        cache_chars = kwargs.pop('cache_chars', False)
+        super(LatexLazyCharsNode, self).__init__(chars=chars, **kwargs)
+        self._cache_chars = cache_chars
+
+    def _get_chars(self):
+        if self._chars is not None:
+            return self._chars
+        chars = self.latex_walker.s[self.pos : self.pos_end]
+        if self._cache_chars:
+            self._chars = chars
+        return chars
+
+    def _set_chars(self, chars):
+        self._chars = chars
+
+    chars = property(_get_chars, _set_chars)
+
+    def to_json_object_with_latexwalker(self, latexwalker):
+        d = super(LatexLazyCharsNode, self).to_json_object_with_latexwalker(latexwalker)
+        d['nodetype'] = 'LatexCharsNode'
+        return d
+
+
+
 class LatexGroupNode(LatexNode):
     r"""
     A LaTeX group delimited by braces, ``{like this}``.
@@ -359,12 +435,16 @@ class LatexGroupNode(LatexNode):
 
           The `delimiters` field was added in `pylatexenc 2.0`.
     """
+    #__pragma__('skip')
+    __slots__ = ('nodelist', 'delimiters',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + ('nodelist', 'delimiters',)
+    _redundant_fields = _fields + ('len',)
+
     def __init__(self, nodelist, **kwargs):
         delimiters = kwargs.pop('delimiters', ('{', '}'))
-        super(LatexGroupNode, self).__init__(
-            _fields=('nodelist','delimiters',),
-            **kwargs
-        )
+        super(LatexGroupNode, self).__init__(**kwargs)
         self.nodelist = nodelist
         self.delimiters = delimiters
 
@@ -393,13 +473,17 @@ class LatexCommentNode(LatexNode):
        (e.g., indentation spaces of the next line)
 
     """
+    #__pragma__('skip')
+    __slots__ = ('comment', 'comment_post_space',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + ('comment', 'comment_post_space',)
+    _redundant_fields = _fields + ('len',)
+
     def __init__(self, comment, **kwargs):
         comment_post_space = kwargs.pop('comment_post_space', '')
 
-        super(LatexCommentNode, self).__init__(
-            _fields = ('comment', 'comment_post_space', ),
-            **kwargs
-        )
+        super(LatexCommentNode, self).__init__(**kwargs)
 
         self.comment = comment
         self.comment_post_space = comment_post_space
@@ -478,15 +562,22 @@ class LatexMacroNode(LatexNode):
        A list of arguments to the macro. Each item in the list is a
        :py:class:`LatexNode`.
     """
+    #__pragma__('skip')
+    __slots__ = ('macroname', 'spec', 'nodeargd', 'macro_post_space',
+                 '_nodeoptarg', '_nodeargs',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + (
+        'macroname', 'spec', 'nodeargd', 'macro_post_space',
+    )
+    _redundant_fields = _fields + ('len', 'nodeoptarg', 'nodeargs',)
+
     def __init__(self, macroname, **kwargs):
         nodeargd = kwargs.pop('nodeargd', ParsedArguments())
         macro_post_space = kwargs.pop('macro_post_space', '')
         spec = kwargs.pop('spec', None)
 
-        super(LatexMacroNode, self).__init__(
-            _fields = ('macroname','spec','nodeargd','macro_post_space'),
-            _redundant_fields = ('nodeoptarg','nodeargs'),
-            **kwargs)
+        super(LatexMacroNode, self).__init__(**kwargs)
 
         self.macroname = macroname
         self.spec = spec
@@ -588,6 +679,16 @@ class LatexEnvironmentNode(LatexNode):
           arguments for standard latex macros, for backwards compatibility.
     """
     
+    #__pragma__('skip')
+    __slots__ = ('environmentname', 'spec', 'nodelist', 'nodeargd',
+                 '_optargs', '_args',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + (
+        'environmentname', 'spec', 'nodelist', 'nodeargd',
+    )
+    _redundant_fields = _fields + ('len', 'envname', 'optargs', 'args',)
+
     def __init__(self, environmentname, nodelist, **kwargs):
         nodeargd = kwargs.pop('nodeargd', ParsedArguments())
         spec = kwargs.pop('spec', None)
@@ -602,10 +703,7 @@ class LatexEnvironmentNode(LatexNode):
             self._args = kwargs.pop('args')
 ### END_PYLATEXENC2_LEGACY_SUPPORT_CODE
 
-        super(LatexEnvironmentNode, self).__init__(
-            _fields = ('environmentname','spec','nodelist','nodeargd',),
-            _redundant_fields = ('envname', 'optargs','args',),
-            **kwargs)
+        super(LatexEnvironmentNode, self).__init__(**kwargs)
 
         self.environmentname = environmentname
         self.spec = spec
@@ -689,14 +787,19 @@ class LatexSpecialsNode(LatexNode):
 
        Latex specials were introduced in `pylatexenc 2.0`.
     """
+    #__pragma__('skip')
+    __slots__ = ('specials_chars', 'spec', 'nodeargd',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + ('specials_chars', 'spec', 'nodeargd',)
+    _redundant_fields = _fields + ('len',)
+
     def __init__(self, specials_chars, **kwargs):
 
         spec = kwargs.pop('spec', None)
         nodeargd = kwargs.pop('nodeargd', None)
 
-        super(LatexSpecialsNode, self).__init__(
-            _fields = ('specials_chars','spec','nodeargd'),
-            **kwargs)
+        super(LatexSpecialsNode, self).__init__(**kwargs)
 
         self.specials_chars = specials_chars
         self.spec = spec
@@ -738,13 +841,17 @@ class LatexMathNode(LatexNode):
        The contents of the environment.  This attribute is normally a
        :py:class:`LatexNodeList`.
     """
+    #__pragma__('skip')
+    __slots__ = ('displaytype', 'nodelist', 'delimiters',)
+    #__pragma__('noskip')
+
+    _fields = LatexNode._fields + ('displaytype', 'nodelist', 'delimiters',)
+    _redundant_fields = _fields + ('len',)
+
     def __init__(self, displaytype, nodelist=[], **kwargs):
         delimiters = kwargs.pop('delimiters', (None, None))
 
-        super(LatexMathNode, self).__init__(
-            _fields = ('displaytype','nodelist','delimiters'),
-            **kwargs
-        )
+        super(LatexMathNode, self).__init__(**kwargs)
 
         self.displaytype = displaytype
         self.nodelist = nodelist
@@ -1001,7 +1108,28 @@ class LatexNodeList(object):
             pos=(None if len(filtered_nodes) else self.pos_end),
             pos_end=(None if len(filtered_nodes) else self.pos_end),
         )
-    
+
+    #__pragma__('skip')
+    def build_index(self):
+        r"""
+        Index all the nodes in this node list and their descendants in a single
+        pass, and return a
+        :py:class:`~pylatexenc.latexnodes.LatexNodesIndex` instance.
+
+        Use the index when you need to run many queries on the same nodes,
+        e.g.::
+
+            index = nodelist.build_index()
+            cite_nodes = index.find(LatexMacroNode, 'cite')
+            figures = index.filter(LatexEnvironmentNode, ['figure', 'figure*'])
+            math_nodes = index.find(LatexMathNode)
+
+        The index does not track later changes to the node tree.
+        """
+        from ._nodesindex import LatexNodesIndex
+        return LatexNodesIndex(self)
+    #__pragma__('noskip')
+
 
     def split_at_node(self, node_predicate_fn, skip_none=True, keep_separators=False,
                       max_split=None, call_make_nodelist=True):
@@ -1813,6 +1941,7 @@ latex_node_types = (
 )
 
 __all__ = [ nc.__name__ for nc in latex_node_types ] + [
+    'LatexLazyCharsNode',
     'LatexNodeList',
     'LatexNodesVisitor',
 ]
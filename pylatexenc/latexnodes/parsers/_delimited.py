@@ -40,6 +40,10 @@ from .._parsingstatedelta import (
 from ._base import LatexParserBase
 from ._generalnodes import LatexGeneralNodesParser
 
+#__pragma__('skip')
+from .. import _iterativeparse
+#__pragma__('noskip')
+
 
 
 
@@ -432,6 +436,21 @@ class LatexDelimitedExpressionParserInfo(object):
         """
         raise RuntimeError("Subclasses must reimplement stop_token_condition()")
 
+    def content_read_char_runs(self):
+        r"""
+        Return `True` if the contents parser may read runs of ordinary characters
+        as single 'char' tokens (see
+        :py:meth:`~pylatexenc.latexnodes.LatexTokenReaderBase.peek_token_char_run()`).
+        This is only possible if :py:meth:`stop_token_condition()` never needs
+        to inspect individual 'char' tokens.
+
+        The default implementation returns `False`.  Subclasses whose stopping
+        condition only looks at tokens other than 'char' tokens should
+        reimplement this method to return `True`, because reading character
+        runs speeds up parsing considerably.
+        """
+        return False
+
     def handle_stop_condition_token(self, token,
                                     latex_walker, token_reader, parsing_state):
         r"""
@@ -558,7 +577,8 @@ class LatexDelimitedExpressionParserInfo(object):
             require_stop_condition_met=True,
             handle_stop_condition_token=self.handle_stop_condition_token,
             stop_condition_message=
-            "Expected {} after ‘{}’".format(expected_matching, self.parsed_delimiters[0])
+            "Expected {} after ‘{}’".format(expected_matching, self.parsed_delimiters[0]),
+            read_char_runs=self.content_read_char_runs(),
         )
 
     def get_open_context_description(self):
@@ -699,6 +719,58 @@ class LatexDelimitedExpressionParser(LatexParserBase):
 
     def parse(self, latex_walker, token_reader, parsing_state, **kwargs):
 
+        contents_parser_info = self._parse_opening_delimiter(
+            latex_walker, token_reader, parsing_state
+        )
+        if contents_parser_info is None:
+            return None, None
+
+        contents_parser = contents_parser_info.make_content_parser(
+            latex_walker,
+            token_reader
+        )
+
+        nodelist, parsing_state_delta = latex_walker.parse_content(
+            contents_parser,
+            token_reader=token_reader,
+            parsing_state=contents_parser_info.contents_parsing_state,
+            open_context=contents_parser_info.get_open_context_description()
+        )
+
+        return self._make_group_node(contents_parser_info, latex_walker, token_reader,
+                                     nodelist, parsing_state_delta)
+
+    #__pragma__('skip')
+    def _parse_iter(self, latex_walker, token_reader, parsing_state):
+        # Same as parse(), as a generator for _iterativeparse.run_iterative()
+
+        contents_parser_info = self._parse_opening_delimiter(
+            latex_walker, token_reader, parsing_state
+        )
+        if contents_parser_info is None:
+            return None, None
+
+        contents_parser = contents_parser_info.make_content_parser(
+            latex_walker,
+            token_reader
+        )
+
+        nodelist, parsing_state_delta = yield _iterativeparse.parse_content_iter(
+            latex_walker,
+            contents_parser,
+            token_reader=token_reader,
+            parsing_state=contents_parser_info.contents_parsing_state,
+            open_context=contents_parser_info.get_open_context_description()
+        )
+
+        return self._make_group_node(contents_parser_info, latex_walker, token_reader,
+                                     nodelist, parsing_state_delta)
+    #__pragma__('noskip')
+
+    def _parse_opening_delimiter(self, latex_walker, token_reader, parsing_state):
+        # Read the opening delimiter and return the contents parser info
+        # instance, or None if the (optional) expression is not present.
+
         group_parsing_state = \
             self.delimited_expression_parser_info_class.get_group_parsing_state(
                 parsing_state=parsing_state,
@@ -745,7 +817,7 @@ class LatexDelimitedExpressionParser(LatexParserBase):
                 # all ok, the argument was optional and was simply not specified.
                 if recovery_token is not None:
                     token_reader.move_to_token(recovery_token)
-                return None, None
+                return None
 
             if recovery_token is not None:
                 pos = recovery_token.pos
@@ -781,18 +853,10 @@ class LatexDelimitedExpressionParser(LatexParserBase):
 
         contents_parser_info.initialize()
 
+        return contents_parser_info
 
-        contents_parser = contents_parser_info.make_content_parser(
-            latex_walker,
-            token_reader
-        )
-
-        nodelist, parsing_state_delta = latex_walker.parse_content(
-            contents_parser,
-            token_reader=token_reader,
-            parsing_state=contents_parser_info.contents_parsing_state,
-            open_context=contents_parser_info.get_open_context_description()
-        )
+    def _make_group_node(self, contents_parser_info, latex_walker, token_reader,
+                         nodelist, parsing_state_delta):
 
         # can discard the parsing_state_delta since the parsing state gets reset at
         # the end of the group.
@@ -925,6 +989,18 @@ class LatexDelimitedGroupParserInfo(LatexDelimitedExpressionParserInfo):
             return True
         return False
 
+    def content_read_char_runs(self):
+        r"""
+        Return `True`, because :py:meth:`stop_token_condition()` only looks for a
+        closing delimiter 'brace_close' token.  Subclasses that reimplement
+        :py:meth:`stop_token_condition()` to inspect 'char' tokens must also
+        reimplement this method to return `False`.
+
+        Reimplemented from
+        :py:meth:`LatexDelimitedExpressionParserInfo.content_read_char_runs()`.
+        """
+        return True
+
 
     def get_matching_delimiter(self, opening_delimiter):
         r"""
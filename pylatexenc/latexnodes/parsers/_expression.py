@@ -35,7 +35,6 @@ from .._exctypes import (
     LatexWalkerParseError,
     LatexWalkerTokenParseError,
     LatexWalkerNodesParseError,
-    LatexWalkerEndOfStream
 )
 from ..nodes import *
 
@@ -158,7 +157,7 @@ class LatexExpressionParser(LatexParserBase):
                             parsing_state, **kwargs):
 
         try:
-            tok = token_reader.next_token( parsing_state=expr_parsing_state )
+            tok = token_reader.next_token_or_eos( parsing_state=expr_parsing_state )
         except LatexWalkerTokenParseError as e:
             exc = latex_walker.check_tolerant_parsing_ignore_error(e)
             if exc is not None:
@@ -169,9 +168,10 @@ class LatexExpressionParser(LatexParserBase):
             # the token reader implements move_to_pos_chars(); we cannot use
             # move_past_token() etc. because the token couldn't be parsed
             # successfully!
-            tok = exc.recovery_token_placeholder
-            token_reader.move_to_pos_chars(exc.recovery_token_at_pos)
-        except LatexWalkerEndOfStream as e:
+            tok = e.recovery_token_placeholder
+            token_reader.move_to_pos_chars(e.recovery_token_at_pos)
+
+        if tok.tok == 'end_of_stream':
             exc = latex_walker.check_tolerant_parsing_ignore_error(
                 LatexWalkerParseError(
                     r"End of input encountered but we expected an expression",
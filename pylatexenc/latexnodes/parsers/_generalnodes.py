@@ -36,6 +36,10 @@ from .. import nodes
 
 from ._base import LatexParserBase
 
+#__pragma__('skip')
+from .. import _iterativeparse
+#__pragma__('noskip')
+
 
 
 
@@ -59,9 +63,9 @@ class LatexGeneralNodesParser(LatexParserBase):
     Arguments:
 
       - `stop_token_condition`, `stop_nodelist_condition`,
-        `make_child_parsing_state`, `include_stop_token_pre_space_chars` are
-        passed on directly to create a nodes collector instance (see also
-        :py:meth:`parse()`)
+        `make_child_parsing_state`, `include_stop_token_pre_space_chars`,
+        `read_char_runs` are passed on directly to create a nodes collector
+        instance (see also :py:meth:`parse()`)
 
       - If `require_stop_condition_met` is `True` (the default), then any
         stopping condition must be eventually met; a parse error is raised if
@@ -99,6 +103,7 @@ class LatexGeneralNodesParser(LatexParserBase):
                  handle_stop_condition_token=None,
                  include_stop_token_pre_space_chars=True,
                  handle_stop_data=None,
+                 read_char_runs=None,
                  **kwargs):
         super(LatexGeneralNodesParser, self).__init__(**kwargs)
         self.stop_token_condition = stop_token_condition
@@ -114,6 +119,8 @@ class LatexGeneralNodesParser(LatexParserBase):
 
         self.include_stop_token_pre_space_chars = include_stop_token_pre_space_chars
 
+        self.read_char_runs = read_char_runs
+
 
     def make_nodes_collector(self, latex_walker, token_reader, parsing_state):
         r"""
@@ -126,6 +133,7 @@ class LatexGeneralNodesParser(LatexParserBase):
             stop_nodelist_condition=self.stop_nodelist_condition,
             make_child_parsing_state=self.make_child_parsing_state,
             include_stop_token_pre_space_chars=self.include_stop_token_pre_space_chars,
+            read_char_runs=self.read_char_runs,
         )
 
     def parse(self, latex_walker, token_reader, parsing_state, **kwargs):
@@ -147,41 +155,72 @@ class LatexGeneralNodesParser(LatexParserBase):
 
         except LatexWalkerParseError as e:
 
-            # we got an error! Add some info to help with recovery in case
-            # we're in tolerant parsing mode, and then raise the issue
-            # further up.
-            #
-            
-            logger.debug("Got parse error while reading general nodes: %r", e)
-
-            thenodelist = collector.get_final_nodelist()
-            if thenodelist.pos is None:
-                thenodelist.pos = pos_start
-            if thenodelist.pos_end is None:
-                thenodelist.pos_end = pos_start
-
-            # keep any information the original error carried about where to
-            # resume parsing, so that recovery in tolerant parsing mode can
-            # reposition the token reader past the offending token
-            recovery_at_token = None
-            if hasattr(e, 'recovery_at_token'):
-                # remember, transcrypt doesn't like getattr(a, b, default) with
-                # default arg
-                recovery_at_token = e.recovery_at_token
-            recovery_past_token = None
-            if hasattr(e, 'recovery_past_token'):
-                recovery_past_token = e.recovery_past_token
-
-            raise LatexWalkerNodesParseError(
-                msg=e.msg,
-                pos=e.pos,
-                open_contexts=e.open_contexts,
-                error_type_info=e.error_type_info,
-                recovery_nodes=thenodelist,
-                recovery_parsing_state_delta=collector.get_parser_parsing_state_delta(),
-                recovery_at_token=recovery_at_token,
-                recovery_past_token=recovery_past_token,
-            )
+            self._raise_error_with_recovery_info(e, collector, pos_start)
+
+        return self._finish_parse(collector, pos_start,
+                                  latex_walker, token_reader, parsing_state)
+
+    #__pragma__('skip')
+    def _parse_iter(self, latex_walker, token_reader, parsing_state):
+        # Same as parse(), as a generator for _iterativeparse.run_iterative()
+
+        pos_start = token_reader.cur_pos()
+
+        collector = self.make_nodes_collector(latex_walker, token_reader, parsing_state)
+
+        try:
+
+            yield _iterativeparse.process_tokens_iter(collector)
+
+        except LatexWalkerParseError as e:
+
+            self._raise_error_with_recovery_info(e, collector, pos_start)
+
+        return self._finish_parse(collector, pos_start,
+                                  latex_walker, token_reader, parsing_state)
+    #__pragma__('noskip')
+
+    def _raise_error_with_recovery_info(self, e, collector, pos_start):
+
+        # we got an error! Add some info to help with recovery in case
+        # we're in tolerant parsing mode, and then raise the issue
+        # further up.
+        #
+        
+        logger.debug("Got parse error while reading general nodes: %r", e)
+
+        thenodelist = collector.get_final_nodelist()
+        if thenodelist.pos is None:
+            thenodelist.pos = pos_start
+        if thenodelist.pos_end is None:
+            thenodelist.pos_end = pos_start
+
+        # keep any information the original error carried about where to
+        # resume parsing, so that recovery in tolerant parsing mode can
+        # reposition the token reader past the offending token
+        recovery_at_token = None
+        if hasattr(e, 'recovery_at_token'):
+            # remember, transcrypt doesn't like getattr(a, b, default) with
+            # default arg
+            recovery_at_token = e.recovery_at_token
+        recovery_past_token = None
+        if hasattr(e, 'recovery_past_token'):
+            recovery_past_token = e.recovery_past_token
+
+        exc = LatexWalkerNodesParseError(
+            msg=e.msg,
+            error_type_info=e.error_type_info,
+            recovery_nodes=thenodelist,
+            recovery_parsing_state_delta=collector.get_parser_parsing_state_delta(),
+            recovery_at_token=recovery_at_token,
+            recovery_past_token=recovery_past_token,
+        )
+        # (don't resolve any lazily formatted location information here)
+        e.transfer_location_to(exc)
+        raise exc
+
+    def _finish_parse(self, collector, pos_start,
+                      latex_walker, token_reader, parsing_state):
 
         collected_nodelist = collector.get_final_nodelist()
         if collected_nodelist.pos is None:
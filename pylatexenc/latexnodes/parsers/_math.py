@@ -113,6 +113,9 @@ class LatexMathParserInfo(LatexDelimitedExpressionParserInfo):
             return True
         return False
 
+    def content_read_char_runs(self):
+        return True
+
     def get_matching_delimiter(self, opening_delimiter):
         return self.math_parsing_state._math_expecting_close_delim_info['close_delim']
 
@@ -30,7 +30,6 @@
 import logging
 logger = logging.getLogger(__name__)
 
-from .._exctypes import LatexWalkerEndOfStream
 
 from ._base import LatexParserBase
 from ._delimited import (
@@ -277,9 +276,8 @@ class LatexOptionalCharsMarkerParser(LatexParserBase):
     def _parse_single(self, remaining_chars_list, latex_walker, token_reader,
                       parsing_state, **kwargs):
         
-        try:
-            orig_pos_tok = token_reader.peek_token(parsing_state=parsing_state)
-        except LatexWalkerEndOfStream:
+        orig_pos_tok = token_reader.peek_token_or_eos(parsing_state=parsing_state)
+        if orig_pos_tok.tok == 'end_of_stream':
             # end of input reached; the marker is simply not there.
             return None, None, None, token_reader.cur_pos()
 
@@ -291,9 +289,8 @@ class LatexOptionalCharsMarkerParser(LatexParserBase):
         first_token = None
         try:
             while True:
-                try:
-                    tok = token_reader.next_token(parsing_state=parsing_state)
-                except LatexWalkerEndOfStream:
+                tok = token_reader.next_token_or_eos(parsing_state=parsing_state)
+                if tok.tok == 'end_of_stream':
                     # end of input reached; the marker is simply not there.
                     break
                 if first_token is None:
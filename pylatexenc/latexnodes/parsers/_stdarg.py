@@ -414,6 +414,10 @@ class LatexCharsGroupParser(LatexDelimitedGroupParser):
                 return True
             return None
 
+        def content_read_char_runs(self):
+            # the stop condition inspects individual 'char' tokens
+            return False
+
 
 
 # --------------------------------------------------------------------
@@ -48,6 +48,16 @@ class LatexVerbatimBaseParser(LatexParserBase):
 
     This base class implementation stops after a single character.
 
+    Reading character by character is slow for long verbatim content.  A
+    subclass can therefore also implement :py:meth:`find_verbatim_end()`, which
+    locates the end of the verbatim content in a whole block of text at once.
+    That method is used instead of calling
+    :py:meth:`new_char_check_stop_condition()` for each character, as long as
+    it is defined by the same class as the
+    :py:meth:`new_char_check_stop_condition()` that is in effect.  (A subclass
+    that reimplements only :py:meth:`new_char_check_stop_condition()` thus
+    keeps reading character by character.)
+
     Note: this parser requires the token reader to provide character-level
     access to the input string.
     """
@@ -95,6 +105,43 @@ class LatexVerbatimBaseParser(LatexParserBase):
             return True # or dict like { 'put_back_char': True }
         return False
 
+    def find_verbatim_end(self, text, start, verbatim_info):
+        r"""
+        Locate the end of the verbatim content in `text`, which is the input
+        starting at the beginning of the verbatim content.  This method should
+        find the same stop position as repeated calls to
+        :py:meth:`new_char_check_stop_condition()` would.
+
+        The `text` might not contain all the remaining input.  If the stop
+        condition is not met within `text`, return `None`; the method is then
+        called again with a longer `text`, where `start` is the length of the
+        `text` that was already inspected.  Any state that is needed to resume
+        the search can be kept on `verbatim_info`.
+
+        If the stop condition is met, return a tuple `(content_end,
+        consumed_end)`: the verbatim string is `text[:content_end]` (which is
+        then handed to :py:meth:`finalize_verbatim_string()`), and the token
+        reader is left at the position `consumed_end` relative to the start of
+        `text`.
+
+        This method is only used if the class that defines it also defines the
+        :py:meth:`new_char_check_stop_condition()` method that is in effect
+        (see class doc).  Otherwise, the verbatim content is read character by
+        character.  The base class implementation doesn't know where the
+        verbatim content ends and returns `None`; it is never used by the base
+        class itself.
+        """
+        return None
+
+    #__pragma__('skip')
+    def _find_verbatim_end_available(self):
+        for cls in type(self).__mro__:
+            if 'new_char_check_stop_condition' in cls.__dict__:
+                return (cls is not LatexVerbatimBaseParser
+                        and 'find_verbatim_end' in cls.__dict__)
+        return False
+    #__pragma__('noskip')
+
     def error_end_of_stream(self, pos, recovery_nodes, latex_walker, verbatim_info):
         r"""
         Called when the end of the stream was reached before the stop condition
@@ -175,7 +222,15 @@ class LatexVerbatimBaseParser(LatexParserBase):
         
         verbatim_info.content_pos_start = token_reader.cur_pos()
 
-        while not stop_condition_met:
+        #__pragma__('skip')
+        if self._find_verbatim_end_available():
+            verbatim_string, stop_condition_met = \
+                self._read_verbatim_string_in_blocks(token_reader, parsing_state,
+                                                     verbatim_info)
+            ended_with_eos = not stop_condition_met
+        #__pragma__('noskip')
+
+        while not stop_condition_met and not ended_with_eos:
             try:
                 char = token_reader.next_chars(1, parsing_state=parsing_state)
             except LatexWalkerEndOfStream:
@@ -228,6 +283,34 @@ class LatexVerbatimBaseParser(LatexParserBase):
         
         return nodes, None
 
+    #__pragma__('skip')
+    def _read_verbatim_string_in_blocks(self, token_reader, parsing_state,
+                                        verbatim_info):
+        # Read the verbatim string using find_verbatim_end() on blocks of
+        # increasing size.  Returns (verbatim_string, stop_condition_met).
+        num_chars = 256
+        start = 0
+        while True:
+            try:
+                text = token_reader.peek_chars(num_chars, parsing_state=parsing_state)
+            except LatexWalkerEndOfStream:
+                text = ''
+
+            found = self.find_verbatim_end(text, start, verbatim_info)
+            if found is not None:
+                content_end, consumed_end = found
+                token_reader.move_to_pos_chars(token_reader.cur_pos() + consumed_end)
+                return text[:content_end], True
+
+            if len(text) < num_chars:
+                # reached the end of the stream
+                token_reader.move_to_pos_chars(token_reader.cur_pos() + len(text))
+                return text, False
+
+            start = len(text)
+            num_chars *= 4
+    #__pragma__('noskip')
+
 
 
 class LatexDelimitedVerbatimParser(LatexVerbatimBaseParser):
@@ -304,6 +387,33 @@ class LatexDelimitedVerbatimParser(LatexVerbatimBaseParser):
 
         return False
 
+    def find_verbatim_end(self, text, start, verbatim_info):
+        r"""
+        Find the closing delimiter in `text` with `str.find()`, keeping track
+        of nested opening delimiters.  See
+        :py:meth:`LatexVerbatimBaseParser.find_verbatim_end()`.
+        """
+        open_delim, close_delim = verbatim_info.parsed_delimiters
+
+        if len(close_delim) != 1:
+            # single characters never match such a delimiter
+            return None
+        count_open = (open_delim != close_delim and len(open_delim) == 1)
+
+        i = start
+        while True:
+            j = text.find(close_delim, i)
+            if count_open:
+                self.depth_counter += text.count(open_delim, i,
+                                                 (j if j != -1 else len(text)))
+            if j == -1:
+                return None
+            self.depth_counter -= 1
+            if self.depth_counter <= 0:
+                # final closing delimiter
+                return (j, j+1)
+            i = j + 1
+
 
     def error_end_of_stream(self, pos, recovery_nodes, latex_walker, verbatim_info):
         # report the same node structure as a successful parse would, i.e. the
@@ -419,6 +529,22 @@ class LatexVerbatimEnvironmentContentsParser(LatexVerbatimBaseParser):
             return {'put_back_char': True}
         return False
 
+    def find_verbatim_end(self, text, start, verbatim_info):
+        r"""
+        Find ``\end{environment_name}`` in `text` with `str.find()`.  See
+        :py:meth:`LatexVerbatimBaseParser.find_verbatim_end()`.
+        """
+        end_environment_code = verbatim_info.end_environment_code
+        # the end code might straddle the end of the text we inspected before
+        j = text.find(end_environment_code,
+                      max(0, start - len(end_environment_code) + 1))
+        if j == -1:
+            return None
+        pos_end = j + len(end_environment_code)
+        # the verbatim string includes the end code, which is removed by
+        # finalize_verbatim_string()
+        return (pos_end, pos_end)
+
     def error_end_of_stream(self, pos, recovery_nodes, latex_walker, verbatim_info):
         # an environment body is always reported as a node list, including when
         # we recover from this error in tolerant parsing mode
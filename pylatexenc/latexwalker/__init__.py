@@ -159,21 +159,26 @@ from ._walker import LatexWalker
 
 
 ### BEGIN_PYLATEXENC_GET_DEFAULT_SPECS_FN
-from ._get_defaultspecs import get_default_latex_context_db
+from ._get_defaultspecs import (
+    get_default_latex_context_db,
+    get_shared_default_latex_context_db,
+)
 ### END_PYLATEXENC_GET_DEFAULT_SPECS_FN
 
 
 ### BEGIN_PYLATEXENC1_LEGACY_SUPPORT_CODE
-from ._legacy_py1x import (
-    MacrosDef,
-    default_macro_dict,
-    get_token,
-    get_latex_expression,
-    get_latex_maybe_optional_arg,
-    get_latex_braced_group,
-    get_latex_environment,
-    get_latex_nodes,
-)
+# the pylatexenc 1 compatibility API is imported on first use
+from .. import _util
+_util.lazy_module_attributes(globals(), {
+    'MacrosDef': '._legacy_py1x',
+    'default_macro_dict': '._legacy_py1x',
+    'get_token': '._legacy_py1x',
+    'get_latex_expression': '._legacy_py1x',
+    'get_latex_maybe_optional_arg': '._legacy_py1x',
+    'get_latex_braced_group': '._legacy_py1x',
+    'get_latex_environment': '._legacy_py1x',
+    'get_latex_nodes': '._legacy_py1x',
+})
 ### END_PYLATEXENC1_LEGACY_SUPPORT_CODE
 
 
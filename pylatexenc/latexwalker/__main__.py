@@ -111,8 +111,7 @@ def main(argv=None):
             sys.exit(1)
         latex = args.code
     else:
-        for line in fileinput.input(files=args.files):
-            latex += line
+        latex = ''.join(fileinput.input(files=args.files))
     
     latexwalker = LatexWalker(latex,
                               tolerant_parsing=args.tolerant_parsing,
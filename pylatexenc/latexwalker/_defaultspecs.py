@@ -182,11 +182,17 @@ def _finalize_lstlisting_environment_node(node):
 
 
 
+
+# Each item of `specs` is a pair `(category, make_fn)`, where calling `make_fn()`
+# returns a dictionary with keys 'macros', 'environments' and 'specials'.  The
+# spec objects of a category are only constructed when the category is loaded
+# into a LatexContextDb.
+
 specs = [
     #
     # CATEGORY: latex-paragraph
     #
-    ('latex-paragraph', {
+    ('latex-paragraph', lambda: {
         'macros': [],
         'environments': [],
         'specials': [
@@ -197,7 +203,7 @@ specs = [
     #
     # CATEGORY: latex-base
     #
-    ('latex-base', {
+    ('latex-base', lambda: {
         'macros': [
 
             MacroSpec('documentclass', arguments_spec_list=[
@@ -470,7 +476,7 @@ specs = [
     # so restores the `pylatexenc 2` behavior, where '^' and '_' were ordinary
     # characters that ended up in a chars node along with their surroundings.
     #
-    ('latex-base-subsuperscripts', {
+    ('latex-base-subsuperscripts', lambda: {
         'macros': [],
         'environments': [],
         'specials': [
@@ -482,7 +488,7 @@ specs = [
     #
     # CATEGORY: nonascii-specials
     #
-    ('nonascii-specials', {
+    ('nonascii-specials', lambda: {
         'macros': [],
         'environments': [],
         'specials': [
@@ -501,7 +507,7 @@ specs = [
     #
     # CATEGORY: verbatim
     #
-    ('verbatim', {
+    ('verbatim', lambda: {
         'macros': [
             MacroSpec('verb',
                       arguments_spec_list=[
@@ -526,7 +532,7 @@ specs = [
     #
     # CATEGORY: lstlisting
     #
-    ('lstlisting', {
+    ('lstlisting', lambda: {
         'macros': [],
         'environments': [
             EnvironmentSpec('lstlisting',
@@ -551,7 +557,7 @@ specs = [
     #
     # CATEGORY: theorems
     #
-    ('theorems', {
+    ('theorems', lambda: {
         'macros': [],
         'environments': [
             std_environment('theorem', '['),
@@ -578,7 +584,7 @@ specs = [
     #
     # CATEGORY: enumitem
     #
-    ('enumitem', {
+    ('enumitem', lambda: {
         'macros': [],
         'environments': [
             std_environment('enumerate', '['),
@@ -591,7 +597,7 @@ specs = [
     #
     # CATEGORY: natbib
     #
-    ('natbib', {
+    ('natbib', lambda: {
         'macros': [
             # The final mandatory argument of these is a list of citation keys,
             # not latex code.
@@ -646,7 +652,7 @@ specs = [
     #
     # CATEGORY: latex-ethuebung
     #
-    ('latex-ethuebung', {
+    ('latex-ethuebung', lambda: {
         'macros': [
             # ethuebung
             std_macro('UebungLoesungFont', False, 1),
@@ -28,6 +28,9 @@
 # time and without notice.
 
 
+from ..macrospec._latexcontextdb import LatexContextDbFactory
+
+
 # don't define this function in the `_defaultspecs.py` source file because we
 # would like to be able to define this function without having to actually load
 # the entire default specs module.
@@ -88,28 +91,59 @@ def get_default_latex_context_db():
     irrelevant ones, you can always filter the returned database using
     :py:meth:`pylatexenc.macrospec.LatexContextDb.filter_context()`.
 
+    The definitions of a category are only constructed when they are first
+    needed (see
+    :py:meth:`pylatexenc.macrospec.LatexContextDb.add_lazy_context_category()`),
+    so that the categories that you discard with `filtered_context()` are never
+    constructed.
+
+    Each call builds a new database object that belongs to the caller, and
+    which you can extend as described above.  If you only need to read the
+    default definitions, use :py:func:`get_shared_default_latex_context_db()`
+    instead, which doesn't rebuild the database every time.
+
     .. versionadded:: 2.0
  
        The :py:class:`pylatexenc.macrospec.LatexContextDb` class as well as this
        method, were all introduced in `pylatexenc 2.0`.
     """
+    return _latex_context_db_factory.make_latex_context_db()
 
-    from .. import macrospec
-    from ._defaultspecs import specs
 
-    db = macrospec.LatexContextDb()
-    
-    for cat, catspecs in specs:
-        db.add_context_category(
-            cat,
-            macros=catspecs['macros'],
-            environments=catspecs['environments'],
-            specials=catspecs['specials']
-        )
 
+def get_shared_default_latex_context_db():
+    r"""
+    Return a frozen :py:class:`pylatexenc.macrospec.LatexContextDb` instance
+    with the same definitions as :py:func:`get_default_latex_context_db()`.
+
+    The database is built the first time this function is called, and the same
+    object is returned by all subsequent calls.  It is used by
+    :py:class:`pylatexenc.latexwalker.LatexWalker` when no latex context is specified.
+
+    The returned object is frozen, and it is shared within the whole process, so
+    you can't add definitions to it.  To obtain a database that you can extend,
+    call :py:func:`get_default_latex_context_db()`, or use the
+    :py:meth:`~pylatexenc.macrospec.LatexContextDb.filtered_context()` or
+    :py:meth:`~pylatexenc.macrospec.LatexContextDb.extended_with()` methods of
+    the shared database, which return new objects.
+
+    .. versionadded:: 3.0
+
+       This function was introduced in `pylatexenc 3.0`.
+    """
+    return _latex_context_db_factory.get_shared_latex_context_db()
+
+
+
+def _get_specs():
+    from ._defaultspecs import specs
+    return specs
+
+def _setup_db(db):
+    from .. import macrospec
     db.set_unknown_macro_spec(macrospec.MacroSpec(''))
     db.set_unknown_environment_spec(macrospec.EnvironmentSpec(''))
 
-    return db
-
-#
+# the definitions of each category are only constructed once they are needed,
+# and they are shared by all the databases that this factory builds
+_latex_context_db_factory = LatexContextDbFactory(_get_specs, _setup_db)
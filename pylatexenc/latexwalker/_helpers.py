@@ -36,9 +36,6 @@ from ..latexnodes import ParsingStateDelta
 from ..latexnodes.parsers import LatexParserBase
 
 
-import json
-
-
 #
 # small utilities for displaying & debugging
 #
@@ -206,6 +203,8 @@ def disp_node(n, indent=0, context='* ', skip_group=False):
 
 def make_json_encoder(latexwalker, use_line_numbers=True):
 
+    import json # not needed otherwise, so import it here
+
     class LatexNodesJSONEncoder(json.JSONEncoder):
         # not official API for now
         """
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+import mmap
+import codecs
+from bisect import bisect_right
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+
+class MappedTextFile(object):
+    r"""
+    Text contents of a file that is memory-mapped and decoded lazily, chunk by
+    chunk.
+
+    The object can be used in two ways at the same time:
+
+    - As a text stream, via :py:meth:`read()`, which decodes and returns the
+      next chunk of the file.  This is how a
+      :py:class:`pylatexenc.latexnodes.LatexStreamTokenReader` reads the file.
+
+    - As a read-only string-like object that can be sliced with character
+      positions, e.g. ``mapped_file[pos:pos_end]``, which is what
+      :py:meth:`pylatexenc.latexnodes.nodes.LatexNode.latex_verbatim()` does.
+      Only the chunks that contain the requested range are decoded.
+
+    Each time a chunk is decoded, we remember the character position and the
+    byte offset at which the chunk starts, along with whether the chunk is
+    pure ASCII.  Within an ASCII chunk, character positions map directly to
+    byte offsets, so slicing that chunk doesn't require decoding anything
+    beyond the requested range.
+
+    The `encoding` must be one in which decoding can be restarted at the
+    beginning of any chunk that we have decoded, which is the case for UTF-8
+    and for all single-byte encodings.  (Decoding chunks is done with an
+    incremental decoder, so that chunk boundaries never split a character.)
+
+    Call :py:meth:`close()` to release the memory map when you're done, or use
+    the object as a context manager (``with MappedTextFile(...) as f: ...``).
+    """
+    def __init__(self, filename, encoding='utf-8', chunk_size=65536):
+        super(MappedTextFile, self).__init__()
+
+        self.filename = filename
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+
+        with open(filename, 'rb') as f:
+            size = f.seek(0, 2)
+            if size > 0:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # can't mmap an empty file
+                self._buf = b''
+
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._codec_name = codecs.lookup(encoding).name
+        # ASCII bytes represent the same characters in this encoding (true for
+        # UTF-8, Latin-1, etc.)?
+        self._ascii_compatible = (
+            codecs.decode(_ascii_bytes, encoding) == _ascii_bytes.decode('ascii')
+        )
+
+        # index of the chunks decoded so far; lists of chunk start character
+        # positions, chunk start byte offsets, and ASCII flags
+        self._chunk_char_pos = []
+        self._chunk_byte_pos = []
+        self._chunk_is_ascii = []
+
+        self._next_char_pos = 0
+        self._next_byte_pos = 0
+        # number of bytes buffered by the decoder because they are the first
+        # bytes of an incomplete character
+        self._num_pending_bytes = 0
+        self._ended = False
+
+    def close(self):
+        r"""
+        Close the memory map.  The object can no longer be used after this.
+        Calling this method again has no effect.
+        """
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def read(self, size=-1):
+        r"""
+        Decode and return the next chunk of the file.  The `size` argument is
+        ignored; we always decode the next chunk of `chunk_size` bytes.
+        Returns an empty string when the end of the file is reached.
+        """
+        while not self._ended:
+            text = self._decode_next_chunk()
+            if text:
+                return text
+        return ''
+
+    def _decode_next_chunk(self):
+        byte_pos = self._next_byte_pos
+        byte_pos_end = min(byte_pos + self.chunk_size, len(self._buf))
+        final = (byte_pos_end >= len(self._buf))
+
+        data = self._buf[byte_pos:byte_pos_end]
+        is_ascii = (self._ascii_compatible and self._num_pending_bytes == 0
+                    and _is_ascii(data))
+        if is_ascii:
+            text = data.decode('ascii')
+        else:
+            text = self._decoder.decode(data, final=final)
+
+        if text:
+            # the text starts with the bytes that were buffered by the decoder
+            self._chunk_char_pos.append(self._next_char_pos)
+            self._chunk_byte_pos.append(byte_pos - self._num_pending_bytes)
+            self._chunk_is_ascii.append(is_ascii)
+            self._next_char_pos += len(text)
+
+        if not is_ascii:
+            self._num_pending_bytes = len(self._decoder.getstate()[0])
+        self._next_byte_pos = byte_pos_end
+        if final:
+            self._ended = True
+        return text
+
+    def _index_up_to(self, char_pos):
+        # make sure that the chunk that contains char_pos has been decoded
+        while not self._ended and self._next_char_pos <= char_pos:
+            self._decode_next_chunk()
+
+    def __len__(self):
+        # The number of characters in the part of the file that hasn't been
+        # decoded yet is computed without decoding it, for UTF-8 and
+        # single-byte encodings.  For other encodings, we need to decode the
+        # rest of the file.
+        if self._ended:
+            return self._next_char_pos
+        if self._codec_name == 'utf-8':
+            # count all bytes except UTF-8 continuation bytes, including the
+            # first byte of any incomplete character buffered by the decoder
+            num_chars = 0
+            byte_pos = self._next_byte_pos - self._num_pending_bytes
+            while byte_pos < len(self._buf):
+                byte_pos_end = byte_pos + self.chunk_size
+                num_chars += len(self._buf[byte_pos:byte_pos_end]
+                                 .translate(None, _utf8_continuation_bytes))
+                byte_pos = byte_pos_end
+            return self._next_char_pos + num_chars
+        if _is_single_byte_encoding(self._codec_name):
+            return self._next_char_pos + len(self._buf) - self._next_byte_pos
+        self._index_up_to(float('inf'))
+        return self._next_char_pos
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is not None and key.step != 1:
+                return self[key.start:key.stop][::key.step]
+            start, stop = key.start, key.stop
+            if start is None:
+                start = 0
+            if stop is None or stop < 0 or start < 0:
+                # we need to know the total length for these
+                start, stop, step = key.indices(len(self))
+            return self._get_range(start, stop)
+        pos = key
+        if pos < 0:
+            pos += len(self)
+        s = self._get_range(pos, pos+1)
+        if not s:
+            raise IndexError("MappedTextFile index out of range")
+        return s
+
+    def _get_range(self, start, stop):
+        if stop <= start:
+            return ''
+        self._index_up_to(stop)
+        if start >= self._next_char_pos:
+            return ''
+
+        i = bisect_right(self._chunk_char_pos, start) - 1
+        char_pos = self._chunk_char_pos[i]
+        byte_pos = self._chunk_byte_pos[i]
+
+        if self._chunk_is_ascii[i] \
+           and (i+1 >= len(self._chunk_char_pos) or stop <= self._chunk_char_pos[i+1]):
+            # fast path -- range lies within a single ASCII chunk
+            return self._buf[byte_pos + start - char_pos
+                             : byte_pos + stop - char_pos].decode('ascii')
+
+        j = bisect_right(self._chunk_char_pos, stop - 1)
+        if j < len(self._chunk_byte_pos):
+            byte_pos_end = self._chunk_byte_pos[j]
+        else:
+            byte_pos_end = self._next_byte_pos - self._num_pending_bytes
+        text = codecs.decode(self._buf[byte_pos:byte_pos_end], self.encoding)
+        return text[start - char_pos : stop - char_pos]
+
+    def __str__(self):
+        return self[:]
+
+    def __repr__(self):
+        return "<{} {!r} ({})>".format(self.__class__.__name__, self.filename,
+                                       self.encoding)
+
+
+_ascii_bytes = bytes(bytearray(range(128)))
+
+_utf8_continuation_bytes = bytes(bytearray(range(0x80, 0xC0)))
+
+_single_byte_encodings = {}
+
+def _is_single_byte_encoding(codec_name):
+    # whether each byte decodes to exactly one character in this encoding
+    result = _single_byte_encodings.get(codec_name, None)
+    if result is None:
+        try:
+            result = (
+                len(codecs.decode(bytes(bytearray(range(256))), codec_name)) == 256
+            )
+        except (UnicodeDecodeError, LookupError):
+            result = False
+        _single_byte_encodings[codec_name] = result
+    return result
+
+def _is_ascii(data):
+    try:
+        return data.isascii()
+    except AttributeError:
+        # Python < 3.7
+        try:
+            data.decode('ascii')
+        except UnicodeDecodeError:
+            return False
+        return True
@@ -38,12 +38,20 @@ from ..latexnodes._exctypes import format_pos
 from ..latexnodes.nodes import *
 from ..latexnodes import parsers
 
+#__pragma__('skip')
+from ..latexnodes import _iterativeparse
+#__pragma__('noskip')
+
 
 # fallback to empty context if PYLATEXENC_GET_DEFAULT_SPECS_FN block removed
 get_default_latex_context_db = macrospec.LatexContextDb
+get_shared_default_latex_context_db = macrospec.LatexContextDb
 
 ### BEGIN_PYLATEXENC_GET_DEFAULT_SPECS_FN
-from ._get_defaultspecs import get_default_latex_context_db
+from ._get_defaultspecs import (
+    get_default_latex_context_db,
+    get_shared_default_latex_context_db,
+)
 ### END_PYLATEXENC_GET_DEFAULT_SPECS_FN
 
 from ..latexnodes import ParsingState
@@ -108,7 +116,8 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         macro and environment specifications with instructions on how to parse
         arguments, etc.  If you don't specify this argument, or if you specify
         `None`, then the default database is used.  The default database is
-        obtained with :py:func:`get_default_latex_context_db()`.
+        obtained with :py:func:`get_shared_default_latex_context_db()`, and
+        it is shared by all latex walkers that use it.
 
         It is strongly recommended to specify this argument as a keyword
         argument; we still accept a positional arg for backwards compatibility.
@@ -128,6 +137,27 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         generally won't need to specify this flag, use `tolerant_parsing`
         instead.
 
+      - `iterative_parsing=True|False` If set to `True`, then nested LaTeX
+        groups and math are parsed using an explicit stack instead of
+        recursive calls, so that the nesting depth of the LaTeX code isn't
+        limited by Python's recursion limit.  The resulting node tree is the
+        same.  (Parsers and nodes collector methods that are reimplemented in
+        subclasses are still called recursively, as are the arguments of
+        macros and environments.)  This option has no effect in the
+        Javascript version of `pylatexenc`.
+
+      - `lazy_chars_nodes=False|True|'cache'` If set, then chars nodes whose
+        characters coincide with the parsed string `s` between the node's
+        `pos` and `pos_end` are created as
+        :py:class:`~pylatexenc.latexnodes.nodes.LatexLazyCharsNode` instances,
+        which don't store a copy of the characters but read them from `s`
+        whenever the `chars` attribute is accessed.  This reduces the memory
+        used by node trees that are kept around.  If set to ``'cache'``, the
+        chars are stored in the node the first time they are accessed.  This
+        option has no effect if `s` is not a string (e.g., for a latex walker
+        created with :py:meth:`from_stream()` or :py:meth:`from_file()`), and
+        it has no effect in the Javascript version of `pylatexenc`.
+
     
     The main entry point for parsing is the :py:meth:`parse_content()` method.
     It parses the string `s` you provided in the class' constructor, using the
@@ -220,6 +250,15 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         # will be determined lazily automatically by pos_to_lineno_colno(...)
         self._line_no_calc = None
 
+        # set by from_stream()
+        self._stream_token_reader = None
+        # set by from_file()
+        self._mapped_file = None
+        # set by pretokenize()
+        self._token_array = None
+        # set while parse_content_to_arena() is running
+        self._node_arena = None
+
         self.debug_nodes = False
 
         if default_parsing_state is not None:
@@ -236,8 +275,8 @@ class LatexWalker(latexnodes.LatexWalkerBase):
                 )
 
                 if latex_context is None:
-                    # default -- use default
-                    latex_context = get_default_latex_context_db()
+                    # default -- use the shared default latex context
+                    latex_context = get_shared_default_latex_context_db()
 
             else:
                 # make sure the user didn't also provide a macro_dict= argument
@@ -266,6 +305,8 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         #
         self.tolerant_parsing = kwargs.pop('tolerant_parsing', True)
         self.strict_braces = kwargs.pop('strict_braces', False)
+        self.iterative_parsing = kwargs.pop('iterative_parsing', False)
+        self.lazy_chars_nodes = kwargs.pop('lazy_chars_nodes', False)
 
         if 'keep_inline_math' in kwargs:
             _util.pylatexenc_deprecated_2(
@@ -282,6 +323,160 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         super(LatexWalker, self).__init__()
 
 
+    #__pragma__('skip')
+    @classmethod
+    def from_stream(cls, stream, **kwargs):
+        r"""
+        Create a latex walker that reads the LaTeX code from the text stream
+        `stream` (e.g., a file opened in text mode) instead of from a string.
+
+        The stream is read in chunks by a
+        :py:class:`pylatexenc.latexnodes.LatexStreamTokenReader`, so that the
+        full document never needs to be held in memory.  The keyword arguments
+        `chunk_size` and `lookback` are passed on to the token reader; other
+        keyword arguments are passed on to the constructor.
+
+        Because the stream can only be read once, :py:meth:`make_token_reader()`
+        always returns the same token reader and you can only parse the
+        document once, e.g. with ``lw.parse_content()``.  The attribute `s` is
+        set to an empty string, so nodes cannot report their verbatim LaTeX code
+        with `latex_verbatim()`, but positions and line/column numbers (via
+        :py:meth:`pos_to_lineno_colno()`) refer to the full input.
+        """
+        reader_kwargs = dict(
+            chunk_size=kwargs.pop('chunk_size', None),
+            lookback=kwargs.pop('lookback', None),
+        )
+        latex_walker = cls('', **kwargs)
+        latex_walker._line_no_calc = _util.LineNumbersCalculator(
+            '',
+            line_number_offset=latex_walker.line_number_offset,
+            first_line_column_offset=latex_walker.first_line_column_offset,
+            column_offset=latex_walker.column_offset,
+        )
+        latex_walker._stream_token_reader = latexnodes.LatexStreamTokenReader(
+            stream,
+            line_numbers_calculator=latex_walker._line_no_calc,
+            tolerant_parsing=latex_walker.tolerant_parsing,
+            **reader_kwargs
+        )
+        return latex_walker
+
+    @classmethod
+    def from_file(cls, filename, encoding='utf-8', **kwargs):
+        r"""
+        Create a latex walker that parses the contents of the file `filename`,
+        which is decoded with the given `encoding`.
+
+        The file is memory-mapped and decoded lazily, chunk by chunk, as the
+        parser reads it (see :py:meth:`from_stream()`), so the parser can start
+        producing tokens without first reading and decoding the entire file.
+        The attribute `s` is set to a string-like object that decodes any
+        requested range of the file on demand, so that e.g. `latex_verbatim()`
+        still works for the nodes produced.  Line and column numbers are
+        computed from the decoded chunks as they are read.
+
+        The `encoding` must be UTF-8 or any other encoding in which decoding can
+        be restarted at an arbitrary character boundary (e.g., any single-byte
+        encoding such as Latin-1).
+
+        Additional keyword arguments are passed on to :py:meth:`from_stream()`.
+
+        The file stays memory-mapped until you call :py:meth:`close()` on the
+        returned latex walker.  You can also use the latex walker as a context
+        manager::
+
+            with LatexWalker.from_file('document.tex') as lw:
+                nodes, _ = lw.parse_content()
+
+        The nodes' `latex_verbatim()` method can no longer be used once the
+        file has been closed.
+        """
+        from . import _mappedfile
+        mapped_file = _mappedfile.MappedTextFile(
+            filename,
+            encoding=encoding,
+            chunk_size=kwargs.get('chunk_size', None) or 65536,
+        )
+        latex_walker = cls.from_stream(mapped_file, **kwargs)
+        latex_walker.s = mapped_file
+        latex_walker._mapped_file = mapped_file
+        return latex_walker
+
+    def close(self):
+        r"""
+        Release the resources held by a latex walker created with
+        :py:meth:`from_file()`, i.e., close the memory-mapped file.  For other
+        latex walkers, this method does nothing.
+        """
+        if self._mapped_file is not None:
+            self._mapped_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def parse_content_to_arena(self, parser=None, token_reader=None,
+                               parsing_state=None, open_context=None):
+        r"""
+        Parse the stored LaTeX code like :py:meth:`parse_content()`, and store
+        the resulting node tree in a
+        :py:class:`pylatexenc.latexnodes.LatexNodeArena`.
+
+        The nodes are added to the arena as they are created by
+        :py:meth:`make_node()`.  Once parsing is complete, the arena is
+        finalized with the resulting nodes, and it no longer refers to the node
+        objects.
+
+        The arguments are the same as for :py:meth:`parse_content()`.  Returns a
+        tuple `(arena, parsing_state_delta)`.
+        """
+        if self._node_arena is not None:
+            raise ValueError("parse_content_to_arena() is already running")
+        arena = latexnodes.LatexNodeArena(latex_walker=self)
+        self._node_arena = arena
+        try:
+            nodes, parsing_state_delta = self.parse_content(
+                parser,
+                token_reader=token_reader,
+                parsing_state=parsing_state,
+                open_context=open_context,
+            )
+        finally:
+            self._node_arena = None
+        arena.finalize(nodes)
+        return arena, parsing_state_delta
+
+    def pretokenize(self, parsing_state=None):
+        r"""
+        Read all the tokens of the string `s` once, with the given parsing state
+        (by default, the one returned by :py:meth:`make_parsing_state()`), and
+        store them in a compact form (see
+        :py:class:`pylatexenc.latexnodes.LatexTokenArray`).
+
+        Token readers subsequently returned by :py:meth:`make_token_reader()`
+        serve the stored tokens instead of reading them again, whenever the
+        current parsing state reads tokens in the same way (see
+        :py:class:`pylatexenc.latexnodes.LatexPreTokenizedTokenReader`).  This is
+        worthwhile if the same document is parsed several times.
+
+        Returns the :py:class:`~pylatexenc.latexnodes.LatexTokenArray` instance.
+        """
+        if self._stream_token_reader is not None:
+            raise ValueError("Cannot pretokenize() a latex walker that reads from "
+                             "a stream")
+        if parsing_state is None:
+            parsing_state = self.make_parsing_state()
+        self._token_array = latexnodes.LatexTokenArray(
+            self.s,
+            parsing_state,
+            tolerant_parsing=self.tolerant_parsing,
+        )
+        return self._token_array
+    #__pragma__('noskip')
+
     make_latex_group_parser = parsers.LatexDelimitedGroupParser
 
     make_latex_math_parser = parsers.LatexMathParser
@@ -374,18 +569,18 @@ class LatexWalker(latexnodes.LatexWalkerBase):
                     what, tok = self.open_context
                     if what is not None:
                         if tok is not None:
-                            e.open_contexts.append(
-                                _maketuple(what, tok.pos,
-                                           * self.latex_walker.pos_to_lineno_colno(tok.pos))
+                            e.add_open_context_lazy(
+                                what, tok.pos,
+                                self.latex_walker.pos_to_lineno_colno
                             )
                         else:
                             e.open_contexts.append(
                                 _maketuple(what, None, -1, -1)
                             )
 
-                if hasattr(e, 'pos') and e.lineno is None and e.colno is None:
-                    epos = getattr(e, 'pos')
-                    e.lineno, e.colno = self.latex_walker.pos_to_lineno_colno(epos)
+                # line & column numbers are determined only if they are needed
+                # (and only if they aren't known already)
+                e.set_pos_to_lineno_colno(self.latex_walker.pos_to_lineno_colno)
                 # careful, don't overwrite `e` here; we still need the exception
                 # object itself in order to recover any nodes it carries
                 e_reraise = self.latex_walker.check_tolerant_parsing_ignore_error(e)
@@ -470,9 +665,26 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         string (`self.s`) of this LatexWalker object.  If `pos` is provided,
         then the token reader is initialized to start parsing at the position
         index `pos` in the string.
+
+        If this latex walker was created with :py:meth:`from_stream()`, then the
+        token reader that reads from the stream is returned.
+        If :py:meth:`pretokenize()` was called, then the token reader serves the
+        tokens that were read in advance.
         """
-        token_reader = latexnodes.LatexTokenReader(self.s,
-                                                   tolerant_parsing=self.tolerant_parsing)
+        if self._stream_token_reader is not None:
+            if pos is not None:
+                self._stream_token_reader.move_to_pos_chars(pos)
+            return self._stream_token_reader
+        if self._token_array is not None:
+            token_reader = latexnodes.LatexPreTokenizedTokenReader(
+                self._token_array,
+                tolerant_parsing=self.tolerant_parsing
+            )
+        else:
+            token_reader = latexnodes.LatexTokenReader(
+                self.s,
+                tolerant_parsing=self.tolerant_parsing
+            )
         if pos is not None:
             token_reader.move_to_pos_chars(pos)
         return token_reader
@@ -526,11 +738,73 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         where `parsing_state_delta`, if non-`None`, is a parsing state delta
         object, see :py:class:`pylatexenc.latexnodes.ParsingStateDelta`.  It
         represents changes to the parsing state for parsing subsequent content.
+
+        If the `iterative_parsing` attribute is set, the content is parsed
+        without recursing on the Python call stack for nested groups and math
+        (see the constructor's `iterative_parsing` flag).
         """
 
-        the_parser = None
-        the_token_reader = None
-        the_parsing_state = None
+        #__pragma__('skip')
+        if self.iterative_parsing:
+            return _iterativeparse.run_iterative(
+                self._parse_content_iter(parser, token_reader, parsing_state,
+                                         open_context)
+            )
+        #__pragma__('noskip')
+
+        the_parser, the_token_reader, the_parsing_state, pc = \
+            self._begin_parse_content(parser, token_reader, parsing_state, open_context)
+
+        nodes = None
+        info = None
+
+        with pc:
+
+            try:
+
+                nodes, info = the_parser.parse(
+                    latex_walker=self,
+                    token_reader=the_token_reader,
+                    parsing_state=the_parsing_state,
+                )
+
+            except LatexWalkerEndOfStream:
+                nodes, info = self._parse_content_end_of_stream(the_parser, pc)
+
+        return self._end_parse_content(the_parser, the_token_reader, pc, nodes, info)
+
+    #__pragma__('skip')
+    def _parse_content_iter(self, parser, token_reader, parsing_state, open_context):
+        # Same as parse_content(), as a generator for
+        # _iterativeparse.run_iterative()
+
+        the_parser, the_token_reader, the_parsing_state, pc = \
+            self._begin_parse_content(parser, token_reader, parsing_state, open_context)
+
+        nodes = None
+        info = None
+
+        with pc:
+
+            try:
+
+                nodes, info = yield _iterativeparse.parser_parse_iter(
+                    the_parser,
+                    latex_walker=self,
+                    token_reader=the_token_reader,
+                    parsing_state=the_parsing_state,
+                )
+
+            except LatexWalkerEndOfStream:
+                nodes, info = self._parse_content_end_of_stream(the_parser, pc)
+
+        return self._end_parse_content(the_parser, the_token_reader, pc, nodes, info)
+    #__pragma__('noskip')
+
+    def _begin_parse_content(self, parser, token_reader, parsing_state, open_context):
+        # Return the parser, token reader and parsing state to use in
+        # parse_content(), along with the context manager that captures parse
+        # errors (see new_parsing_open_context())
 
         if parser is None:
             the_parser = parsers.LatexGeneralNodesParser()
@@ -547,38 +821,31 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         else:
             the_parsing_state = parsing_state
 
-        nodes = None
-        info = None
-
         open_context_name, open_context_tok = None, None
         if open_context:
             open_context_name, open_context_tok = open_context
 
-        start_pos = the_token_reader.cur_pos()
         logger.debug(":: Parsing content (%s @ %r) - %r [%r]::",
-                     open_context_name, start_pos, the_parser, the_parsing_state)
+                     open_context_name, the_token_reader.cur_pos(), the_parser,
+                     the_parsing_state)
 
-        with self.new_parsing_open_context(open_context_name, open_context_tok) as pc:
+        pc = self.new_parsing_open_context(open_context_name, open_context_tok)
 
-            try:
+        return the_parser, the_token_reader, the_parsing_state, pc
 
-                nodes, info = the_parser.parse(
-                    latex_walker=self,
-                    token_reader=the_token_reader,
-                    parsing_state=the_parsing_state,
-                )
+    def _parse_content_end_of_stream(self, the_parser, pc):
+        logger.warning("End of stream encountered when parsing content with %s (%s)",
+                       the_parser.__class__.__name__, pc.open_context[0])
+        return None, None
 
-            except LatexWalkerEndOfStream:
-                logger.warning("End of stream encountered when parsing content with %s (%s)",
-                               the_parser.__class__.__name__, open_context_name)
-                nodes, info = None, None
+    def _end_parse_content(self, the_parser, the_token_reader, pc, nodes, info):
 
         if pc.recovery_from_exception is not None:
             nodes, info = \
                 pc.perform_recovery_nodes_and_parsing_state_delta(the_token_reader)
 
-        logger.debug(":: PARSED content (%s @ %r) - %r - result %r + %r DONE ::",
-                     open_context_name, start_pos, the_parser, nodes, info)
+        logger.debug(":: PARSED content (%s) - %r - result %r + %r DONE ::",
+                     pc.open_context[0], the_parser, nodes, info)
 
         return nodes, info
 
@@ -621,6 +888,11 @@ class LatexWalker(latexnodes.LatexWalkerBase):
         All nodes produced by :py:meth:`get_latex_nodes()` and friends use this
         method to create node classes.
 
+        If the `lazy_chars_nodes` option is set (see the class documentation),
+        a :py:class:`LatexCharsNode` whose `chars` coincide with the parsed
+        string between `pos` and `pos_end` is created as a
+        :py:class:`~pylatexenc.latexnodes.nodes.LatexLazyCharsNode` instead.
+
         .. versionadded:: 2.0
         
            This method was introduced in `pylatexenc 2.0`.
@@ -641,12 +913,38 @@ class LatexWalker(latexnodes.LatexWalkerBase):
             len_ = kwargs['len']
             pos_end = pos + len_
 
+        #__pragma__('skip')
+        if self.lazy_chars_nodes and node_class is LatexCharsNode \
+           and self._chars_match_source(kwargs.get('chars', None), pos, pos_end):
+            node_class = LatexLazyCharsNode
+            kwargs['chars'] = None
+            kwargs['cache_chars'] = (self.lazy_chars_nodes == 'cache')
+        #__pragma__('noskip')
+
         node = node_class(pos=pos, pos_end=pos_end, parsing_state=parsing_state,
                           latex_walker=self, **kwargs)
         if self.debug_nodes:
             logger.debug("New node: %r", node)
+        #__pragma__('skip')
+        if self._node_arena is not None:
+            self._node_arena.add_node(node)
+        #__pragma__('noskip')
         return node
 
+    #__pragma__('skip')
+    def _chars_match_source(self, chars, pos, pos_end):
+        # Check whether `chars` is exactly s[pos:pos_end], without making a
+        # copy of that part of the string.  We don't read from `s` if it isn't
+        # a string, e.g. if we're reading from a stream.
+        s = self.s
+        return (
+            isinstance(s, str) and isinstance(chars, str)
+            and pos is not None and pos_end is not None
+            and len(chars) == pos_end - pos
+            and s.startswith(chars, pos)
+        )
+    #__pragma__('noskip')
+
     def make_nodelist(self, nodelist, **kwargs):
         r"""
         Create and return a :py:class:`LatexNodeList` instance that holds the nodes
@@ -755,7 +1053,7 @@ def _legacy_pyltxenc1_LatexWalker_init_from_macro_dict(walker, kwargs):
 
     macro_dict = kwargs.pop('macro_dict', None)
 
-    default_latex_context = get_default_latex_context_db()
+    default_latex_context = get_shared_default_latex_context_db()
 
     # use filtered_context(), not the deprecated filter_context() alias, so that
     # this internal call doesn't emit a deprecation warning of its own
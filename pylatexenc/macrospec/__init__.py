@@ -71,12 +71,14 @@ from ._macrocallparser import (
 
 ### BEGIN_PYLATEXENC2_LEGACY_SUPPORT_CODE
 from ..latexnodes import ParsedArguments as ParsedMacroArgs
-from ._pyltxenc2_argparsers import (
-    MacroStandardArgsParser,
-    ParsedVerbatimArgs,
-    VerbatimArgsParser,
-    ParsedLstListingArgs,
-    LstListingArgsParser,
-)
+# the pylatexenc 2 argument parsers are imported on first use
+from .. import _util
+_util.lazy_module_attributes(globals(), {
+    'MacroStandardArgsParser': '._pyltxenc2_argparsers',
+    'ParsedVerbatimArgs': '._pyltxenc2_argparsers',
+    'VerbatimArgsParser': '._pyltxenc2_argparsers',
+    'ParsedLstListingArgs': '._pyltxenc2_argparsers',
+    'LstListingArgsParser': '._pyltxenc2_argparsers',
+})
 ### END_PYLATEXENC2_LEGACY_SUPPORT_CODE
 
@@ -99,6 +99,9 @@ class LatexEnvironmentBodyContentsParserInfo(LatexDelimitedExpressionParserInfo)
             return True
         return False
 
+    def content_read_char_runs(self):
+        return True
+
     # Note: The default handle_stop_token_condition handler will move past the
     # end environment token.
 
@@ -45,6 +45,15 @@ fn_unique_object_id = id
 ### ENDPATCH_UNIQUE_OBJECT_ID
 
 
+def _flatten_lookup_maps(maps):
+    # merge the given dicts into a single dict; in case of conflicts, the dict
+    # that comes first in `maps` wins.
+    flat = {}
+    for m in reversed(maps):
+        flat.update(m)
+    return flat
+
+
 
 class LatexContextDb(object):
     r"""
@@ -94,7 +103,23 @@ class LatexContextDb(object):
     collection of known macros and environments.
 
     The constructor doesn't accept any meaningful arguments.
+
+    .. py:attribute:: max_lookup_chain_depth
+
+       When the object is frozen, the definitions of all categories are merged
+       into one flat dictionary for each of macros, environments and specials,
+       so that looking up a spec is a single dictionary lookup.  A context
+       created by :py:meth:`extended_with()` stacks its new definitions on top
+       of the flat dictionaries of the original context instead of copying
+       them.  Once more than `max_lookup_chain_depth` dictionaries are stacked
+       in this way, they are merged again into a single flat dictionary.  The
+       default value is 8.  You can set this attribute on the class or on an
+       instance before calling :py:meth:`freeze()` or
+       :py:meth:`extended_with()`.
     """
+
+    max_lookup_chain_depth = 8
+
     def __init__(self, **kwargs):
         super(LatexContextDb, self).__init__(**kwargs)
 
@@ -122,6 +147,19 @@ class LatexContextDb(object):
 
         self._autogen_category_counter = 0
 
+        # index of specials by their first character, built when the object is
+        # frozen (see _build_specials_index())
+        self._specials_index = None
+
+        # lookup maps for macros, environments and specials, built when the
+        # object is frozen (see _build_lookup_maps()).  Each one is either a
+        # dict or a short ChainMap of dicts.
+        self._lookup_maps = None
+
+        # {category: load_fn} for the categories that were added with
+        # add_lazy_context_category() and that weren't loaded yet
+        self._lazy_categories = {}
+
 
     def freeze(self):
         r"""
@@ -133,8 +171,50 @@ class LatexContextDb(object):
 
         So what the latexwalker does is that it `freeze()`\ s the context db
         object to prevent future changes.
+
+        Freezing the object also builds an index of the known specials, which
+        speeds up :py:meth:`test_for_specials()`, and flat lookup tables for
+        :py:meth:`get_macro_spec()`, :py:meth:`get_environment_spec()` and
+        :py:meth:`get_specials_spec()` (see :py:attr:`max_lookup_chain_depth`).
         """
+        self._load_all_categories()
         self.frozen = True
+        self._build_specials_index()
+        self._build_lookup_maps()
+
+    def _build_lookup_maps(self):
+        self._lookup_maps = {}
+        for which in ('macros', 'environments', 'specials',):
+            self._lookup_maps[which] = \
+                _flatten_lookup_maps(self.lookup_chain_maps[which].maps)
+
+    def _lookup(self, which, key):
+        if self._lookup_maps is not None:
+            return self._lookup_maps[which][key]
+        if len(self._lazy_categories): # len() for Transcrypt
+            return self._lookup_lazy(which, key)
+        return self.lookup_chain_maps[which][key]
+
+    def _build_specials_index(self):
+        # Map each character to the list of specials that start with that
+        # character, as `(specials_chars, spec)` tuples sorted by decreasing
+        # length.  The longest match wins; for a given specials_chars, the spec
+        # in the category that comes first in the category list wins.
+        index = {}
+        seen = {}
+        for cat in self.category_list:
+            specials_dict = self.d[cat]['specials']
+            for specials_chars in specials_dict.keys():
+                if specials_chars in seen or len(specials_chars) == 0:
+                    continue
+                seen[specials_chars] = True
+                c = specials_chars[:1]
+                if c not in index:
+                    index[c] = []
+                index[c].append( (specials_chars, specials_dict[specials_chars]) )
+        for c in index.keys():
+            index[c] = sorted(index[c], key=lambda x: len(x[0]), reverse=True)
+        self._specials_index = index
 
     
     def __repr__(self):
@@ -175,7 +255,62 @@ class LatexContextDb(object):
 
         You may only specify one of `prepend=True`, `insert_before='...'` or
         `insert_after='...'`.
+
+        See also :py:meth:`add_lazy_context_category()`.
         """
+        self._add_context_category(
+            category,
+            category_dicts={
+                'macros': dict( (m.macroname, m) for m in macros ),
+                'environments': dict( (e.environmentname, e) for e in environments ),
+                'specials': dict( (s.specials_chars, s) for s in specials ),
+            },
+            load_fn=None,
+            prepend=prepend,
+            insert_before=insert_before,
+            insert_after=insert_after,
+        )
+
+    def add_lazy_context_category(self, category, load_fn,
+                                  prepend=False, insert_before=None, insert_after=None):
+        r"""
+        Register a category of specifications whose definitions are only
+        constructed when they are first needed.
+
+        The argument `load_fn` is a callable that takes no arguments and that
+        returns a dictionary with keys `'macros'`, `'environments'` and
+        `'specials'`, whose values are iterables of spec objects as for the
+        arguments of the same name of :py:meth:`add_context_category()`.  The
+        remaining arguments have the same meaning as for
+        :py:meth:`add_context_category()`.
+
+        The function `load_fn` is called at most once, when the definitions of
+        this category are first needed, for instance when a macro is looked up
+        and wasn't found in any of the categories that come before this one, or
+        when the database is frozen.  Selecting categories with
+        :py:meth:`filtered_context()` doesn't load any categories; the
+        categories that are discarded are never loaded.
+
+        The default latex contexts
+        (:py:func:`pylatexenc.latexwalker.get_default_latex_context_db()` and
+        :py:func:`pylatexenc.latex2text.get_default_latex_context_db()`)
+        register their categories in this way.
+
+        .. versionadded:: 3.0
+
+           This method was introduced in `pylatexenc 3.0`.
+        """
+        self._add_context_category(
+            category,
+            category_dicts={ 'macros': {}, 'environments': {}, 'specials': {}, },
+            load_fn=load_fn,
+            prepend=prepend,
+            insert_before=insert_before,
+            insert_after=insert_after,
+        )
+
+    def _add_context_category(self, category, category_dicts, load_fn,
+                              prepend, insert_before, insert_after):
 
         if self.frozen:
             raise RuntimeError("You attempted to modify a frozen LatexContextDb object.")
@@ -197,12 +332,6 @@ class LatexContextDb(object):
             raise TypeError("add_context_category(): You may only specify one of "
                             "prepend=True, insert_before=... or insert_after=...")
 
-        category_dicts = {
-            'macros': dict( (m.macroname, m) for m in macros ),
-            'environments': dict( (e.environmentname, e) for e in environments ),
-            'specials': dict( (s.specials_chars, s) for s in specials ),
-        }
-
         logger.debug("Adding category context in db: %r", category_dicts)
 
         if prepend:
@@ -228,6 +357,42 @@ class LatexContextDb(object):
 
         self.d[category] = category_dicts
 
+        if load_fn is not None:
+            self._lazy_categories[category] = load_fn
+
+    def _load_category(self, category):
+        # Construct the definitions of the given category, if it is a lazy
+        # category that wasn't loaded yet.  The definitions are filled into the
+        # category's (so far empty) dictionaries, which are already part of the
+        # lookup chain maps.
+        load_fn = self._lazy_categories.pop(category, None)
+        if load_fn is None:
+            return
+        logger.debug("Loading lazy category %r in context db %r", category, self)
+        catspecs = load_fn()
+        category_dicts = self.d[category]
+        for m in catspecs.get('macros', []):
+            category_dicts['macros'][m.macroname] = m
+        for e in catspecs.get('environments', []):
+            category_dicts['environments'][e.environmentname] = e
+        for s in catspecs.get('specials', []):
+            category_dicts['specials'][s.specials_chars] = s
+
+    def _load_all_categories(self):
+        if len(self._lazy_categories): # len() for Transcrypt
+            for cat in list(self.category_list):
+                self._load_category(cat)
+
+    def _lookup_lazy(self, which, key):
+        # Look up a definition while some categories are not loaded yet.  Only
+        # the categories up to the first one that defines `key` are loaded.
+        for cat in self.category_list:
+            self._load_category(cat)
+            d = self.d[cat][which]
+            if key in d:
+                return d[key]
+        raise KeyError(key)
+
         
     def set_unknown_macro_spec(self, macrospec):
         r"""
@@ -290,7 +455,7 @@ class LatexContextDb(object):
         #     if macroname in self.d[cat]['macros']:
         #         return self.d[cat]['macros'][macroname]
         try:
-            return self.lookup_chain_maps['macros'][macroname]
+            return self._lookup('macros', macroname)
         except KeyError:
             if raise_if_not_found:
                 raise
@@ -312,7 +477,7 @@ class LatexContextDb(object):
         #     if environmentname in self.d[cat]['environments']:
         #         return self.d[cat]['environments'][environmentname]
         try:
-            return self.lookup_chain_maps['environments'][environmentname]
+            return self._lookup('environments', environmentname)
         except KeyError:
             if raise_if_not_found:
                 raise
@@ -342,7 +507,7 @@ class LatexContextDb(object):
         #     if specials_chars in self.d[cat]['specials']:
         #         return self.d[cat]['specials'][specials_chars]
         try:
-            return self.lookup_chain_maps['specials'][specials_chars]
+            return self._lookup('specials', specials_chars)
         except KeyError:
             if raise_if_not_found:
                 raise
@@ -359,6 +524,18 @@ class LatexContextDb(object):
         Returns a specials spec instance, or `None` if no specials are detected
         at the position `pos`.
         """
+        if self._specials_index is not None:
+            # frozen object -- use the specials index
+            c = s[pos:pos+1]
+            if c not in self._specials_index:
+                return None
+            for specials_chars, spec in self._specials_index[c]:
+                if s.startswith(specials_chars, pos):
+                    return spec
+            return None
+
+        self._load_all_categories()
+
         best_match_len = 0
         best_match_s = None
 
@@ -377,6 +554,22 @@ class LatexContextDb(object):
 
         return best_match_s # this is None if no match
 
+    def get_specials_initial_chars(self):
+        r"""
+        Return a `frozenset` of all the characters with which any of the known
+        specials begin.  The token reader uses this information to skip quickly
+        over runs of characters that cannot be specials.  Also see
+        :py:meth:`pylatexenc.latexnodes.LatexContextDbBase.get_specials_initial_chars()`.
+        """
+        if self._specials_index is not None:
+            return frozenset(self._specials_index.keys())
+        self._load_all_categories()
+        return frozenset([
+            specials_chars[:1]
+            for cat in self.category_list
+            for specials_chars in self.d[cat]['specials'].keys()
+        ])
+
     def iter_macro_specs(self, categories=None):
         r"""
         Yield the macro specs corresponding to all macros in the given categories.
@@ -399,6 +592,7 @@ class LatexContextDb(object):
                     "Invalid latex macro spec db category: {!r} (Expected one of {!r})"
                     .format(c, self.category_list)
                 )
+            self._load_category(c)
             for spec in self.d[c]['macros'].values():
                 yield spec
 
@@ -425,6 +619,7 @@ class LatexContextDb(object):
                     "Invalid latex environment spec db category: {!r} (Expected one of {!r})"
                     .format(c, self.category_list)
                 )
+            self._load_category(c)
             for spec in self.d[c]['environments'].values():
                 yield spec
 
@@ -451,6 +646,7 @@ class LatexContextDb(object):
                     "Invalid latex environment spec db category: {!r} (Expected one of {!r})"
                     .format(c, self.category_list)
                 )
+            self._load_category(c)
             for spec in self.d[c]['specials'].values():
                 yield spec
 
@@ -523,6 +719,16 @@ class LatexContextDb(object):
             if exclude_categories and cat in exclude_categories:
                 continue
 
+            if cat in self._lazy_categories:
+                # include this category, but don't load it yet
+                new_context.add_lazy_context_category(
+                    cat,
+                    self._make_filtered_load_fn(
+                        cat, keep_macros, keep_environments, keep_specials
+                    ),
+                )
+                continue
+
             # include this category
             new_context.add_context_category(
                 cat,
@@ -533,6 +739,19 @@ class LatexContextDb(object):
 
         return new_context
 
+    def _make_filtered_load_fn(self, cat, keep_macros, keep_environments, keep_specials):
+        # Loading the category in the filtered context loads it here, so that
+        # both contexts share the same spec objects.
+        def load_fn():
+            self._load_category(cat)
+            return {
+                'macros': self.d[cat]['macros'].values() if keep_macros else [],
+                'environments':
+                    self.d[cat]['environments'].values() if keep_environments else [],
+                'specials': self.d[cat]['specials'].values() if keep_specials else [],
+            }
+        return load_fn
+
     def _get_new_autogen_category(self):
         while True:
             category = _autogen_category_prefix + str(self._autogen_category_counter)
@@ -570,6 +789,8 @@ class LatexContextDb(object):
 
         new_context = create_class()
 
+        new_context.max_lookup_chain_depth = self.max_lookup_chain_depth
+
         new_context.unknown_macro_spec = \
             kwargs.pop('unknown_macro_spec', self.unknown_macro_spec)
         new_context.unknown_environment_spec = \
@@ -637,6 +858,8 @@ class LatexContextDb(object):
 
             # need to be frozen to prevent edits here affecting edits in the original object
             new_context.frozen = True
+            new_context._extend_specials_index(self, new_category_dicts['specials'])
+            new_context._extend_lookup_maps(self, new_category_dicts)
             logger.debug(
                 "Latex Context DB %r ---> extended with %r [extend auto-cat %s] ---> %r",
                 self,
@@ -677,6 +900,8 @@ class LatexContextDb(object):
         }
 
         new_context.frozen = True
+        new_context._extend_specials_index(self, new_category_dicts['specials'])
+        new_context._extend_lookup_maps(self, new_category_dicts)
 
         logger.debug(
             "Latex Context DB %r ---> extended with %r [new cat %s] ---> %r",
@@ -689,7 +914,204 @@ class LatexContextDb(object):
         #logger.debug("extended_with(): new context is = %r", new_context)
         return new_context
 
+    def _extend_specials_index(self, base_context, new_specials):
+        # The new specials take precedence over all of base_context's specials
+        # (they are in the first category), so we can update a copy of
+        # base_context's specials index with them rather than building the
+        # index again from all categories.
+        base_index = base_context._specials_index
+        if base_index is None:
+            self._build_specials_index()
+            return
+        if len(new_specials) == 0:
+            # no new specials, the index is unchanged
+            self._specials_index = base_index
+            return
+        index = dict(base_index)
+        new_entries = {}
+        for specials_chars in new_specials.keys():
+            if len(specials_chars) == 0:
+                continue
+            c = specials_chars[:1]
+            if c not in new_entries:
+                new_entries[c] = []
+            new_entries[c].append( (specials_chars, new_specials[specials_chars]) )
+        for c in new_entries.keys():
+            entries = new_entries[c]
+            if c in index:
+                entries = entries + [ x for x in index[c] if x[0] not in new_specials ]
+            index[c] = sorted(entries, key=lambda x: len(x[0]), reverse=True)
+        self._specials_index = index
+
+    def _extend_lookup_maps(self, base_context, new_category_dicts):
+        # The new definitions take precedence over all of base_context's
+        # definitions (they are in the first category), so we can stack them on
+        # top of base_context's lookup maps.
+        if base_context._lookup_maps is None:
+            base_context._build_lookup_maps()
+        self._lookup_maps = {}
+        for which in ('macros', 'environments', 'specials',):
+            base_map = base_context._lookup_maps[which]
+            new_map = new_category_dicts[which]
+            if len(new_map) == 0:
+                self._lookup_maps[which] = base_map
+                continue
+            if isinstance(base_map, dict):
+                maps = [ new_map, base_map ]
+            else:
+                maps = [ new_map ] + base_map.maps
+            if len(maps) > self.max_lookup_chain_depth:
+                self._lookup_maps[which] = _flatten_lookup_maps(maps)
+            else:
+                self._lookup_maps[which] = _util.ChainMap(*maps)
+
+    #__pragma__('skip')
+    def dump_snapshot(self, f, fingerprint=None):
+        r"""
+        Save this context database to a snapshot that can be loaded back with
+        :py:meth:`load_snapshot()` much faster than building the database
+        again.  The object must be frozen.
+
+        The argument `f` is a file object opened in binary mode.
+
+        The snapshot records the `pylatexenc` and Python versions, and the
+        given `fingerprint`, which can be any picklable object that can be
+        compared with ``==`` (for instance, a version string for your custom
+        categories).  A snapshot is only loaded if all these match.
+
+        Raises `RuntimeError` if the object is not frozen.
+
+        The snapshot uses the :py:mod:`pickle` module.  Specs (and their
+        parsers and callables) must be picklable, except that functions that
+        are not reachable by name, such as lambdas and closures, are saved along
+        with their code.  As with any pickle, only load snapshots from trusted
+        locations.
+
+        .. versionadded:: 3.0
+        """
+        from ._snapshot import dump_latex_context_db_snapshot
+        dump_latex_context_db_snapshot(self, f, fingerprint=fingerprint)
+
+    @classmethod
+    def load_snapshot(cls, f, fingerprint=None):
+        r"""
+        Load a context database previously saved with :py:meth:`dump_snapshot()`
+        from the binary file object `f`.  The returned object is frozen.
+
+        Raises `ValueError` if the snapshot was created with a different version
+        of `pylatexenc` or of Python, or with a different `fingerprint`.
+
+        .. versionadded:: 3.0
+        """
+        from ._snapshot import load_latex_context_db_snapshot
+        return load_latex_context_db_snapshot(f, fingerprint=fingerprint)
+
+    @classmethod
+    def load_snapshot_or_build(cls, filename, build_fn, fingerprint=None):
+        r"""
+        Load the context database snapshot stored in the file `filename`, or
+        build the database if there is no valid snapshot.
+
+        If the file does not exist, cannot be read, or contains a snapshot that
+        is stale (see :py:meth:`load_snapshot()`), then `build_fn()` is called
+        to build a new context database object.  The new object is frozen and
+        saved to `filename` for next time (failing to save the snapshot is not
+        an error), and returned.
+
+        For instance::
+
+            from pylatexenc import latex2text
+            from pylatexenc.macrospec import LatexContextDb
 
+            def build_fn():
+                db = latex2text.get_default_latex_context_db()
+                db.add_context_category('my-macros', macros=[ ... ])
+                return db
+
+            latex_context = LatexContextDb.load_snapshot_or_build(
+                '/tmp/my-latex2text-context.snapshot',
+                build_fn,
+                fingerprint='my-macros-v1',
+            )
+            l2t = latex2text.LatexNodes2Text(latex_context=latex_context)
+
+        Change the `fingerprint` whenever `build_fn` changes, so that outdated
+        snapshots are discarded.
+
+        .. versionadded:: 3.0
+        """
+        from ._snapshot import load_or_build_latex_context_db_snapshot
+        return load_or_build_latex_context_db_snapshot(
+            filename, build_fn, fingerprint=fingerprint
+        )
+    #__pragma__('noskip')
+
+
+
+
+
+class LatexContextDbFactory(object):
+    r"""
+    Build :py:class:`LatexContextDb` instances from a table of categories whose
+    definitions are constructed lazily.  This class implements the
+    `get_default_latex_context_db()` and
+    `get_shared_default_latex_context_db()` functions of
+    :py:mod:`pylatexenc.latexwalker` and :py:mod:`pylatexenc.latex2text`.
+
+    Arguments:
+
+    - `get_specs_fn()` should return a list of `(category, make_catspecs)`
+      tuples.  Each `make_catspecs()` returns the category's definitions as a
+      dictionary `{'macros': [...], 'environments': [...], 'specials':
+      [...]}`.  It is only called when the category's definitions are first
+      needed (see :py:meth:`LatexContextDb.add_lazy_context_category()`), and
+      at most once: all the databases built by this factory share the same
+      spec objects.
+
+    - `setup_db_fn(db)`, if not `None`, is called for each new database after
+      its categories were added, e.g., to set the specs for unknown macros.
+    """
+    def __init__(self, get_specs_fn, setup_db_fn=None):
+        super(LatexContextDbFactory, self).__init__()
+        self.get_specs_fn = get_specs_fn
+        self.setup_db_fn = setup_db_fn
+
+        # {category: catspecs} of the categories that were already constructed
+        self._loaded_category_specs = {}
+
+        self._shared_latex_context_db = None
+
+    def make_latex_context_db(self):
+        r"""
+        Return a new, unfrozen :py:class:`LatexContextDb` instance with all the
+        categories.
+        """
+        db = LatexContextDb()
+        for cat, make_catspecs in self.get_specs_fn():
+            db.add_lazy_context_category(cat, self._get_category_load_fn(cat, make_catspecs))
+        if self.setup_db_fn is not None:
+            self.setup_db_fn(db)
+        return db
+
+    def _get_category_load_fn(self, cat, make_catspecs):
+        loaded_category_specs = self._loaded_category_specs
+        def load_fn():
+            if cat not in loaded_category_specs:
+                loaded_category_specs[cat] = make_catspecs()
+            return loaded_category_specs[cat]
+        return load_fn
+
+    def get_shared_latex_context_db(self):
+        r"""
+        Return a frozen :py:class:`LatexContextDb` instance that is built by
+        :py:meth:`make_latex_context_db()` the first time this method is
+        called, and that is returned again by all subsequent calls.
+        """
+        if self._shared_latex_context_db is None:
+            db = self.make_latex_context_db()
+            db.freeze()
+            self._shared_latex_context_db = db
+        return self._shared_latex_context_db
 
 
 
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2022 Philippe Faist
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+# Internal module. Internal API may move, disappear or otherwise change at any
+# time and without notice.
+
+# This module is not meant to be transcribed to Javascript.
+
+
+import os
+import sys
+import types
+import marshal
+import pickle
+import importlib
+
+import logging
+logger = logging.getLogger(__name__)
+
+from ..version import version_str as _pylatexenc_version_str
+
+
+# Increase this number whenever the snapshot format changes
+_snapshot_format_version = 1
+
+
+def _snapshot_header(fingerprint):
+    # Snapshots contain marshalled code objects (see _SnapshotPickler), which
+    # are specific to the Python implementation and version.
+    return {
+        'snapshot_format': _snapshot_format_version,
+        'pylatexenc_version': _pylatexenc_version_str,
+        'python': (sys.implementation.cache_tag, marshal.version),
+        'fingerprint': fingerprint,
+    }
+
+
+def _make_cell(value):
+    return (lambda: value).__closure__[0]
+
+
+class _SnapshotPickler(pickle.Pickler):
+    r"""
+    A pickler that can also store functions that pickle cannot find by name,
+    such as lambdas and the closures created by the spec helpers (e.g. the
+    `simplify_repl` formatters in :py:mod:`pylatexenc.latex2text`).  These
+    functions are stored as their marshalled code object along with the name of
+    their module (for their globals), their default arguments and the contents
+    of their closure cells.
+    """
+    def __init__(self, *args, **kwargs):
+        super(_SnapshotPickler, self).__init__(*args, **kwargs)
+        self._functions_in_progress = set()
+
+    def persistent_id(self, obj):
+        if type(obj) is not types.FunctionType or _is_picklable_by_name(obj):
+            return None
+
+        if id(obj) in self._functions_in_progress:
+            raise pickle.PicklingError(
+                "Cannot snapshot recursive closure {!r}".format(obj)
+            )
+        self._functions_in_progress.add(id(obj))
+        try:
+            closure = None
+            if obj.__closure__ is not None:
+                try:
+                    closure = tuple([ c.cell_contents for c in obj.__closure__ ])
+                except ValueError:
+                    raise pickle.PicklingError(
+                        "Cannot snapshot function {!r} with an empty closure cell"
+                        .format(obj)
+                    )
+            return (
+                'function',
+                marshal.dumps(obj.__code__),
+                obj.__module__,
+                obj.__name__,
+                obj.__qualname__,
+                obj.__defaults__,
+                obj.__kwdefaults__,
+                closure,
+            )
+        finally:
+            self._functions_in_progress.discard(id(obj))
+
+
+def _is_picklable_by_name(fn):
+    obj = sys.modules.get(fn.__module__)
+    if obj is None:
+        return False
+    for name in fn.__qualname__.split('.'):
+        obj = getattr(obj, name, None)
+    return obj is fn
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        (what, code, module_name, name, qualname,
+         defaults, kwdefaults, closure) = pid
+        if what != 'function':
+            raise pickle.UnpicklingError(
+                "Invalid persistent id in snapshot: {!r}".format(what)
+            )
+        fn_globals = importlib.import_module(module_name).__dict__
+        if closure is not None:
+            closure = tuple([ _make_cell(value) for value in closure ])
+        fn = types.FunctionType(marshal.loads(code), fn_globals, name,
+                                defaults, closure)
+        fn.__qualname__ = qualname
+        fn.__kwdefaults__ = kwdefaults
+        return fn
+
+
+def dump_latex_context_db_snapshot(latex_context, f, fingerprint=None):
+    r"""
+    Write the frozen `latex_context` to the binary file object `f`.  See
+    :py:meth:`pylatexenc.macrospec.LatexContextDb.dump_snapshot()`.
+    """
+    if not latex_context.frozen:
+        raise RuntimeError(
+            "You can only save frozen LatexContextDb objects to a snapshot; "
+            "call freeze() first"
+        )
+    protocol = pickle.HIGHEST_PROTOCOL
+    pickle.dump(_snapshot_header(fingerprint), f, protocol=protocol)
+    _SnapshotPickler(f, protocol=protocol).dump(latex_context)
+
+
+def load_latex_context_db_snapshot(f, fingerprint=None):
+    r"""
+    Read a snapshot from the binary file object `f`.  See
+    :py:meth:`pylatexenc.macrospec.LatexContextDb.load_snapshot()`.
+    """
+    header = pickle.load(f)
+    expected_header = _snapshot_header(fingerprint)
+    if not isinstance(header, dict) or header != expected_header:
+        raise ValueError(
+            "LatexContextDb snapshot is stale or incompatible (got {!r}, "
+            "expected {!r})".format(header, expected_header)
+        )
+    return _SnapshotUnpickler(f).load()
+
+
+def load_or_build_latex_context_db_snapshot(filename, build_fn, fingerprint=None):
+    r"""
+    Load the snapshot in `filename`, or build and save a new one.  See
+    :py:meth:`pylatexenc.macrospec.LatexContextDb.load_snapshot_or_build()`.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            return load_latex_context_db_snapshot(f, fingerprint=fingerprint)
+    except (IOError, OSError) as e:
+        logger.debug("Can't read LatexContextDb snapshot %r (%s), building it",
+                     filename, e)
+    except Exception as e:
+        # stale or corrupt snapshot
+        logger.debug("Ignoring LatexContextDb snapshot %r (%s), rebuilding it",
+                     filename, e)
+
+    latex_context = build_fn()
+    latex_context.freeze()
+
+    # write to a temporary file first so that concurrent processes never see a
+    # partially written snapshot
+    tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+    try:
+        with open(tmp_filename, 'wb') as f:
+            dump_latex_context_db_snapshot(latex_context, f,
+                                           fingerprint=fingerprint)
+        os.replace(tmp_filename, filename)
+    except Exception as e:
+        logger.warning("Could not save LatexContextDb snapshot to %r: %s",
+                       filename, e)
+        try:
+            os.remove(tmp_filename)
+        except (IOError, OSError):
+            pass
+
+    return latex_context
@@ -4,6 +4,11 @@ import unittest
 import logging
 import warnings
 import json
+import io
+import pickle
+import weakref
+import os
+import tempfile
 
 import pytest
 
@@ -18,6 +23,7 @@ from pylatexenc.latexwalker import (
 from pylatexenc import macrospec
 
 from pylatexenc.latexnodes import ParsedArgumentsInfo
+from pylatexenc.latexnodes.nodes import LatexNodeList, LatexLazyCharsNode
 from pylatexenc.latexnodes import parsers as latexnodes_parsers
 
 from ._helpers_tests import HelperProvideAssertEqualsForLegacyTests
@@ -1112,8 +1118,32 @@ Also: {\itshape some italic text}.
             # should not raise this.
             self.fail("get_latex_nodes() raised LatexWalkerParseError, but it shouldn't have in "
                       "tolerant parsing mode!\n"+str(e))
-            
-    
+
+    def test_errors_lazy_location(self):
+        latextext = "Text\n\\begin{itemize}\n\\item A {group\n\\end{itemize}\n"
+
+        calls = []
+        class MyLatexWalker(LatexWalker):
+            def pos_to_lineno_colno(self, pos, as_dict=False):
+                calls.append(pos)
+                return super(MyLatexWalker, self).pos_to_lineno_colno(pos, as_dict)
+
+        # recovered errors in tolerant parsing mode are never formatted
+        lw = MyLatexWalker(latextext, tolerant_parsing=True)
+        lw.get_latex_nodes()
+        self.assertEqual(calls, [])
+
+        lw = MyLatexWalker(latextext, tolerant_parsing=False)
+        with self.assertRaises(LatexWalkerParseError) as cm:
+            lw.get_latex_nodes()
+        e = cm.exception
+        self.assertEqual(calls, [])
+        self.assertEqual((e.lineno, e.colno), (4, 0))
+        self.assertEqual(e.open_contexts[-1][1:], (5, 2, 0))
+        self.assertIn('@ (line 4, col 0)', str(e))
+        self.assertEqual(e.args, (str(e),))
+
+
 
     def test_verbatim(self):
 
@@ -1898,6 +1928,71 @@ Use macros: \a{} and \b{xxx}{yyy}.
             ]
         )
 
+    def test_parsing_state_sub_context_shared(self):
+
+        latextext = r"Inline $a$, $b$ and $$c$$, and more $d$."
+
+        lw = LatexWalker(latextext, tolerant_parsing=False)
+        parsing_state = lw.make_parsing_state()
+
+        ps_math = parsing_state.sub_context(in_math_mode=True, math_mode_delimiter='$')
+        self.assertIs(
+            parsing_state.sub_context(math_mode_delimiter='$', in_math_mode=True),
+            ps_math
+        )
+        self.assertIsNot(parsing_state.sub_context(in_math_mode=True,
+                                                   math_mode_delimiter='$$'),
+                         ps_math)
+        # list values are compared by their items
+        ps_delims = parsing_state.sub_context(latex_group_delimiters=[('{','}'),('[',']')])
+        self.assertEqual(ps_delims.latex_group_delimiters, [('{','}'),('[',']')])
+        self.assertIs(
+            parsing_state.sub_context(latex_group_delimiters=[('{','}'),('[',']')]),
+            ps_delims
+        )
+
+        nodes, _, _ = lw.get_latex_nodes(pos=0, parsing_state=parsing_state)
+        math_nodes = [ n for n in nodes if n.isNodeType(LatexMathNode) ]
+        self.assertEqual(len(math_nodes), 4)
+        self.assertIs(math_nodes[0].nodelist[0].parsing_state, ps_math)
+        self.assertIs(math_nodes[1].nodelist[0].parsing_state, ps_math)
+        self.assertIs(math_nodes[3].nodelist[0].parsing_state, ps_math)
+        self.assertEqual(math_nodes[2].nodelist[0].parsing_state.math_mode_delimiter,
+                         '$$')
+
+    def test_parsing_state_sub_context_read_only(self):
+
+        lw = LatexWalker(r"Inline $a$ and $b$.", tolerant_parsing=False)
+        parsing_state = lw.make_parsing_state()
+
+        ps_math_1 = parsing_state.sub_context(in_math_mode=True)
+        ps_math_2 = parsing_state.sub_context(in_math_mode=True)
+        self.assertIs(ps_math_1, ps_math_2)
+
+        # a shared state can't be changed by one of its users
+        with self.assertRaises(AttributeError):
+            ps_math_1.in_math_mode = False
+        with self.assertRaises(AttributeError):
+            ps_math_1.set_fields(in_math_mode=False)
+        self.assertTrue(ps_math_2.in_math_mode)
+        self.assertFalse(ps_math_2.sub_context(in_math_mode=False).in_math_mode)
+        # other attributes can still be set
+        ps_math_1.my_attribute = 'x'
+
+        # states derived with another latex context are only remembered while
+        # they are in use, so that the cache doesn't keep the context alive
+        latex_context = parsing_state.latex_context.extended_with(macros=[])
+        latex_context_ref = weakref.ref(latex_context)
+        ps_ctx = parsing_state.sub_context(latex_context=latex_context)
+        self.assertIs(parsing_state.sub_context(latex_context=latex_context), ps_ctx)
+        del ps_ctx, latex_context
+        self.assertIsNone(latex_context_ref())
+
+        ps_math_copy = pickle.loads(pickle.dumps(ps_math_1))
+        self.assertTrue(ps_math_copy.in_math_mode)
+        self.assertEqual(len(ps_math_copy._sub_context_cache), 0)
+
+
 
 
 
@@ -2380,7 +2475,204 @@ Use macros: \a{} and \b{xxx}{yyy}.
         self.assertIsNone(parsing_state_delta)
         self.assertIsNone(parsing_state_delta_explicit)
 
+    def test_from_stream(self):
+        latextext = get_test_latex_data_with_possible_inconsistencies()
+
+        lw = LatexWalker(latextext, tolerant_parsing=True)
+        nodes, _ = lw.parse_content()
+
+        lw_stream = LatexWalker.from_stream(io.StringIO(latextext), chunk_size=32,
+                                            tolerant_parsing=True)
+        nodes_stream, _ = lw_stream.parse_content()
+
+        def node_summary(nodelist):
+            return [
+                (n.nodeType().__name__, n.pos, n.pos_end,
+                 lw_stream.pos_to_lineno_colno(n.pos))
+                for n in nodelist
+            ]
+
+        self.assertEqual(
+            node_summary(nodes_stream),
+            [ (n.nodeType().__name__, n.pos, n.pos_end, lw.pos_to_lineno_colno(n.pos))
+              for n in nodes ]
+        )
+        self.assertEqual(
+            [ n.chars for n in nodes_stream if n.isNodeType(LatexCharsNode) ],
+            [ n.chars for n in nodes if n.isNodeType(LatexCharsNode) ],
+        )
+
+    def test_from_file(self):
+        latextext_base = get_test_latex_data_with_possible_inconsistencies()
+
+        for encoding, more_text in (('utf-8', "Non-ASCII: été, ∀ε>0, \U0001d49c.\n"),
+                                    ('latin-1', "Non-ASCII: été.\n")):
+            latextext = latextext_base + more_text * 20
+
+            lw = LatexWalker(latextext, tolerant_parsing=True)
+            nodes, _ = lw.parse_content()
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                fn = os.path.join(tmpdir, 'doc.tex')
+                with open(fn, 'w', encoding=encoding) as f:
+                    f.write(latextext)
+
+                with LatexWalker.from_file(fn, encoding=encoding, chunk_size=64) as lw_f:
+                    # the length is known before decoding the file
+                    self.assertEqual(len(lw_f.s), len(latextext))
+                    self.assertEqual(lw_f.s._next_char_pos, 0)
+                self.assertTrue(lw_f._mapped_file._buf.closed)
+
+                lw_file = LatexWalker.from_file(fn, encoding=encoding, chunk_size=64,
+                                                tolerant_parsing=True)
+                nodes_file, _ = lw_file.parse_content()
+
+                self.assertEqual(
+                    [ (n.nodeType().__name__, n.pos, n.pos_end,
+                       n.latex_verbatim(), lw_file.pos_to_lineno_colno(n.pos))
+                      for n in nodes_file ],
+                    [ (n.nodeType().__name__, n.pos, n.pos_end,
+                       n.latex_verbatim(), lw.pos_to_lineno_colno(n.pos))
+                      for n in nodes ]
+                )
+                self.assertEqual(len(lw_file.s), len(latextext))
+                self.assertEqual(lw_file.s[:], latextext)
+                self.assertEqual(lw_file.s[-5:], latextext[-5:])
+                lw_file.close()
+
+    def test_pretokenize(self):
+        latextext = get_test_latex_data_with_possible_inconsistencies()
+
+        lw = LatexWalker(latextext, tolerant_parsing=True)
+        nodes, _ = lw.parse_content()
+
+        lw_pretok = LatexWalker(latextext, tolerant_parsing=True)
+        token_array = lw_pretok.pretokenize()
+        self.assertGreater(len(token_array), 0)
+        self.assertIs(lw_pretok.make_token_reader().token_array, token_array)
+
+        # parse twice, reusing the same tokens
+        for j in range(2):
+            nodes_pretok, _ = lw_pretok.parse_content()
+            self.assertEqual(
+                [ (n.nodeType().__name__, n.pos, n.pos_end, n.latex_verbatim())
+                  for n in nodes_pretok ],
+                [ (n.nodeType().__name__, n.pos, n.pos_end, n.latex_verbatim())
+                  for n in nodes ]
+            )
+
+    def test_iterative_parsing(self):
+        latextext = get_test_latex_data_with_possible_inconsistencies()
+
+        for tolerant_parsing in (True, False):
+            lw = LatexWalker(latextext, tolerant_parsing=tolerant_parsing)
+            lw_iter = LatexWalker(latextext, tolerant_parsing=tolerant_parsing,
+                                  iterative_parsing=True)
+            try:
+                nodes, _ = lw.parse_content()
+            except LatexWalkerParseError as e:
+                with self.assertRaises(LatexWalkerParseError) as cm:
+                    lw_iter.parse_content()
+                self.assertEqual(str(cm.exception), str(e))
+                continue
+            nodes_iter, _ = lw_iter.parse_content()
+            self.assertEqual(_node_structure(nodes_iter), _node_structure(nodes))
+
+    def test_iterative_parsing_deeply_nested(self):
+        depth = 5000
+        latextext = '{'*depth + r'x $\alpha{}$' + '}'*depth
+
+        lw = LatexWalker(latextext, tolerant_parsing=False, iterative_parsing=True)
+        nodes, _ = lw.parse_content()
+
+        n = nodes[0]
+        for j in range(depth-1):
+            self.assertEqual(n.nodeType(), LatexGroupNode)
+            self.assertEqual((n.pos, n.pos_end), (j, len(latextext)-j))
+            n = n.nodelist[0]
+        self.assertEqual(n.latex_verbatim(), r'{x $\alpha{}$}')
+        self.assertEqual(n.nodelist[1].nodeType(), LatexMathNode)
+
+    def test_lazy_chars_nodes(self):
+        latextext = get_test_latex_data_with_possible_inconsistencies()
+
+        def all_chars_nodes(n):
+            if n is None:
+                return []
+            if isinstance(n, (list, LatexNodeList)):
+                return [ cn for nn in n for cn in all_chars_nodes(nn) ]
+            if n.isNodeType(LatexCharsNode):
+                return [ n ]
+            result = all_chars_nodes(getattr(n, 'nodelist', None))
+            nodeargd = getattr(n, 'nodeargd', None)
+            if nodeargd is not None:
+                result += all_chars_nodes(nodeargd.argnlist)
+            return result
 
+        lw = LatexWalker(latextext, tolerant_parsing=True)
+        nodes, _ = lw.parse_content()
+        chars_nodes = all_chars_nodes(nodes)
+
+        for lazy_chars_nodes in (True, 'cache'):
+            lw_lazy = LatexWalker(latextext, tolerant_parsing=True,
+                                  lazy_chars_nodes=lazy_chars_nodes)
+            nodes_lazy, _ = lw_lazy.parse_content()
+            self.assertEqual(_node_structure(nodes_lazy), _node_structure(nodes))
+
+            chars_nodes_lazy = all_chars_nodes(nodes_lazy)
+            self.assertTrue(all( isinstance(n, LatexLazyCharsNode)
+                                 for n in chars_nodes_lazy ))
+            self.assertTrue(all( n._chars is None for n in chars_nodes_lazy ))
+            self.assertEqual([ n.chars for n in chars_nodes_lazy ],
+                             [ n.chars for n in chars_nodes ])
+            self.assertEqual(
+                [ n._chars is not None for n in chars_nodes_lazy ],
+                [ lazy_chars_nodes == 'cache' ] * len(chars_nodes_lazy)
+            )
+
+        lw_lazy = LatexWalker(latextext, lazy_chars_nodes=True)
+        parsing_state = lw_lazy.make_parsing_state()
+        n = lw_lazy.make_node(LatexCharsNode, chars='article', pos=29, pos_end=36,
+                              parsing_state=parsing_state)
+        self.assertIsInstance(n, LatexLazyCharsNode)
+        self.assertIs(n.nodeType(), LatexCharsNode)
+        self.assertEqual(n, LatexCharsNode(chars='article', pos=29, pos_end=36,
+                                           parsing_state=parsing_state,
+                                           latex_walker=lw_lazy))
+        self.assertEqual(
+            n.to_json_object_with_latexwalker(lw_lazy)['nodetype'], 'LatexCharsNode'
+        )
+        # chars that don't match the string are stored in a regular node
+        n = lw_lazy.make_node(LatexCharsNode, chars='other', pos=29, pos_end=34,
+                              parsing_state=parsing_state)
+        self.assertIs(type(n), LatexCharsNode)
+        self.assertEqual(n.chars, 'other')
+
+        # no lazy nodes for a stream, whose contents we don't keep
+        lw_stream = LatexWalker.from_stream(io.StringIO(latextext), chunk_size=32,
+                                            tolerant_parsing=True,
+                                            lazy_chars_nodes=True)
+        nodes_stream, _ = lw_stream.parse_content()
+        self.assertEqual([ type(n) for n in all_chars_nodes(nodes_stream) ],
+                         [ LatexCharsNode ] * len(chars_nodes))
+        self.assertEqual([ n.chars for n in all_chars_nodes(nodes_stream) ],
+                         [ n.chars for n in chars_nodes ])
+
+
+
+
+def _node_structure(n):
+    if n is None:
+        return None
+    if isinstance(n, (list, LatexNodeList)):
+        return [ _node_structure(nn) for nn in n ]
+    children = []
+    for attr in ('nodelist', 'nodeargd'):
+        c = getattr(n, attr, None)
+        if attr == 'nodeargd' and c is not None:
+            c = c.argnlist
+        children.append(_node_structure(c))
+    return (n.nodeType().__name__, n.pos, n.pos_end, n.latex_verbatim(), children)
 
 
 # more test data
@@ -0,0 +1,160 @@
+import unittest
+import os
+import os.path
+import sys
+import subprocess
+import logging
+
+import pylatexenc
+
+
+_pylatexenc_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(pylatexenc.__file__)))
+
+
+def run_importtime(module_name, also_import=[]):
+    r"""
+    Import `module_name` (followed by the modules in `also_import`) in a fresh
+    Python interpreter run with ``-X importtime``, and return a dictionary
+    `{imported_module_name: (self_us, cumulative_us)}` of all the modules that
+    were imported, with their import times in microseconds.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = _pylatexenc_root_dir
+    # -S: don't let site-packages' .pth files import modules of their own
+    result = subprocess.run(
+        [sys.executable, '-S', '-X', 'importtime', '-c',
+         '; '.join([ 'import ' + m for m in [module_name] + list(also_import) ])],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue # header line
+        modules[fields[2].strip()] = ( int(fields[0]), int(fields[1]), )
+    return modules
+
+
+def total_import_time_ms(modules):
+    return sum([ t[0] for t in modules.values() ]) / 1000.0
+
+
+# modules that should only be imported when they are actually used
+lazy_modules = [
+    'pylatexenc.latexnodes._tokenreaderstream',
+    'pylatexenc.latexnodes._tokenreaderpretok',
+    'pylatexenc.latexnodes._nodearena',
+    'pylatexenc.latexnodes._nodesindex',
+    'pylatexenc.macrospec._pyltxenc2_argparsers',
+    'pylatexenc.latexwalker._legacy_py1x',
+    'pylatexenc.latexwalker._mappedfile',
+    'pylatexenc.latex2text._inputlatexfile',
+    'pylatexenc.latex2text._defaultspecs',
+    'pylatexenc.latexwalker._defaultspecs',
+    'pylatexenc.latexencode',
+    'inspect',
+    'json',
+    'mmap',
+    'array',
+]
+
+# maximum number of pylatexenc modules that importing each module may import
+# (they are currently 20, 40 and 42, respectively)
+max_num_pylatexenc_modules = {
+    'pylatexenc.latexnodes': 24,
+    'pylatexenc.latexwalker': 45,
+    'pylatexenc.latex2text': 48,
+}
+
+
+class TestImportTime(unittest.TestCase):
+
+    def _check_module(self, module_name):
+        modules = run_importtime(module_name)
+        self.assertIn(module_name, modules)
+
+        imported_lazy_modules = [ m for m in lazy_modules if m in modules ]
+        self.assertEqual(imported_lazy_modules, [])
+
+        pylatexenc_modules = [ m for m in modules
+                               if m == 'pylatexenc' or m.startswith('pylatexenc.') ]
+        self.assertLessEqual(len(pylatexenc_modules),
+                             max_num_pylatexenc_modules[module_name])
+
+        # Importing the module must be faster than also importing the modules
+        # that are only imported when they are used.  (Absolute wall-clock
+        # times are too noisy to test; take the best of a few runs.)
+        import_time_ms = min([
+            total_import_time_ms(run_importtime(module_name))
+            for j in range(3)
+        ])
+        eager_import_time_ms = min([
+            total_import_time_ms(run_importtime(module_name, also_import=lazy_modules))
+            for j in range(3)
+        ])
+        logging.getLogger(__name__).debug(
+            "import time for %s is %.1f ms (%.1f ms with all lazy modules)",
+            module_name, import_time_ms, eager_import_time_ms
+        )
+        self.assertLess(import_time_ms, eager_import_time_ms)
+
+    def test_import_latexnodes(self):
+        self._check_module('pylatexenc.latexnodes')
+
+    def test_import_latexwalker(self):
+        self._check_module('pylatexenc.latexwalker')
+
+    def test_import_latex2text(self):
+        self._check_module('pylatexenc.latex2text')
+
+    def test_lazy_attributes(self):
+        # names that are imported on first use are still available
+        from pylatexenc import latexnodes, latexwalker, macrospec
+        self.assertEqual(latexnodes.LatexNodeArena.__name__, 'LatexNodeArena')
+        self.assertEqual(latexnodes.LatexNodesIndex.__name__, 'LatexNodesIndex')
+        self.assertIn('LatexTokenArray', dir(latexnodes))
+        self.assertEqual(macrospec.MacroStandardArgsParser.__name__,
+                         'MacroStandardArgsParser')
+        self.assertTrue(callable(latexwalker.get_latex_nodes))
+        with self.assertRaises(AttributeError):
+            latexnodes.ThisDoesNotExist
+
+    def test_star_imports(self):
+        # lazily imported names are still provided by "import *"
+        ns = {}
+        exec('from pylatexenc.latexwalker import *', ns)
+        for name in ('MacrosDef', 'default_macro_dict', 'get_token',
+                     'get_latex_expression', 'get_latex_maybe_optional_arg',
+                     'get_latex_braced_group', 'get_latex_environment',
+                     'get_latex_nodes', 'LatexWalker', 'LatexMacroNode'):
+            self.assertIn(name, ns)
+        self.assertEqual(ns['get_latex_nodes'].__module__,
+                         'pylatexenc.latexwalker._legacy_py1x')
+
+        ns = {}
+        exec('from pylatexenc.macrospec import *', ns)
+        for name in ('MacroStandardArgsParser', 'ParsedVerbatimArgs',
+                     'VerbatimArgsParser', 'ParsedLstListingArgs',
+                     'LstListingArgsParser', 'ParsedMacroArgs', 'MacroSpec',
+                     'std_macro'):
+            self.assertIn(name, ns)
+
+        ns = {}
+        exec('from pylatexenc.latexnodes import *', ns)
+        for name in ('LatexStreamTokenReader', 'LatexTokenArray',
+                     'LatexPreTokenizedTokenReader', 'LatexNodeArena',
+                     'LatexNodeArenaView', 'LatexNodesIndex', 'LatexToken',
+                     'ParsingState'):
+            self.assertIn(name, ns)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
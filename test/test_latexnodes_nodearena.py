@@ -0,0 +1,270 @@
+import unittest
+import logging
+
+### BEGIN_TEST_PYLATEXENC_SKIP
+# not in the JavaScript build: the node arena is Python-only
+
+from pylatexenc.latexnodes import (
+    LatexNodeArena,
+    LatexNodeArenaView,
+)
+from pylatexenc.latexnodes.nodes import *
+
+from pylatexenc.latexwalker import LatexWalker
+
+
+
+latextext_sample = r"""\section{Intro}\label{sec:intro}
+Text with citations~\cite{a,b} and \cite[p.~3]{c}.  % comment
+\begin{figure}[h]
+  \includegraphics{x.png}
+  \caption{A figure, see $x^{2}$ and \cite{d}.}
+\end{figure}
+Display math: \[ \alpha + {\beta} \]
+"""
+
+
+def node_structure(n):
+    if n is None:
+        return None
+    if isinstance(n, (list, LatexNodeList)):
+        return [ node_structure(nn) for nn in n ]
+    fields = []
+    for f in ('chars', 'macroname', 'environmentname', 'specials_chars', 'delimiters',
+              'displaytype', 'comment', 'comment_post_space', 'macro_post_space'):
+        if hasattr(n, f):
+            fields.append( (f, getattr(n, f)) )
+    nodeargd = getattr(n, 'nodeargd', None)
+    return (
+        n.nodeType().__name__, n.pos, n.pos_end, fields,
+        node_structure(getattr(n, 'nodelist', None)),
+        node_structure(nodeargd.argnlist) if nodeargd is not None else None,
+    )
+
+
+class TestLatexNodeArena(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_parse_content_to_arena(self):
+        lw = LatexWalker(latextext_sample, tolerant_parsing=False)
+        nodes, _ = lw.parse_content()
+
+        lw2 = LatexWalker(latextext_sample, tolerant_parsing=False)
+        arena, parsing_state_delta = lw2.parse_content_to_arena()
+
+        self.assertTrue(arena.finalized)
+        self.assertIsNone(lw2._node_arena)
+        self.assertEqual(node_structure(arena.nodes()), node_structure(nodes))
+
+        # same as storing the node tree
+        arena2 = LatexNodeArena.from_nodes(nodes)
+        self.assertEqual(list(arena2.kind), list(arena.kind))
+        self.assertEqual(list(arena2.parent), list(arena.parent))
+        self.assertEqual(node_structure(arena2.nodes()), node_structure(nodes))
+
+    def test_document_order(self):
+        lw = LatexWalker(latextext_sample, tolerant_parsing=False)
+        arena, _ = lw.parse_content_to_arena()
+
+        for i in range(len(arena)):
+            p = arena.parent[i]
+            if p == -1:
+                self.assertIn(i, arena.roots)
+                continue
+            self.assertLess(p, i)
+            self.assertLessEqual(arena.end_index[i], arena.end_index[p])
+            self.assertIn(i, arena.children(p))
+            self.assertTrue(arena.pos[p] <= arena.pos[i] <= arena.pos_end[i]
+                            <= arena.pos_end[p])
+        self.assertEqual(arena.end_index[arena.roots[-1]], len(arena))
+
+        j_fig, = arena.find(LatexEnvironmentNode, 'figure')
+        descendants = list(range(j_fig+1, arena.end_index[j_fig]))
+        self.assertEqual(
+            [ arena.name(j) for j in descendants if arena.kind[j] == 3 ],
+            ['includegraphics', 'caption', 'cite']
+        )
+
+    def test_find(self):
+        lw = LatexWalker(latextext_sample, tolerant_parsing=False)
+        arena, _ = lw.parse_content_to_arena()
+
+        cites = arena.find(LatexMacroNode, 'cite')
+        self.assertEqual(len(cites), 3)
+        self.assertEqual(
+            [ arena.latex_verbatim(arena.argument(j, -1))[1:-1] for j in cites ],
+            ['a,b', 'c', 'd']
+        )
+        self.assertEqual(arena.find(LatexMacroNode, 'nonexistent'), [])
+        self.assertEqual(arena.find(LatexEnvironmentNode, 'cite'), [])
+
+        self.assertEqual(
+            [ latextext_sample[p:pe]
+              for (p, pe) in arena.spans(arena.find(LatexEnvironmentNode)) ],
+            [ latextext_sample[latextext_sample.index(r'\begin{figure}')
+                               :latextext_sample.index(r'\end{figure}')+12] ]
+        )
+        self.assertEqual(
+            [ arena.node(j).displaytype for j in arena.find(LatexMathNode) ],
+            ['inline', 'display']
+        )
+        self.assertEqual(
+            [ arena.name(j) for j in arena.find(LatexSpecialsNode) ],
+            ['~', '~', '^']
+        )
+        self.assertEqual(
+            arena.find(LatexNode),
+            list(range(len(arena)))
+        )
+        self.assertEqual(
+            arena.find(None, 'figure'),
+            arena.find(LatexEnvironmentNode, 'figure')
+        )
+        self.assertEqual(
+            [ arena.latex_verbatim(j) for j in arena.find(LatexMathNode, 'inline') ],
+            [ r'$x^{2}$' ]
+        )
+        self.assertEqual(
+            arena.find(LatexMacroNode, ['label', 'cite']),
+            sorted(arena.find(LatexMacroNode, 'label') + cites)
+        )
+
+    def test_views(self):
+        lw = LatexWalker(latextext_sample, tolerant_parsing=False)
+        arena, _ = lw.parse_content_to_arena()
+
+        _, j, _ = arena.find(LatexMacroNode, 'cite')
+        v = arena.node(j)
+        self.assertIsInstance(v, LatexNodeArenaView)
+        self.assertTrue(v.isNodeType(LatexMacroNode))
+        self.assertTrue(v.isNodeType(LatexNode))
+        self.assertFalse(v.isNodeType(LatexEnvironmentNode))
+        self.assertEqual(v.macroname, 'cite')
+        self.assertEqual(v.latex_verbatim(), r'\cite[p.~3]{c}')
+        self.assertEqual(v.spec.macroname, 'cite')
+        self.assertIs(v.parsing_state.latex_context, lw.default_parsing_state.latex_context)
+        self.assertIs(v.latex_walker, lw)
+        self.assertIsNone(v.parent)
+        argnlist = v.nodeargd.argnlist
+        self.assertEqual(len(argnlist), 4)
+        self.assertIsNone(argnlist[0])
+        self.assertEqual(argnlist[1].delimiters, ('[', ']'))
+        self.assertEqual(argnlist[1].nodelist[1].specials_chars, '~')
+        self.assertEqual(argnlist[1].nodelist[1].parent, argnlist[1])
+        self.assertIsNone(argnlist[2])
+        self.assertEqual(argnlist[3].nodelist[0].chars, 'c')
+        self.assertEqual(v.nodeargd.arguments_spec_list[3].argname, 'citekey')
+        with self.assertRaises(AttributeError):
+            v.environmentname
+        with self.assertRaises(AttributeError):
+            v.nodelist
+
+        self.assertEqual(arena.node(j), v)
+        self.assertNotEqual(arena.node(j+1), v)
+
+    def test_extra_fields_and_other_nodes(self):
+        class MyNode(LatexNode):
+            def __init__(self, **kwargs):
+                super(MyNode, self).__init__(_fields=(), **kwargs)
+            def nodeType(self):
+                return MyNode
+
+        latextext = 'ab {cd} ef'
+        lw = LatexWalker(latextext)
+        ps = lw.make_parsing_state()
+        my_node = MyNode(pos=7, pos_end=8, parsing_state=ps, latex_walker=lw)
+        nodes = LatexNodeList([
+            LatexCharsNode(chars='AB', pos=0, pos_end=2, parsing_state=ps,
+                           latex_walker=lw),
+            LatexGroupNode(
+                nodelist=LatexNodeList([
+                    LatexCharsNode(chars='cd', pos=4, pos_end=6, parsing_state=ps,
+                                   latex_walker=lw),
+                ]),
+                delimiters=('{','}'), pos=3, pos_end=7, parsing_state=ps,
+                latex_walker=lw,
+            ),
+            my_node,
+        ])
+
+        arena = LatexNodeArena.from_nodes(nodes)
+        self.assertEqual(len(arena), 4)
+        self.assertEqual(arena.roots, [0, 1, 3])
+        self.assertEqual(arena.node(0).chars, 'AB')
+        self.assertEqual(arena.node(2).chars, 'cd')
+        self.assertIs(arena.node(3), my_node)
+        self.assertEqual(arena._extra, { 0: {'chars': 'AB'}, 3: {'node': my_node} })
+
+        with self.assertRaises(ValueError):
+            arena.add_node(nodes[0])
+
+    def test_node_at_pos(self):
+        lw = LatexWalker(latextext_sample, tolerant_parsing=False)
+        nodes, _ = lw.parse_content()
+        arena = LatexNodeArena.from_nodes(nodes, keep_nodes=True)
+
+        p = latextext_sample.index('^')
+        chain = arena.nodes(arena.node_at_pos(p))
+        self.assertEqual(
+            [ n.nodeType().__name__ for n in chain ],
+            ['LatexEnvironmentNode', 'LatexGroupNode', 'LatexMathNode',
+             'LatexSpecialsNode']
+        )
+        self.assertIs(chain[0], nodes[9])
+        self.assertIs(chain[1], nodes[9].nodelist[4])
+        self.assertEqual(chain[-1].latex_verbatim(), '^{2}')
+
+        self.assertEqual(arena.node_at_pos(-1), [])
+        self.assertEqual(arena.node_at_pos(len(latextext_sample)), [])
+
+        def brute_force_containing(pos):
+            return [ i for i in range(len(arena))
+                     if arena.pos[i] <= pos < arena.pos_end[i] ]
+
+        def brute_force_overlapping(start, end):
+            return [ i for i in range(len(arena))
+                     if arena.pos[i] < end and arena.pos_end[i] > start ]
+
+        for pos in range(len(latextext_sample)):
+            self.assertEqual(arena.node_at_pos(pos), brute_force_containing(pos))
+        for start in range(0, len(latextext_sample), 7):
+            for end in range(start, len(latextext_sample)+3, 11):
+                self.assertEqual(arena.nodes_overlapping(start, end),
+                                 brute_force_overlapping(start, end))
+
+    def test_node_at_pos_unsorted(self):
+        latextext = 'abcdef'
+        lw = LatexWalker(latextext)
+        ps = lw.make_parsing_state()
+        nodes = LatexNodeList([
+            LatexCharsNode(chars='def', pos=3, pos_end=6, parsing_state=ps,
+                           latex_walker=lw),
+            LatexCharsNode(chars='abc', pos=0, pos_end=3, parsing_state=ps,
+                           latex_walker=lw),
+        ])
+        arena = LatexNodeArena.from_nodes(nodes)
+        self.assertEqual(arena.node_at_pos(1), [1])
+        self.assertEqual(arena.node_at_pos(4), [0])
+        self.assertEqual(arena.nodes_overlapping(2, 4), [0, 1])
+
+    def test_deeply_nested(self):
+        depth = 5000
+        latextext = '{'*depth + 'x' + '}'*depth
+
+        lw = LatexWalker(latextext, tolerant_parsing=False, iterative_parsing=True)
+        nodes, _ = lw.parse_content()
+
+        arena = LatexNodeArena.from_nodes(nodes)
+        self.assertEqual(len(arena), depth + 1)
+        self.assertEqual(list(arena.parent), list(range(-1, depth)))
+        self.assertEqual(list(arena.end_index), [depth+1] * (depth+1))
+        self.assertEqual(arena.node(depth).chars, 'x')
+### END_TEST_PYLATEXENC_SKIP
+
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
+#
@@ -203,6 +203,57 @@ class TestLatexNodeClasses(unittest.TestCase):
         self.assertEqual(n4.args, [arg_node])
 ### END_TEST_PYLATEXENC_SKIP
 
+### BEGIN_TEST_PYLATEXENC_SKIP
+    def test_class_level_fields_and_slots(self):
+        n = LatexMacroNode(macroname='a', pos=0, pos_end=2)
+        self.assertIn('macroname', LatexMacroNode.__slots__)
+        self.assertIs(n._fields, LatexMacroNode._fields)
+        self.assertEqual(
+            n._fields,
+            ('pos', 'pos_end', 'parsing_state', 'latex_walker',
+             'macroname', 'spec', 'nodeargd', 'macro_post_space',)
+        )
+        self.assertEqual(n._redundant_fields,
+                         n._fields + ('len', 'nodeoptarg', 'nodeargs',))
+        self.assertEqual(n.nodeoptarg, None)
+        self.assertEqual(
+            repr(LatexCharsNode(chars='x', pos=0, len=1)),
+            "LatexCharsNode(pos=0, pos_end=1, parsing_state=None, latex_walker=None, "
+            "chars='x')"
+        )
+
+    def test_weakref_and_extra_attributes(self):
+        import weakref
+        n = LatexMacroNode(macroname='a', pos=0, pos_end=2)
+        r = weakref.ref(n)
+        self.assertIs(r(), n)
+        n.my_annotation = 'hello'
+        self.assertEqual(n.my_annotation, 'hello')
+        # extra attributes are not node fields
+        self.assertEqual(n, LatexMacroNode(macroname='a', pos=0, pos_end=2))
+        c = LatexCharsNode(chars='x', pos=0, pos_end=1)
+        weakref.ref(c)
+        c.seen = True
+        self.assertTrue(c.seen)
+
+    def test_legacy_fields_constructor_argument(self):
+        class MyNode(LatexNode):
+            def __init__(self, extra, **kwargs):
+                super(MyNode, self).__init__(_fields=('extra',), **kwargs)
+                self.extra = extra
+            def nodeType(self):
+                return MyNode
+
+        n = MyNode(extra=1, pos=3, pos_end=5)
+        self.assertEqual(n._fields,
+                         ('pos', 'pos_end', 'parsing_state', 'latex_walker', 'extra',))
+        self.assertEqual(n._redundant_fields, n._fields + ('len',))
+        self.assertEqual(n, MyNode(extra=1, pos=3, pos_end=5))
+        self.assertFalse(n == MyNode(extra=2, pos=3, pos_end=5))
+        self.assertEqual(LatexNode._fields,
+                         ('pos', 'pos_end', 'parsing_state', 'latex_walker',))
+### END_TEST_PYLATEXENC_SKIP
+
 
 class TestLatexNodeList(unittest.TestCase):
 
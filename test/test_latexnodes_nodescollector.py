@@ -457,6 +457,91 @@ class TestLatexNodesCollector(unittest.TestCase):
 
     # ---------- stop conditions -----------------
 
+    def test_reads_char_runs(self):
+
+        latextext = 'Chars node and % comment\nmore chars.'
+
+        read_tokens = []
+        class MyTokenReader(LatexTokenReader):
+            def peek_token_char_run(self, parsing_state):
+                tok = super(MyTokenReader, self).peek_token_char_run(parsing_state)
+                read_tokens.append(tok)
+                return tok
+
+        tr = MyTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+        lw = DummyWalker()
+
+        nc = LatexNodesCollector(latex_walker=lw,
+                                 token_reader=tr,
+                                 parsing_state=ps,
+                                 )
+        self.assertTrue(nc.read_char_runs)
+
+        nc.process_tokens()
+
+        nodelist = nc.get_final_nodelist()
+
+        self.assertEqual(
+            nodelist,
+            LatexNodeList([
+                LatexCharsNode(
+                    parsing_state=ps,
+                    chars='Chars node and ',
+                    pos=0,
+                    pos_end=15,
+                ),
+                LatexCommentNode(
+                    parsing_state=ps,
+                    comment=' comment',
+                    comment_post_space='\n',
+                    pos=15,
+                    pos_end=25,
+                ),
+                LatexCharsNode(
+                    parsing_state=ps,
+                    chars='more chars.',
+                    pos=25,
+                    pos_end=36,
+                ),
+            ])
+        )
+        self.assertEqual(
+            [ (t.tok, t.arg) for t in read_tokens ],
+            [ ('char', 'Chars node and'), ('comment', ' comment'), ('char', 'more chars.') ]
+        )
+
+    def test_pending_chars_char_by_char(self):
+
+        paragraph = 'Some words in a long paragraph. ' * 200
+        latextext = paragraph + '{}'
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+        lw = DummyWalker()
+
+        nc = LatexNodesCollector(latex_walker=lw,
+                                 token_reader=tr,
+                                 parsing_state=ps,
+                                 read_char_runs=False,
+                                 )
+
+        nc.process_tokens()
+
+        nodelist = nc.get_final_nodelist()
+
+        self.assertEqual(
+            nodelist[0],
+            LatexCharsNode(
+                parsing_state=ps,
+                chars=paragraph,
+                pos=0,
+                pos_end=len(paragraph),
+            )
+        )
+        self.assertEqual(len(nodelist), 2)
+        self.assertEqual(nc._pending_chars_list, [])
+
     def test_stops_on_token_condition(self):
 
         latextext = r'''Chars node'''
@@ -0,0 +1,179 @@
+import unittest
+import logging
+
+### BEGIN_TEST_PYLATEXENC_SKIP
+# not in the JavaScript build: the nodes index is Python-only
+
+from pylatexenc.latexnodes import (
+    LatexNodesIndex,
+    LatexNodeArena,
+)
+from pylatexenc.latexnodes.nodes import *
+
+from pylatexenc.latexwalker import LatexWalker
+
+
+
+latextext_sample = r"""\section{Intro}\label{sec:intro}
+Text with citations~\cite{a,b} and \cite[p.~3]{c}.  % comment
+\begin{figure}[h]
+  \includegraphics{x.png}
+  \caption{A figure, see $x^{2}$ and \cite{d}.}
+\end{figure}
+Display math: \[ \alpha + {\beta} \]
+\begin{figure*}\label{fig:2}\end{figure*}
+"""
+
+
+class _AllNodesVisitor(LatexNodesVisitor):
+    def __init__(self):
+        super(_AllNodesVisitor, self).__init__()
+        self.nodes = []
+    def node_standard_process_list(self, nodelist):
+        return self.descend_into_nodelist(nodelist.nodelist)
+    def visit(self, node, **kwargs):
+        self.nodes.append(node)
+
+
+def all_nodes(nodelist):
+    v = _AllNodesVisitor()
+    v.start(nodelist)
+    return [ n for n in v.nodes if isinstance(n, LatexNode) ]
+
+
+class TestLatexNodesIndex(unittest.TestCase):
+
+    maxDiff = None
+
+    def _parse(self, s=latextext_sample):
+        lw = LatexWalker(s, tolerant_parsing=False)
+        nodes, _ = lw.parse_content()
+        return nodes
+
+    def test_document_order(self):
+        nodes = self._parse()
+        index = nodes.build_index()
+        self.assertIsInstance(index, LatexNodesIndex)
+
+        self.assertIs(index.nodes[0], nodes[0])
+        # parents before children, children in order of position
+        last_pos = -1
+        for n in index.nodes:
+            self.assertGreaterEqual(n.pos, last_pos)
+            last_pos = n.pos
+        self.assertEqual(len(index), len(index.nodes))
+        self.assertEqual(
+            set([ id(n) for n in index.nodes ]),
+            set([ id(n) for n in all_nodes(nodes) ]),
+        )
+
+    def test_find_macros(self):
+        nodes = self._parse()
+        index = nodes.build_index()
+
+        cites = index.find(LatexMacroNode, 'cite')
+        self.assertEqual(
+            [ n.nodeargd.argnlist[-1].latex_verbatim() for n in cites ],
+            [ '{a,b}', '{c}', '{d}' ],
+        )
+        labels = index.find(LatexMacroNode, 'label')
+        self.assertEqual(
+            [ n.nodeargd.argnlist[-1].nodelist.get_content_as_chars() for n in labels ],
+            [ 'sec:intro', 'fig:2' ],
+        )
+        self.assertEqual(
+            [ n.macroname for n in index.find(LatexMacroNode, ['label', 'section']) ],
+            [ 'section', 'label', 'label' ],
+        )
+        self.assertEqual(index.find(LatexMacroNode, 'nonexistent'), [])
+
+    def test_find_environments_and_math(self):
+        nodes = self._parse()
+        index = nodes.build_index()
+
+        self.assertEqual(
+            [ n.environmentname
+              for n in index.find(LatexEnvironmentNode, ('figure', 'figure*')) ],
+            [ 'figure', 'figure*' ],
+        )
+        self.assertEqual(
+            [ n.latex_verbatim() for n in index.find(LatexMathNode) ],
+            [ r'$x^{2}$', r'\[ \alpha + {\beta} \]' ],
+        )
+        self.assertEqual(
+            [ n.latex_verbatim() for n in index.find(LatexMathNode, 'display') ],
+            [ r'\[ \alpha + {\beta} \]' ],
+        )
+        self.assertEqual(
+            [ n.specials_chars for n in index.find(LatexSpecialsNode) ],
+            [ '~', '~', '^' ],
+        )
+        # node_type=None with a name looks for that name for all node types
+        self.assertEqual(
+            [ n.latex_verbatim() for n in index.find(name='inline') ],
+            [ r'$x^{2}$' ],
+        )
+
+    def test_find_base_class(self):
+        nodes = self._parse()
+        index = nodes.build_index()
+        self.assertEqual(index.find(LatexNode), index.nodes)
+        self.assertEqual(index.find(), index.nodes)
+
+    def test_same_queries_as_arena(self):
+        nodes = self._parse()
+        index = nodes.build_index()
+        arena = LatexNodeArena.from_nodes(nodes, keep_nodes=True)
+        for node_type, name in [
+                (None, None),
+                (LatexNode, None),
+                (LatexMacroNode, 'cite'),
+                (LatexEnvironmentNode, ['figure', 'figure*']),
+                (LatexSpecialsNode, None),
+                (LatexMathNode, 'display'),
+                (None, 'inline'),
+                (LatexGroupNode, [('{', '}')]),
+        ]:
+            self.assertEqual(index.find(node_type, name),
+                             arena.nodes(arena.find(node_type, name)))
+
+    def test_filter(self):
+        nodes = self._parse()
+        index = nodes.build_index()
+
+        result = index.filter(LatexMacroNode, 'cite',
+                              node_predicate_fn=lambda n: n.nodeargd.argnlist[1] is None)
+        self.assertIsInstance(result, LatexNodeList)
+        self.assertEqual([ n.latex_verbatim() for n in result ],
+                         [ r'\cite{a,b}', r'\cite{d}' ])
+        self.assertIs(result.latex_walker, nodes.latex_walker)
+        self.assertIs(result.parsing_state, nodes.parsing_state)
+        self.assertEqual(result.pos, result[0].pos)
+        self.assertEqual(result.pos_end, result[-1].pos_end)
+
+        chars = index.filter(LatexCharsNode, skip_whitespace_char_nodes=True)
+        self.assertTrue(all( n.chars.strip() for n in chars ))
+        self.assertLess(len(chars), len(index.find(LatexCharsNode)))
+
+        self.assertEqual(len(index.filter(skip_comments=True)),
+                         len(index.nodes) - 1)
+
+        empty = index.filter(LatexEnvironmentNode, 'table')
+        self.assertEqual(len(empty), 0)
+
+    def test_deeply_nested(self):
+        depth = 5000
+        n = LatexCharsNode(chars='x', pos=depth, pos_end=depth+1)
+        for j in range(depth):
+            n = LatexGroupNode(nodelist=LatexNodeList([n]), delimiters=('{','}'),
+                               pos=depth-j-1, pos_end=depth+j+2)
+        index = LatexNodesIndex([n])
+        self.assertEqual(len(index.find(LatexGroupNode)), depth)
+        self.assertEqual(index.find(LatexCharsNode)[0].chars, 'x')
+### END_TEST_PYLATEXENC_SKIP
+
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
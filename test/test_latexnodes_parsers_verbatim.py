@@ -89,7 +89,29 @@ class TestLatexVerbatimBaseParser(unittest.TestCase):
         with self.assertRaises(LatexWalkerParseError):
             _, _ = lw.parse_content(parser, token_reader=tr, parsing_state=ps)
 
+    def test_subclass_old_hooks_only(self):
+        # a third-party subclass of the base class that only implements the
+        # original hooks reads its content character by character
 
+        class MyVerbatimParser(LatexVerbatimBaseParser):
+            def new_char_check_stop_condition(self, char, verbatim_string,
+                                              verbatim_info, parsing_state):
+                return (char is None or char == '!')
+
+        latextext = r"ab\c%d!rest"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext, latex_context=DummyLatexContextDb())
+        lw = DummyWalker()
+
+        parser = MyVerbatimParser()
+        self.assertIsNone(parser.find_verbatim_end(latextext, 0, None))
+
+        node, parsing_state_delta = lw.parse_content(parser, token_reader=tr,
+                                                     parsing_state=ps)
+
+        self.assertEqual(node.chars, r'ab\c%d')
+        self.assertEqual(tr.cur_pos(), len(r'ab\c%d!'))
 
 
 
@@ -339,6 +361,51 @@ verbatim>"""
             )
 
 
+    def test_long_content_nested(self):
+        # the closing delimiter is located by searching whole blocks of text
+        for n in (10, 127, 128, 129, 1000):
+            verbatim_chars = ("x{" * n) + ("y}" * n) + "z"
+            latextext = "{" + verbatim_chars + "}rest"
+
+            parser = LatexDelimitedVerbatimParser()
+
+            tr = LatexTokenReader(latextext)
+            ps = ParsingState(s=latextext, latex_context=DummyLatexContextDb())
+            lw = DummyWalker()
+
+            node, parsing_state_delta = \
+                lw.parse_content(parser, token_reader=tr, parsing_state=ps)
+
+            self.assertEqual(node.nodelist[0].chars, verbatim_chars)
+            self.assertEqual(node.pos_end, len(latextext) - len("rest"))
+            self.assertEqual(tr.cur_pos(), len(latextext) - len("rest"))
+
+    def test_subclass_char_by_char(self):
+        # a subclass that reimplements new_char_check_stop_condition() only is
+        # still called for each character
+
+        class MyVerbatimParser(LatexDelimitedVerbatimParser):
+            def new_char_check_stop_condition(self, char, verbatim_string,
+                                              verbatim_info, parsing_state):
+                if char == '!':
+                    return True
+                return super(MyVerbatimParser, self).new_char_check_stop_condition(
+                    char, verbatim_string, verbatim_info, parsing_state
+                )
+
+        latextext = r"|abc!def|"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext, latex_context=DummyLatexContextDb())
+        lw = DummyWalker()
+
+        node, parsing_state_delta = \
+            lw.parse_content(MyVerbatimParser(), token_reader=tr, parsing_state=ps)
+
+        self.assertEqual(node.nodelist[0].chars, 'abc')
+        self.assertEqual(tr.cur_pos(), 5)
+
+
 
 class TestLatexVerbatimEnvironmentContentsParser(unittest.TestCase):
 
@@ -417,6 +484,25 @@ special characters should be captured verbatim.
             )
         )        
 
+    def test_long_content(self):
+        # the end code is located by searching whole blocks of text, including
+        # when it straddles two such blocks
+        for n in (0, 240, 250, 255, 256, 1000, 5000):
+            verbatim_chars = "\n" + ("%" * n) + "\n"
+            latextext = verbatim_chars + r"\end{verbatim}rest"
+
+            tr = LatexTokenReader(latextext)
+            ps = ParsingState(s=latextext, latex_context=DummyLatexContextDb())
+            lw = DummyWalker()
+
+            parser = LatexVerbatimEnvironmentContentsParser()
+
+            node, parsing_state_delta = \
+                lw.parse_content(parser, token_reader=tr, parsing_state=ps)
+
+            self.assertEqual(node.nodelist[0].chars, verbatim_chars[1:])
+            self.assertEqual(tr.cur_pos(), len(latextext) - len("rest"))
+
 
 
 if __name__ == '__main__':
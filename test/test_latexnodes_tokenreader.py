@@ -14,6 +14,10 @@ from pylatexenc.latexnodes import (
     ParsingState
 )
 
+from ._helpers_tests import (
+    DummyLatexContextDb,
+)
+
 
 
 class TestLatexTokenReader(unittest.TestCase):
@@ -568,7 +572,22 @@ New paragraph
         self.assertEqual(tr.next_token(ps),
                          LatexToken(tok='macro', arg=arg, pos=0, pos_end=1+len(arg)+1,
                                     pre_space='', post_space=' '))
-        
+
+    def test_macro_alpha_chars_special_chars_and_set(self):
+
+        latextext = '\\ab^]\\b \u00a0\t\\d'
+
+        for macro_alpha_chars in ('ab^]\\', frozenset(['a', 'b', '^', ']', '\\'])):
+            tr = LatexTokenReader(latextext)
+            ps = ParsingState(s=latextext, macro_alpha_chars=macro_alpha_chars)
+
+            self.assertEqual(tr.next_token(ps),
+                             LatexToken(tok='macro', arg='ab^]\\b', pos=0, pos_end=10,
+                                        pre_space='', post_space=' \u00a0\t'))
+            self.assertEqual(tr.next_token(ps),
+                             LatexToken(tok='macro', arg='d', pos=10, pos_end=12,
+                                        pre_space='', post_space=''))
+
 
     def test_forbidden_chars(self):
 
@@ -748,6 +767,248 @@ Some sneaky stuff can happen with consecutive math modes like here: $\zeta$$\gam
 
         # test char-level access
 
+    def test_char_run(self):
+        latextext = "Some chars,\n  more chars~\\macro"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext, latex_context=DummyLatexContextDb())
+
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg='Some chars,\n  more chars',
+                                    pos=0, pos_end=len("Some chars,\n  more chars"),
+                                    pre_space=''))
+        self.assertEqual(tr.next_token_char_run(ps).tok, 'specials')
+        self.assertEqual(tr.next_token_char_run(ps).tok, 'macro')
+
+    def test_char_run_no_trailing_space(self):
+        latextext = "Some chars   {"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg='Some chars',
+                                    pos=0, pos_end=len("Some chars"),
+                                    pre_space=''))
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='brace_open', arg='{',
+                                    pos=len("Some chars   "),
+                                    pos_end=len("Some chars   {"),
+                                    pre_space='   '))
+
+    def test_char_run_stops_at_paragraph(self):
+        latextext = "One par.\n  \n Two"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg='One par.',
+                                    pos=0, pos_end=len("One par."),
+                                    pre_space=''))
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg='\n  \n',
+                                    pos=len("One par."), pos_end=len("One par.\n  \n"),
+                                    pre_space=''))
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg='Two',
+                                    pos=len("One par.\n  \n "), pos_end=len(latextext),
+                                    pre_space=' '))
+
+    def test_char_run_disabled_features(self):
+        latextext = "a{b}$c$%d"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext, enable_groups=False, enable_math=False,
+                          enable_comments=False)
+
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg=latextext,
+                                    pos=0, pos_end=len(latextext), pre_space=''))
+
+    def test_char_run_forbidden_character(self):
+        latextext = "abc$d"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext, enable_math=False, forbidden_characters='$')
+
+        self.assertEqual(tr.next_token_char_run(ps),
+                         LatexToken(tok='char', arg='abc', pos=0, pos_end=3, pre_space=''))
+        with self.assertRaises(LatexWalkerTokenParseError):
+            tr.next_token_char_run(ps)
+
+    def test_token_dispatch_sub_context(self):
+        latextext = r"\(x\)~{}"
+
+        ps = ParsingState(s=latextext, latex_context=DummyLatexContextDb())
+        ps2 = ps.sub_context(in_math_mode=True)
+        self.assertIs(ps2._token_dispatch_by_char, ps._token_dispatch_by_char)
+        ps3 = ps.sub_context(enable_math=False, enable_specials=False,
+                             enable_groups=False)
+        self.assertIsNot(ps3._token_dispatch_by_char, ps._token_dispatch_by_char)
+
+        tr = LatexTokenReader(latextext)
+        self.assertEqual([tr.next_token(ps).tok for j in range(6)],
+                         ['mathmode_inline', 'char', 'mathmode_inline', 'specials',
+                          'brace_open', 'brace_close'])
+
+        tr = LatexTokenReader(latextext)
+        self.assertEqual([(t.tok, t.arg) for t in [tr.next_token(ps3) for j in range(6)]],
+                         [('macro', '('), ('char', 'x'), ('macro', ')'), ('char', '~'),
+                          ('char', '{'), ('char', '}')])
+
+    def test_peek_token_memo(self):
+        latextext = r"Hello \macro %comment"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+
+        tok = tr.peek_token(ps)
+        self.assertIs(tr.peek_token(ps), tok)
+        self.assertEqual((tr.peek_token_memo_hits, tr.peek_token_memo_misses), (1, 1))
+
+        # peeking a char run doesn't alter the remembered token
+        self.assertEqual(tr.peek_token_char_run(ps),
+                         LatexToken(tok='char', arg='Hello', pos=0, pos_end=5,
+                                    pre_space=''))
+        self.assertEqual(tok, LatexToken(tok='char', arg='H', pos=0, pos_end=1,
+                                         pre_space=''))
+
+        # a different parsing state object doesn't use the remembered token
+        ps2 = ps.sub_context(enable_comments=False)
+        self.assertIsNot(tr.peek_token(ps2), tok)
+        self.assertEqual(tr.peek_token_memo_misses, 2)
+
+        # moving the position pointer forgets the token
+        tr.next_token(ps)
+        self.assertIsNone(tr._peek_token_memo)
+        tr.move_to_pos_chars(6)
+        self.assertEqual(tr.peek_token(ps),
+                         LatexToken(tok='macro', arg='macro', pos=6, pos_end=13,
+                                    pre_space='', post_space=' '))
+        self.assertEqual(tr.peek_token_memo_misses, 4)
+
+    def test_end_of_stream_token(self):
+        latextext = "a  \n"
+
+        tr = LatexTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+
+        self.assertEqual(tr.next_token_or_eos(ps),
+                         LatexToken(tok='char', arg='a', pos=0, pos_end=1, pre_space=''))
+        eos_tok = LatexToken(tok='end_of_stream', arg=None, pos=4, pos_end=4,
+                             pre_space='  \n')
+        self.assertEqual(tr.peek_token_or_eos(ps), eos_tok)
+        self.assertEqual(tr.next_token_or_eos(ps), eos_tok)
+        self.assertEqual(tr.next_token_or_eos(ps, char_run=True), eos_tok)
+        # the end-of-stream token doesn't move the position pointer
+        self.assertEqual(tr.cur_pos(), 1)
+
+        with self.assertRaises(LatexWalkerEndOfStream) as cm:
+            tr.next_token(ps)
+        self.assertEqual(cm.exception.final_space, '  \n')
+
+    def test_tolerant_recovery_token(self):
+        latextext = r"% Here is a forbidden character."
+
+        tr = LatexTokenReader(latextext, tolerant_parsing=True)
+        ps = ParsingState(enable_comments=False, forbidden_characters='%$')
+
+        tok = tr.next_token_or_eos(ps)
+        self.assertEqual(tok, LatexToken(tok='char', arg='%', pos=0, pos_end=1,
+                                         pre_space=''))
+        self.assertIsInstance(tok.parse_error, LatexWalkerTokenParseError)
+        self.assertIs(tok.parse_error.recovery_token_placeholder, tok)
+        self.assertEqual(tok.parse_error.pos, 0)
+        self.assertEqual(tok.parse_error.error_type_info['what'],
+                         'token_forbidden_character')
+
+        tok = tr.next_token_or_eos(ps)
+        self.assertEqual(tok, LatexToken(tok='char', arg='H', pos=2, pos_end=3,
+                                         pre_space=' '))
+        self.assertIsNone(tok.parse_error)
+
+    def test_end_of_stream_subclass_peek_token(self):
+        latextext = r"ab"
+
+        class MyTokenReader(LatexTokenReader):
+            def peek_token(self, parsing_state):
+                tok = super(MyTokenReader, self).peek_token(parsing_state)
+                return LatexToken(tok='char', arg=tok.arg.upper(), pos=tok.pos,
+                                  pos_end=tok.pos_end, pre_space=tok.pre_space)
+
+        tr = MyTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+
+        self.assertEqual(tr.next_token_or_eos(ps).arg, 'A')
+        self.assertEqual(tr.next_token_or_eos(ps).arg, 'B')
+        self.assertEqual(tr.next_token_or_eos(ps).tok, 'end_of_stream')
+
+    def test_impl_peek_token_raises(self):
+        latextext = r"% Here is a forbidden character.  "
+
+        tr = LatexTokenReader(latextext, tolerant_parsing=True)
+        ps = ParsingState(enable_comments=False, forbidden_characters='%$')
+
+        with self.assertRaises(LatexWalkerTokenParseError) as cm:
+            tr.impl_peek_token(ps)
+        self.assertEqual(cm.exception.recovery_token_placeholder,
+                         LatexToken(tok='char', arg='%', pos=0, pos_end=1,
+                                    pre_space=''))
+
+        tr.move_to_pos_chars(len(latextext) - 2)
+        with self.assertRaises(LatexWalkerEndOfStream) as cm:
+            tr.impl_peek_token(ps)
+        self.assertEqual(cm.exception.final_space, '  ')
+
+    def test_subclass_impl_peek_token(self):
+        latextext = r"a\b c  "
+
+        class MyTokenReader(LatexTokenReader):
+            def impl_peek_token(self, parsing_state):
+                try:
+                    tok = super(MyTokenReader, self).impl_peek_token(parsing_state)
+                except LatexWalkerEndOfStream:
+                    raise LatexWalkerEndOfStream(final_space='(end)')
+                if tok.tok == 'char':
+                    tok.arg = tok.arg.upper()
+                return tok
+
+        tr = MyTokenReader(latextext)
+        ps = ParsingState(s=latextext)
+
+        self.assertEqual(tr.next_token(ps).arg, 'A')
+        self.assertEqual(tr.next_token_or_eos(ps).arg, 'b')
+        self.assertEqual(tr.next_token_or_eos(ps, char_run=True).arg, 'C')
+        tok = tr.next_token_or_eos(ps)
+        self.assertEqual(tok.tok, 'end_of_stream')
+        self.assertEqual(tok.pre_space, '(end)')
+        with self.assertRaises(LatexWalkerEndOfStream) as cm:
+            tr.peek_token(ps)
+        self.assertEqual(cm.exception.final_space, '(end)')
+
+    def test_subclass_impl_method_catches_parse_error(self):
+        latextext = "x\\"
+
+        class MyTokenReader(LatexTokenReader):
+            def impl_read_macro(self, s, pos, parsing_state, pre_space):
+                try:
+                    return super(MyTokenReader, self).impl_read_macro(
+                        s, pos, parsing_state, pre_space
+                    )
+                except LatexWalkerTokenParseError:
+                    return LatexToken(tok='char', arg='(backslash)', pos=pos,
+                                      pos_end=pos+1, pre_space=pre_space)
+
+        for tolerant_parsing in (False, True):
+            tr = MyTokenReader(latextext, tolerant_parsing=tolerant_parsing)
+            ps = ParsingState(s=latextext)
+
+            self.assertEqual(tr.next_token(ps).arg, 'x')
+            tok = tr.next_token(ps)
+            self.assertEqual(tok.arg, '(backslash)')
+            self.assertIsNone(tok.parse_error)
+
     def test_charlevel_peek_next_chars(self):
         latextext = r"Some Chars"
 
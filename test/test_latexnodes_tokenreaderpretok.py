@@ -0,0 +1,167 @@
+import unittest
+import logging
+
+### BEGIN_TEST_PYLATEXENC_SKIP
+# not in the JavaScript build: the pretokenized token reader is Python-only
+
+from pylatexenc.latexnodes._tokenreaderpretok import (
+    LatexTokenArray,
+    LatexPreTokenizedTokenReader,
+)
+
+from pylatexenc.latexnodes import (
+    LatexWalkerTokenParseError,
+    LatexWalkerEndOfStream,
+    LatexToken,
+    LatexTokenReader,
+    ParsingState
+)
+
+from pylatexenc.macrospec import LatexContextDb, SpecialsSpec
+
+
+
+latextext_sample = r"""
+\documentclass{article}
+% A comment that spans a few characters
+\begin{document}
+Some text with a \macro and ``quotes'' -- plus math $x^2$ and $$y$$,
+\[ \alpha \] and \(\beta\).
+
+
+New paragraph {with a group}.\endcsname\beginmetastate
+\end{document}
+"""
+
+
+def read_all_tokens(tr, ps):
+    toks = []
+    while True:
+        try:
+            toks.append(tr.next_token(ps))
+        except LatexWalkerEndOfStream:
+            return toks
+
+
+class TestLatexPreTokenizedTokenReader(unittest.TestCase):
+
+    def _make_latex_context(self):
+        db = LatexContextDb()
+        db.add_context_category(
+            'quotes',
+            specials=[ SpecialsSpec('``'), SpecialsSpec("''"), SpecialsSpec('--'), ]
+        )
+        db.freeze()
+        return db
+
+    def test_same_tokens_as_string_reader(self):
+        latextext = latextext_sample
+        ps = ParsingState(s=latextext, latex_context=self._make_latex_context())
+
+        expected = read_all_tokens(LatexTokenReader(latextext), ps)
+
+        token_array = LatexTokenArray(latextext, ps)
+        self.assertEqual(len(token_array), len(expected))
+
+        tr = LatexPreTokenizedTokenReader(token_array)
+        self.assertEqual(read_all_tokens(tr, ps), expected)
+        self.assertEqual(tr.pretokenized_hits, len(expected))
+
+        # an equivalent parsing state also uses the stored tokens
+        tr = LatexPreTokenizedTokenReader(token_array)
+        self.assertEqual(read_all_tokens(tr, ps.sub_context(enable_groups=True)),
+                         expected)
+        self.assertEqual(tr.pretokenized_hits, len(expected))
+
+    def test_lazy_token_fields(self):
+        latextext = "Text  \\macro  % comment\n  more"
+        ps = ParsingState(s=latextext)
+
+        tr = LatexPreTokenizedTokenReader(LatexTokenArray(latextext, ps))
+        tr.move_to_pos_chars(4)
+        tok = tr.next_token(ps)
+        self.assertFalse(hasattr(tok, '__dict__'))
+        self.assertIsNone(tok._pre_space)
+        self.assertIsNone(tok._post_space)
+        self.assertEqual(tok, LatexToken(tok='macro', arg='macro', pos=6, pos_end=14,
+                                         pre_space='  ', post_space='  '))
+        tok = tr.next_token(ps)
+        self.assertEqual(tok.arg, ' comment')
+        self.assertEqual(tok.post_space, '\n  ')
+        tok.pre_space = ''
+        self.assertEqual(tok.pre_space, '')
+
+    def test_fallback_other_parsing_state(self):
+        latextext = r"a$b$c"
+        ps = ParsingState(s=latextext)
+        ps_math = ps.sub_context(in_math_mode=True, math_mode_delimiter='$')
+
+        tr = LatexPreTokenizedTokenReader(LatexTokenArray(latextext, ps))
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='char', arg='a', pos=0, pos_end=1, pre_space=''))
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='mathmode_inline', arg='$', pos=1, pos_end=2,
+                                    pre_space=''))
+        self.assertEqual(tr.pretokenized_hits, 2)
+        self.assertEqual(tr.next_token(ps_math),
+                         LatexToken(tok='char', arg='b', pos=2, pos_end=3, pre_space=''))
+        self.assertEqual(tr.next_token(ps_math),
+                         LatexToken(tok='mathmode_inline', arg='$', pos=3, pos_end=4,
+                                    pre_space=''))
+        self.assertEqual(tr.pretokenized_hits, 2)
+
+        # position that isn't the start of a stored token
+        tr.move_to_pos_chars(4)
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='char', arg='c', pos=4, pos_end=5, pre_space=''))
+        self.assertEqual(tr.pretokenized_hits, 3)
+
+    def test_other_latex_context_with_same_key(self):
+        latextext = r"a``b"
+        db = self._make_latex_context()
+        ps = ParsingState(s=latextext, latex_context=db)
+        token_array = LatexTokenArray(latextext, ps)
+        self.assertIs(token_array.latex_context, db)
+        self.assertTrue(token_array.matches_parsing_state(ps))
+
+        # simulate a different latex context that got the same id() as `db`,
+        # e.g. after `db` was garbage collected: the stored tokens must not be
+        # used for it
+        ps_other = ParsingState(s=latextext, latex_context=LatexContextDb())
+        ps_other._token_lexing_key = ps._token_lexing_key
+        self.assertFalse(token_array.matches_parsing_state(ps_other))
+
+        tr = LatexPreTokenizedTokenReader(token_array)
+        tr.next_token(ps_other)
+        self.assertEqual(tr.next_token(ps_other),
+                         LatexToken(tok='char', arg='`', pos=1, pos_end=2, pre_space=''))
+        self.assertEqual(tr.pretokenized_hits, 0)
+
+    def test_errors_not_stored(self):
+        latextext = "ab%cd"
+        ps = ParsingState(s=latextext, enable_comments=False, forbidden_characters='%')
+
+        token_array = LatexTokenArray(latextext, ps)
+        self.assertEqual(len(token_array), 4)
+
+        tr = LatexPreTokenizedTokenReader(token_array)
+        tr.move_to_pos_chars(2)
+        with self.assertRaises(LatexWalkerTokenParseError):
+            tr.next_token(ps)
+
+        tr = LatexPreTokenizedTokenReader(token_array, tolerant_parsing=True)
+        tr.move_to_pos_chars(2)
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='char', arg='%', pos=2, pos_end=3, pre_space=''))
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='char', arg='c', pos=3, pos_end=4, pre_space=''))
+### END_TEST_PYLATEXENC_SKIP
+
+
+
+# ---
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
+#
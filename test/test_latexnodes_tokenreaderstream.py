@@ -0,0 +1,189 @@
+import unittest
+import logging
+
+### BEGIN_TEST_PYLATEXENC_SKIP
+# not in the JavaScript build: the streaming token reader is Python-only
+import io
+
+
+
+from pylatexenc.latexnodes._tokenreaderstream import (
+    LatexStreamTokenReader
+)
+
+from pylatexenc.latexnodes import (
+    LatexWalkerTokenParseError,
+    LatexWalkerEndOfStream,
+    LatexToken,
+    LatexTokenReader,
+    ParsingState
+)
+
+from pylatexenc.macrospec import LatexContextDb, SpecialsSpec
+
+from pylatexenc import _util
+
+from ._helpers_tests import (
+    DummyLatexContextDb,
+)
+
+
+
+latextext_sample = r"""
+\documentclass{article}
+% A comment that spans a few characters
+\begin{document}
+Some text with a \macro and ``quotes'' -- plus math $x^2$ and $$y$$,
+\[ \alpha \] and \(\beta\).
+
+
+New paragraph {with a group}.\endcsname\beginmetastate
+\end{document}
+"""
+
+
+def read_all_tokens(tr, ps, method='next_token'):
+    toks = []
+    while True:
+        try:
+            toks.append(getattr(tr, method)(ps))
+        except LatexWalkerEndOfStream:
+            return toks
+
+
+class TestLatexStreamTokenReader(unittest.TestCase):
+
+    def _make_latex_context(self):
+        db = LatexContextDb()
+        db.add_context_category(
+            'quotes',
+            specials=[ SpecialsSpec('``'), SpecialsSpec("''"), SpecialsSpec('--'),
+                       SpecialsSpec('\n\n'), ]
+        )
+        db.freeze()
+        return db
+
+    def test_same_tokens_as_string_reader(self):
+        latextext = latextext_sample
+        ps = ParsingState(s='', latex_context=self._make_latex_context())
+
+        expected = read_all_tokens(LatexTokenReader(latextext), ps)
+
+        for chunk_size in (1, 2, 3, 7, 100):
+            tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=chunk_size)
+            self.assertEqual(read_all_tokens(tr, ps), expected)
+            self.assertEqual(tr.final_pos(), len(latextext))
+
+    def test_char_runs_cover_same_text(self):
+        latextext = latextext_sample
+        ps = ParsingState(s='', latex_context=self._make_latex_context())
+
+        expected = read_all_tokens(LatexTokenReader(latextext), ps,
+                                   method='next_token_char_run')
+
+        for chunk_size in (1, 5, 100):
+            tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=chunk_size)
+            toks = read_all_tokens(tr, ps, method='next_token_char_run')
+            # runs of chars might be split differently, but together they
+            # cover the same text
+            self.assertEqual(
+                [ (t.tok, t.pos) for t in toks if t.tok != 'char' ],
+                [ (t.tok, t.pos) for t in expected if t.tok != 'char' ]
+            )
+            self.assertEqual(
+                "".join([ t.pre_space + t.arg for t in toks if t.tok == 'char' ]),
+                "".join([ t.pre_space + t.arg for t in expected if t.tok == 'char' ]),
+            )
+
+    def test_bounded_window(self):
+        latextext = "Hello, world.  \\macro{arg} " * 1000
+        ps = ParsingState(s='')
+
+        tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=64, lookback=32)
+        max_window = 0
+        while True:
+            try:
+                tok = tr.next_token(ps)
+            except LatexWalkerEndOfStream:
+                break
+            max_window = max(max_window, len(tr.s))
+
+        # final whitespace is not skipped
+        self.assertEqual(tr.cur_pos(), len(latextext.rstrip()))
+        self.assertLess(max_window, 512)
+
+    def test_rewind_within_lookback(self):
+        latextext = "abc " * 100
+        ps = ParsingState(s='')
+
+        tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=8, lookback=16)
+
+        for j in range(200):
+            tok = tr.next_token(ps)
+
+        # 200th token is the 'b' in the 67th "abc "
+        self.assertEqual(tok, LatexToken(tok='char', arg='b', pos=66*4+1,
+                                         pos_end=66*4+2, pre_space=''))
+        tr.move_to_token(tok)
+        self.assertEqual(tr.cur_pos(), tok.pos)
+        self.assertEqual(tr.next_token(ps), tok)
+
+        with self.assertRaises(ValueError):
+            tr.move_to_pos_chars(0)
+
+    def test_peek_next_chars(self):
+        latextext = "verbatim|stuff| more"
+        ps = ParsingState(s='')
+
+        tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=2)
+        tr.move_to_pos_chars(8)
+        self.assertEqual(tr.peek_chars(7, ps), "|stuff|")
+        self.assertEqual(tr.next_chars(7, ps), "|stuff|")
+        self.assertEqual(tr.cur_pos(), 15)
+        self.assertEqual(tr.skip_space_chars(ps), (' ', 15, 16))
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='char', arg='m', pos=16, pos_end=17, pre_space=''))
+
+    def test_error_positions(self):
+        latextext = ("x" * 200) + "%"
+        ps = ParsingState(s='', enable_comments=False, forbidden_characters='%')
+
+        tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=16, lookback=4)
+        tr.move_to_pos_chars(190)
+        for j in range(10):
+            tr.next_token(ps)
+        with self.assertRaises(LatexWalkerTokenParseError) as cm:
+            tr.next_token(ps)
+        self.assertEqual(cm.exception.pos, 200)
+        self.assertEqual(cm.exception.recovery_token_at_pos, 201)
+
+        tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=16, lookback=4,
+                                    tolerant_parsing=True)
+        tr.move_to_pos_chars(200)
+        self.assertEqual(tr.next_token(ps),
+                         LatexToken(tok='char', arg='%', pos=200, pos_end=201,
+                                    pre_space=''))
+
+    def test_line_numbers(self):
+        latextext = latextext_sample
+        ps = ParsingState(s='')
+
+        ln = _util.LineNumbersCalculator('')
+        tr = LatexStreamTokenReader(io.StringIO(latextext), chunk_size=5,
+                                    line_numbers_calculator=ln)
+        toks = read_all_tokens(tr, ps)
+
+        ln_full = _util.LineNumbersCalculator(latextext)
+        for t in toks:
+            self.assertEqual(ln.pos_to_lineno_colno(t.pos),
+                             ln_full.pos_to_lineno_colno(t.pos))
+### END_TEST_PYLATEXENC_SKIP
+
+
+
+# ---
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
+#
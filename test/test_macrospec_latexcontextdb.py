@@ -8,6 +8,11 @@ from pylatexenc.macrospec._latexcontextdb import (
     _autogen_category_prefix
 )
 
+from pylatexenc.latexnodes import (
+    LatexTokenReader,
+    ParsingState,
+)
+
 from pylatexenc.macrospec import (
     MacroSpec,
     EnvironmentSpec,
@@ -132,6 +137,225 @@ class TestLatexContextDb(unittest.TestCase):
         self.assertIsNot(context3.category_list, context2.category_list)
 
 
+    def test_test_for_specials_frozen_index(self):
+        db = LatexContextDb()
+        db.add_context_category(
+            'A',
+            specials=[ SpecialsSpec('`'), SpecialsSpec('-'), SpecialsSpec('--'), ],
+        )
+        db.add_context_category(
+            'B',
+            specials=[ SpecialsSpec('``'), SpecialsSpec('-'), SpecialsSpec('---'), ],
+        )
+
+        s = "``x`---y--z-w"
+        positions = list(range(len(s)+1))
+        expected = [ db.test_for_specials(s, pos) for pos in positions ]
+        self.assertIs(expected[0], db.d['B']['specials']['``'])
+        self.assertIs(expected[3], db.d['A']['specials']['`'])
+        self.assertIs(expected[4], db.d['B']['specials']['---'])
+        self.assertIs(expected[8], db.d['A']['specials']['--'])
+        self.assertIs(expected[11], db.d['A']['specials']['-'])
+        self.assertIsNone(expected[2])
+
+        db.freeze()
+        self.assertEqual([ db.test_for_specials(s, pos) for pos in positions ], expected)
+        self.assertEqual(db.get_specials_initial_chars(), frozenset(['`', '-']))
+
+        db2 = db.extended_with(specials=[ SpecialsSpec('-'), SpecialsSpec('y'), ])
+        self.assertIs(db2.test_for_specials(s, 11), db2.d[db2.categories()[0]]['specials']['-'])
+        self.assertIs(db2.test_for_specials(s, 4), db.d['B']['specials']['---'])
+        self.assertIsNotNone(db2.test_for_specials(s, 7))
+        self.assertIsNone(db.test_for_specials(s, 7))
+
+    def test_specials_added_after_parsing_state(self):
+        db = LatexContextDb()
+        db.add_context_category('x', specials=[ SpecialsSpec('~'), ])
+        ps = ParsingState(s="a@@c", latex_context=db)
+
+        # the parsing state must see specials that are added to the unfrozen db
+        db.add_context_category('y', specials=[ SpecialsSpec('@@'), ])
+
+        tr = LatexTokenReader("a@@c")
+        self.assertEqual(tr.next_token_char_run(ps).arg, 'a')
+        tok = tr.next_token_char_run(ps)
+        self.assertEqual(tok.tok, 'specials')
+        self.assertIs(tok.arg, db.d['y']['specials']['@@'])
+
+    def test_extended_with_reuses_specials_index(self):
+        db = LatexContextDb()
+        db.add_context_category(
+            'A',
+            specials=[ SpecialsSpec('`'), SpecialsSpec('-'), SpecialsSpec('--'), ],
+        )
+        db.freeze()
+
+        s = "``x`---y--z-w"
+        positions = list(range(len(s)+1))
+
+        # new auto-category, then extend that same auto-category
+        db2 = db.extended_with(macros=[ MacroSpec('a') ])
+        self.assertIs(db2._specials_index, db._specials_index)
+        db3 = db2.extended_with(macros=[ MacroSpec('b') ])
+        self.assertEqual(db3.categories(), db2.categories())
+        self.assertIs(db3._specials_index, db._specials_index)
+
+        db4 = db3.extended_with(specials=[ SpecialsSpec('-'), SpecialsSpec('---'),
+                                           SpecialsSpec('y') ])
+        self.assertEqual(db4.categories(), db2.categories())
+        new_specials = db4.d[db4.categories()[0]]['specials']
+        self.assertIs(db4.test_for_specials(s, 11), new_specials['-'])
+        self.assertIs(db4.test_for_specials(s, 4), new_specials['---'])
+        self.assertIs(db4.test_for_specials(s, 8), db.d['A']['specials']['--'])
+        self.assertIs(db4.test_for_specials(s, 7), new_specials['y'])
+        self.assertIsNone(db3.test_for_specials(s, 7))
+
+        # same result as building the index from scratch
+        expected = [ db4.test_for_specials(s, pos) for pos in positions ]
+        db4._build_specials_index()
+        self.assertEqual([ db4.test_for_specials(s, pos) for pos in positions ],
+                         expected)
+
+    def test_frozen_flat_lookup(self):
+        db = self._make_shadowed_db(prepend=True)
+        unfrozen_results = (
+            db.get_macro_spec('m'),
+            db.get_environment_spec('e'),
+            db.get_specials_spec('&'),
+        )
+        self.assertIs(unfrozen_results[0], db.d['C']['macros']['m'])
+        self.assertIs(unfrozen_results[2], db.d['C']['specials']['&'])
+
+        db.freeze()
+        self.assertIsInstance(db._lookup_maps['macros'], dict)
+        self.assertEqual((
+            db.get_macro_spec('m'),
+            db.get_environment_spec('e'),
+            db.get_specials_spec('&'),
+        ), unfrozen_results)
+        self.assertIsNone(db.get_macro_spec('nonexistent'))
+        with self.assertRaises(KeyError):
+            db.get_macro_spec('nonexistent', raise_if_not_found=True)
+
+    def test_extended_with_compacts_lookup_chain(self):
+        context = LatexContextDb()
+        context.max_lookup_chain_depth = 3
+        context.add_context_category(
+            'base-category',
+            macros=[ MacroSpec('base', '{'), MacroSpec('redef', '{'), ],
+            environments=[ EnvironmentSpec('baseenv', '{'), ],
+        )
+        context.freeze()
+
+        contexts = [ context ]
+        for j in range(10):
+            c = contexts[-1].extended_with(
+                category=('cat{}'.format(j) if j % 2 else None),
+                macros=[ MacroSpec('m{}'.format(j), '{'), MacroSpec('redef', '[{'), ],
+            )
+            contexts.append(c)
+            maps = c._lookup_maps['macros']
+            self.assertTrue(isinstance(maps, dict) or len(maps.maps) <= 3)
+            # no new environments, the lookup map is shared
+            self.assertIs(c._lookup_maps['environments'],
+                          context._lookup_maps['environments'])
+
+        last = contexts[-1]
+        self.assertEqual(last.max_lookup_chain_depth, 3)
+        for j in range(10):
+            self.assertEqual(last.get_macro_spec('m{}'.format(j)).macroname,
+                             'm{}'.format(j))
+        self.assertIs(last.get_macro_spec('base'), context.get_macro_spec('base'))
+        self.assertEqual(last.get_macro_spec('redef').arguments_spec_list,
+                         contexts[1].get_macro_spec('redef').arguments_spec_list)
+        self.assertIsNot(last.get_macro_spec('redef'), context.get_macro_spec('redef'))
+        self.assertIsNone(contexts[3].get_macro_spec('m5'))
+        # the lookups agree with the category chain maps
+        for c in contexts:
+            for name in ['base', 'redef'] + [ 'm{}'.format(j) for j in range(10) ]:
+                self.assertIs(c.get_macro_spec(name),
+                              c.lookup_chain_maps['macros'].get(name, None))
+
+    def _make_lazy_db(self, loaded):
+        def make_load_fn(cat, catspecs):
+            def load_fn():
+                loaded.append(cat)
+                return catspecs
+            return load_fn
+        db = LatexContextDb()
+        db.add_lazy_context_category('A', make_load_fn('A', {
+            'macros': [ MacroSpec('a', '{'), MacroSpec('ab', '{') ],
+            'environments': [ EnvironmentSpec('enva', '') ],
+            'specials': [],
+        }))
+        db.add_context_category('B', macros=[ MacroSpec('ab', '[{'), MacroSpec('b', '') ])
+        db.add_lazy_context_category('C', make_load_fn('C', {
+            'macros': [ MacroSpec('c', '{') ],
+            'environments': [],
+            'specials': [ SpecialsSpec('~') ],
+        }))
+        db.add_lazy_context_category('P', make_load_fn('P', {
+            'macros': [ MacroSpec('ab', '') ],
+        }), prepend=True)
+        return db
+
+    def test_lazy_category_lookups(self):
+        loaded = []
+        db = self._make_lazy_db(loaded)
+        self.assertEqual(db.categories(), ['P', 'A', 'B', 'C'])
+        self.assertEqual(loaded, [])
+
+        self.assertEqual(db.get_macro_spec('a').macroname, 'a')
+        self.assertEqual(loaded, ['P', 'A'])
+        self.assertIs(db.get_macro_spec('ab'), db.d['P']['macros']['ab'])
+        self.assertEqual(db.get_macro_spec('b').macroname, 'b')
+        self.assertEqual(loaded, ['P', 'A'])
+
+        self.assertIsNone(db.get_macro_spec('nonexistent'))
+        self.assertEqual(loaded, ['P', 'A', 'C'])
+        self.assertEqual(db.get_macro_spec('c').macroname, 'c')
+
+        # load_fn is called only once
+        db.freeze()
+        self.assertEqual(loaded, ['P', 'A', 'C'])
+        self.assertEqual(db.get_environment_spec('enva').environmentname, 'enva')
+
+    def test_lazy_category_freeze_and_specials(self):
+        loaded = []
+        db = self._make_lazy_db(loaded)
+        self.assertEqual(db.get_specials_initial_chars(), frozenset(['~']))
+        self.assertEqual(sorted(loaded), ['A', 'C', 'P'])
+
+        loaded[:] = []
+        db = self._make_lazy_db(loaded)
+        self.assertIsNotNone(db.test_for_specials('~', 0))
+        self.assertEqual(sorted(loaded), ['A', 'C', 'P'])
+
+        loaded[:] = []
+        db = self._make_lazy_db(loaded)
+        db.freeze()
+        self.assertEqual(sorted(loaded), ['A', 'C', 'P'])
+        self.assertEqual(db.get_macro_spec('c').macroname, 'c')
+
+    def test_lazy_category_iter_and_filter(self):
+        loaded = []
+        db = self._make_lazy_db(loaded)
+
+        self.assertEqual([ m.macroname for m in db.iter_macro_specs(['C']) ], ['c'])
+        self.assertEqual(loaded, ['C'])
+
+        db2 = db.filtered_context(keep_categories=['A', 'B', 'C'], keep_which=['macros'])
+        self.assertEqual(loaded, ['C'])
+        self.assertEqual(db2.categories(), ['A', 'B', 'C'])
+        self.assertIs(db2.get_macro_spec('ab'), db.d['A']['macros']['ab'])
+        self.assertEqual(loaded, ['C', 'A'])
+        self.assertIsNone(db2.get_environment_spec('enva'))
+
+        db2.freeze()
+        self.assertEqual(loaded, ['C', 'A'])
+        self.assertIsNone(db2.get_specials_spec('~'))
+        self.assertIs(db2.get_macro_spec('c'), db.d['C']['macros']['c'])
+
     def test_extended_with(self):
 
         context = LatexContextDb()
@@ -210,6 +434,180 @@ class TestLatexContextDb(unittest.TestCase):
 
 
 
+### BEGIN_TEST_PYLATEXENC_SKIP
+# not in the JavaScript build: the shared frozen default db is Python-only
+
+class TestSharedDefaultLatexContextDb(unittest.TestCase):
+
+    def test_factory(self):
+        from pylatexenc.macrospec._latexcontextdb import LatexContextDbFactory
+
+        calls = []
+        def make_catspecs():
+            calls.append('A')
+            return { 'macros': [ MacroSpec('a', '{') ] }
+        def setup_db_fn(db):
+            db.set_unknown_macro_spec(MacroSpec('', '{'))
+
+        factory = LatexContextDbFactory(lambda: [ ('A', make_catspecs) ],
+                                        setup_db_fn)
+        db1 = factory.make_latex_context_db()
+        db2 = factory.make_latex_context_db()
+        self.assertIsNot(db1, db2)
+        self.assertFalse(db1.frozen)
+        self.assertEqual(calls, [])
+        self.assertIs(db1.get_macro_spec('a'), db2.get_macro_spec('a'))
+        self.assertEqual(calls, ['A'])
+        self.assertEqual(db1.get_macro_spec('unknown').arguments_spec_list,
+                         MacroSpec('', '{').arguments_spec_list)
+
+        shared = factory.get_shared_latex_context_db()
+        self.assertTrue(shared.frozen)
+        self.assertIs(factory.get_shared_latex_context_db(), shared)
+        self.assertIs(shared.get_macro_spec('a'), db1.get_macro_spec('a'))
+        self.assertEqual(calls, ['A'])
+
+    def test_latexwalker_shared_db(self):
+        from pylatexenc import latexwalker
+
+        db = latexwalker.get_shared_default_latex_context_db()
+        self.assertTrue(db.frozen)
+        self.assertIs(latexwalker.get_shared_default_latex_context_db(), db)
+        with self.assertRaises(RuntimeError):
+            db.add_context_category('mine', macros=[MacroSpec('mymacro', '{')])
+
+        lw1 = latexwalker.LatexWalker(r'\textbf{x}')
+        lw2 = latexwalker.LatexWalker(r'\emph{y}')
+        self.assertIs(lw1.default_parsing_state.latex_context, db)
+        self.assertIs(lw2.default_parsing_state.latex_context, db)
+
+        # private copies can be extended
+        db2 = latexwalker.get_default_latex_context_db()
+        self.assertIsNot(db2, db)
+        self.assertFalse(db2.frozen)
+        db2.add_context_category('mine', macros=[MacroSpec('mymacro', '{')])
+        self.assertEqual(db2.get_macro_spec('mymacro').macroname, 'mymacro')
+        self.assertEqual(db.get_macro_spec('mymacro').macroname, '')
+        self.assertEqual(db2.get_macro_spec('textbf').arguments_spec_list,
+                         db.get_macro_spec('textbf').arguments_spec_list)
+
+    def test_latex2text_shared_db(self):
+        from pylatexenc import latex2text
+
+        db = latex2text.get_shared_default_latex_context_db()
+        self.assertTrue(db.frozen)
+        self.assertIs(latex2text.get_shared_default_latex_context_db(), db)
+
+        l2t = latex2text.LatexNodes2Text()
+        self.assertIs(l2t.latex_context, db)
+        self.assertEqual(l2t.latex_to_text(r'\textbf{x} \alpha'), u'\U0001D431 \u03B1')
+
+        db2 = latex2text.get_default_latex_context_db()
+        self.assertIsNot(db2, db)
+        self.assertFalse(db2.frozen)
+
+### END_TEST_PYLATEXENC_SKIP
+
+
+### BEGIN_TEST_PYLATEXENC_SKIP
+# not in the JavaScript build: snapshot files are Python-only
+
+def _make_snapshot_test_db():
+    from pylatexenc import latex2text
+
+    def make_shout_fn(text):
+        def shout_fn(n):
+            return text.upper() + '!'
+        return shout_fn
+
+    db = latex2text.get_default_latex_context_db()
+    db.add_context_category(
+        'my-macros',
+        prepend=True,
+        macros=[
+            latex2text.MacroTextSpec('shout', simplify_repl=make_shout_fn('hi')),
+            latex2text.MacroTextSpec('dash', simplify_repl=lambda n: '--'),
+        ],
+    )
+    return db
+
+
+class TestLatexContextDbSnapshot(unittest.TestCase):
+
+    def _l2t(self, db, s):
+        from pylatexenc import latex2text
+        return latex2text.LatexNodes2Text(latex_context=db).latex_to_text(s)
+
+    sample = r"""\shout\dash\textbf{x} $\mathbb{R}\sin\alpha$ \'e \href{u}{v}"""
+
+    def test_dump_and_load(self):
+        import io
+
+        db = _make_snapshot_test_db()
+        db.freeze()
+        f = io.BytesIO()
+        db.dump_snapshot(f, fingerprint='v1')
+
+        f.seek(0)
+        db2 = LatexContextDb.load_snapshot(f, fingerprint='v1')
+        self.assertIsNot(db2, db)
+        self.assertTrue(db2.frozen)
+        self.assertEqual(db2.category_list, db.category_list)
+        self.assertEqual(self._l2t(db2, self.sample), self._l2t(db, self.sample))
+        self.assertTrue(self._l2t(db2, self.sample).startswith('HI!--'))
+
+        # stale snapshot
+        f.seek(0)
+        with self.assertRaises(ValueError):
+            LatexContextDb.load_snapshot(f, fingerprint='v2')
+
+    def test_dump_unfrozen(self):
+        import io
+        db = _make_snapshot_test_db()
+        with self.assertRaises(RuntimeError):
+            db.dump_snapshot(io.BytesIO())
+
+    def test_load_snapshot_or_build(self):
+        import os
+        import tempfile
+
+        built = []
+        def build_fn():
+            built.append(True)
+            return _make_snapshot_test_db()
+
+        tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(tmpdir, 'l2t.snapshot')
+        try:
+            db = LatexContextDb.load_snapshot_or_build(filename, build_fn, fingerprint=1)
+            self.assertEqual(len(built), 1)
+            self.assertTrue(db.frozen)
+            self.assertTrue(os.path.exists(filename))
+            self.assertEqual(os.listdir(tmpdir), ['l2t.snapshot'])
+
+            db2 = LatexContextDb.load_snapshot_or_build(filename, build_fn, fingerprint=1)
+            self.assertEqual(len(built), 1)
+            self.assertEqual(self._l2t(db2, self.sample), self._l2t(db, self.sample))
+
+            # a different fingerprint rebuilds and overwrites the snapshot
+            LatexContextDb.load_snapshot_or_build(filename, build_fn, fingerprint=2)
+            self.assertEqual(len(built), 2)
+            LatexContextDb.load_snapshot_or_build(filename, build_fn, fingerprint=2)
+            self.assertEqual(len(built), 2)
+
+            # a corrupt snapshot is rebuilt, too
+            with open(filename, 'wb') as f:
+                f.write(b'garbage')
+            db3 = LatexContextDb.load_snapshot_or_build(filename, build_fn, fingerprint=2)
+            self.assertEqual(len(built), 3)
+            self.assertEqual(self._l2t(db3, self.sample), self._l2t(db, self.sample))
+        finally:
+            for fn in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, fn))
+            os.rmdir(tmpdir)
+
+### END_TEST_PYLATEXENC_SKIP
+
 
 # ---
 